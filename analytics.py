@@ -0,0 +1,304 @@
+# analytics.py - Streaming analyzer for battle telemetry logs
+import argparse
+import json
+import math
+import os
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from rich.table import Table
+import telemetry
+from combat import create_battle_actions
+from monsters import REGULAR_MONSTER_TYPES, BOSS_MONSTER_TYPES, RARITY_WEIGHTS
+from terminal import console
+
+# Large logs are split into byte ranges of this size so one file can use every worker
+SHARD_BYTES = 32 * 1024 * 1024
+LEVEL_BAND = 5
+
+OUTCOMES = ("victory", "defeat", "escaped")
+DIMENSIONS = ("player_class", "level_band", "monster_type", "rarity", "is_boss")
+
+class QuantileSketch:
+    """Mergeable log-bucket quantile sketch
+
+    Values are counted in buckets whose bounds grow geometrically, so any
+    quantile is within relative_accuracy of the true value while memory only
+    grows with the log of the value range.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, q):
+        """Approximate value at quantile q (0..1), None when empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i]
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
+
+class BattleStats:
+    """Aggregates over a slice of the logs, partial results merge into one"""
+
+    def __init__(self):
+        self.events = 0
+        self.bad_lines = 0
+        # dimension -> value -> Counter of outcomes
+        self.outcomes = {dimension: defaultdict(Counter) for dimension in DIMENSIONS}
+        self.turns = Counter()
+        self.damage_dealt = QuantileSketch()
+        self.damage_taken = QuantileSketch()
+        self.actions = Counter()
+        self.potions = Counter()
+        # player level -> gold
+        self.gold_earned = Counter()
+        self.gold_spent = Counter()
+        self.gold_from_sales = Counter()
+
+    def add(self, event):
+        """Fold one event into the aggregates"""
+        self.events += 1
+        event_type = event.get("type")
+
+        if event_type == telemetry.BATTLE_END:
+            outcome = event.get("outcome")
+            level = event.get("player_level", 1)
+            keys = {
+                "player_class": event.get("player_class"),
+                "level_band": (level - 1) // LEVEL_BAND,
+                "monster_type": event.get("monster_type"),
+                "rarity": event.get("rarity"),
+                "is_boss": bool(event.get("is_boss"))
+            }
+            for dimension, value in keys.items():
+                self.outcomes[dimension][value][outcome] += 1
+            if outcome != "escaped":
+                self.turns[event.get("turns", 0)] += 1
+        elif event_type == telemetry.DAMAGE_DEALT:
+            self.damage_dealt.add(event.get("amount", 0))
+        elif event_type == telemetry.DAMAGE_TAKEN:
+            self.damage_taken.add(event.get("amount", 0))
+        elif event_type == telemetry.BATTLE_ACTION:
+            self.actions[event.get("action")] += 1
+        elif event_type == telemetry.POTION_USED:
+            self.potions[(event.get("potion"), event.get("battle_id") is not None)] += 1
+        elif event_type == telemetry.VICTORY_REWARD:
+            self.gold_earned[event.get("player_level", 1)] += event.get("gold", 0)
+        elif event_type == telemetry.PURCHASE:
+            self.gold_spent[event.get("player_level", 1)] += event.get("gold", 0)
+        elif event_type == telemetry.SALE:
+            self.gold_from_sales[event.get("player_level", 1)] += event.get("gold", 0)
+
+    def merge(self, other):
+        self.events += other.events
+        self.bad_lines += other.bad_lines
+        for dimension in DIMENSIONS:
+            for value, counts in other.outcomes[dimension].items():
+                self.outcomes[dimension][value].update(counts)
+        self.turns.update(other.turns)
+        self.damage_dealt.merge(other.damage_dealt)
+        self.damage_taken.merge(other.damage_taken)
+        self.actions.update(other.actions)
+        self.potions.update(other.potions)
+        self.gold_earned.update(other.gold_earned)
+        self.gold_spent.update(other.gold_spent)
+        self.gold_from_sales.update(other.gold_from_sales)
+
+def iter_log_files(paths):
+    """Yield every JSONL log under the given files and directories"""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for directory, _, filenames in os.walk(path):
+            for filename in sorted(filenames):
+                if filename.endswith('.jsonl'):
+                    yield os.path.join(directory, filename)
+
+def iter_shards(files, shard_bytes=SHARD_BYTES):
+    """Split log files into (path, start, end) byte ranges"""
+    for path in files:
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), shard_bytes):
+            yield path, start, min(start + shard_bytes, size)
+
+def read_lines(path, start, end):
+    """Yield the lines that begin inside [start, end) of a file"""
+    with open(path, 'rb') as file:
+        if start:
+            # Back up one byte so a line starting exactly at start is not skipped
+            file.seek(start - 1)
+            position = start - 1 + len(file.readline())
+        else:
+            position = 0
+        while position < end:
+            line = file.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line
+
+def analyze_shard(path, start, end):
+    """Aggregate one byte range of a log in a worker process"""
+    stats = BattleStats()
+    for line in read_lines(path, start, end):
+        try:
+            event = json.loads(line)
+        except ValueError:
+            stats.bad_lines += 1
+            continue
+        stats.add(event)
+    return stats
+
+def run_analysis(paths, workers=None, shard_bytes=SHARD_BYTES):
+    """Analyze every log under paths in a process pool, returns merged BattleStats"""
+    workers = workers or os.cpu_count() or 1
+    total = BattleStats()
+    shards = iter_shards(iter_log_files(paths), shard_bytes)
+
+    if workers == 1:
+        for shard in shards:
+            total.merge(analyze_shard(*shard))
+        return total
+
+    # Only a bounded number of shards are ever in flight, so memory stays flat
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for shard in shards:
+            pending.add(executor.submit(analyze_shard, *shard))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+        for future in pending:
+            total.merge(future.result())
+    return total
+
+def _outcome_table(title, label, rows):
+    table = Table(title=title)
+    table.add_column(label, style="cyan")
+    table.add_column("Battles", style="white", justify="right")
+    table.add_column("Wins", style="green", justify="right")
+    table.add_column("Defeats", style="red", justify="right")
+    table.add_column("Escapes", style="yellow", justify="right")
+    table.add_column("Win %", style="bold", justify="right")
+    for name, counts in rows:
+        battles = sum(counts[outcome] for outcome in OUTCOMES)
+        if not battles:
+            continue
+        table.add_row(
+            name, str(battles), str(counts["victory"]), str(counts["defeat"]),
+            str(counts["escaped"]), f"{counts['victory'] / battles * 100:.1f}%"
+        )
+    return table
+
+def print_report(stats):
+    """Render the aggregates as Rich tables"""
+    outcomes = stats.outcomes
+
+    console.print(_outcome_table("🧙 Win Rate by Class", "Class", sorted(outcomes["player_class"].items())))
+
+    bands = sorted(outcomes["level_band"].items())
+    console.print(_outcome_table("⭐ Win Rate by Level", "Levels", [
+        (f"{band * LEVEL_BAND + 1}-{(band + 1) * LEVEL_BAND}", counts) for band, counts in bands
+    ]))
+
+    # Follow the game's own spawn tables so unknown names stand out at the end
+    known_types = [t.base_name for t in REGULAR_MONSTER_TYPES + BOSS_MONSTER_TYPES]
+    monster_rows = [(name, outcomes["monster_type"][name]) for name in known_types if name in outcomes["monster_type"]]
+    monster_rows += [(str(name), counts) for name, counts in outcomes["monster_type"].items() if name not in known_types]
+    console.print(_outcome_table("👹 Win Rate by Monster", "Monster", monster_rows))
+
+    rarity_rows = [(rarity.title(), outcomes["rarity"][rarity]) for rarity, _ in RARITY_WEIGHTS if rarity in outcomes["rarity"]]
+    rarity_rows += [("Boss" if is_boss else "Regular", counts) for is_boss, counts in sorted(outcomes["is_boss"].items())]
+    console.print(_outcome_table("💎 Win Rate by Rarity", "Rarity", rarity_rows))
+
+    if stats.turns:
+        turns_table = Table(title="⏱️ Battle Length (won or lost)")
+        turns_table.add_column("Turns", style="cyan", justify="right")
+        turns_table.add_column("Battles", style="white", justify="right")
+        turns_table.add_column("", style="green")
+        peak = max(stats.turns.values())
+        for turns, count in sorted(stats.turns.items()):
+            turns_table.add_row(str(turns), str(count), "█" * max(1, round(count / peak * 30)))
+        console.print(turns_table)
+
+    damage_table = Table(title="💥 Damage per Hit")
+    damage_table.add_column("", style="cyan")
+    for label in ("Hits", "p50", "p90", "p99"):
+        damage_table.add_column(label, style="white", justify="right")
+    for label, sketch in (("Dealt", stats.damage_dealt), ("Taken", stats.damage_taken)):
+        quantiles = [sketch.quantile(q) for q in (0.5, 0.9, 0.99)]
+        damage_table.add_row(label, str(sketch.count), *("-" if v is None else f"{v:.1f}" for v in quantiles))
+    console.print(damage_table)
+
+    action_names = {key: action.action_name for key, action in create_battle_actions().items()}
+    actions_table = Table(title="🎯 Battle Actions")
+    actions_table.add_column("Key", style="yellow")
+    actions_table.add_column("Action", style="cyan")
+    actions_table.add_column("Uses", style="white", justify="right")
+    for key, count in sorted(stats.actions.items(), key=lambda item: str(item[0])):
+        actions_table.add_row(str(key), action_names.get(key, "?"), str(count))
+    console.print(actions_table)
+
+    levels = sorted(set(stats.gold_earned) | set(stats.gold_spent) | set(stats.gold_from_sales))
+    if levels:
+        gold_table = Table(title="💰 Gold Flow by Level")
+        gold_table.add_column("Level", style="cyan", justify="right")
+        gold_table.add_column("Earned", style="green", justify="right")
+        gold_table.add_column("Sold", style="yellow", justify="right")
+        gold_table.add_column("Spent", style="red", justify="right")
+        gold_table.add_column("Net", style="bold", justify="right")
+        for level in levels:
+            earned = stats.gold_earned[level]
+            sold = stats.gold_from_sales[level]
+            spent = stats.gold_spent[level]
+            gold_table.add_row(str(level), str(earned), str(sold), str(spent), str(earned + sold - spent))
+        console.print(gold_table)
+
+    console.print(f"📈 {stats.events} events analyzed, {stats.bad_lines} unreadable lines skipped", style="dim")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze Python Adventure RPG battle telemetry")
+    parser.add_argument("paths", nargs="*", default=["telemetry"], help="Log files or directories (default: telemetry)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    missing = [path for path in args.paths if not os.path.exists(path)]
+    if missing:
+        console.print(f"❌ Telemetry path {missing[0]} not found!", style="bold red")
+        return 2
+
+    print_report(run_analysis(args.paths, args.workers))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
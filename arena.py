@@ -0,0 +1,323 @@
+# arena.py - Headless player-vs-player tournament with Elo ratings
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from rich.live import Live
+from rich.table import Table
+import terminal
+from combat import ActionMask, create_battle_actions
+from items import ITEMS
+from player import Player, SKILL_BONUSES
+from terminal import SilentConsole, TerminalIO, console
+
+CLASSES = ("Warrior", "Mage", "Rogue")
+SLOT_KINDS = {"weapon": "weapon", "armor": "armor", "accessory": "accessory"}
+
+# A game still going after this many turns per side is a draw
+MAX_TURNS = 100
+
+ELO_START = 1500
+ELO_K = 16
+
+# Matchups handed to a worker at a time
+CHUNK_SIZE = 32
+
+# Game results as stored per matchup
+FIRST_WINS, SECOND_WINS, DRAW = 0, 1, 2
+
+class Build:
+    """A character to enter in the arena: class, level, skill points and gear"""
+
+    def __init__(self, name, player_class, level=1, skills=None, equipment=None):
+        if player_class not in CLASSES:
+            raise ValueError(f"Build {name!r}: class must be one of {list(CLASSES)}")
+        self.name = name
+        self.player_class = player_class
+        self.level = level
+        self.skills = {skill: 0 for skill in SKILL_BONUSES}
+        for skill, points in (skills or {}).items():
+            if skill not in SKILL_BONUSES:
+                raise ValueError(f"Build {name!r}: unknown skill {skill!r}")
+            self.skills[skill] = points
+        # slot -> item key
+        self.equipment = {}
+        for slot, key in (equipment or {}).items():
+            if not key:
+                continue
+            item = ITEMS.by_key(key)
+            if item is None or item["slot"] != slot:
+                raise ValueError(f"Build {name!r}: {key!r} is not a {slot}")
+            self.equipment[slot] = item["key"]
+
+    @property
+    def summary(self):
+        skills = " ".join(f"{skill[:3].upper()}{points}" for skill, points in self.skills.items() if points)
+        gear = ", ".join(ITEMS.by_key(key)["name"] for key in self.equipment.values())
+        return " | ".join(part for part in (skills, gear) if part) or "-"
+
+    def create_player(self):
+        """Fresh Player for this build, at full HP and mana"""
+        player = Player(self.name, self.player_class)
+        for _ in range(self.level - 1):
+            player.level_up()
+        for skill, points in self.skills.items():
+            if points and not player.allocate_skill_point(skill, points):
+                raise ValueError(f"Build {self.name!r}: not enough skill points for {points} {skill}")
+        for slot, key in self.equipment.items():
+            player.equip_item(slot, key)
+        # Equipment and skills raise the maximums, start the fight topped up
+        *_, tracked = player.battle_state()
+        player.restore_battle_state((player.total_max_hp, player.total_max_mana, 0, tracked))
+        return player
+
+    def to_dict(self):
+        return {"name": self.name, "class": self.player_class, "level": self.level,
+                "skills": {skill: points for skill, points in self.skills.items() if points},
+                "equipment": dict(self.equipment)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["class"], data.get("level", 1), data.get("skills"), data.get("equipment"))
+
+def skill_points_at(level):
+    """Skill points a character has earned by a level"""
+    return sum(1 + (1 if lvl % 5 == 0 else 0) for lvl in range(2, level + 1))
+
+def random_build(name, player_class, level, rng=random):
+    """A build with random skill points and random gear unlocked at its level"""
+    skills = dict.fromkeys(SKILL_BONUSES, 0)
+    for _ in range(skill_points_at(level)):
+        skills[rng.choice(list(SKILL_BONUSES))] += 1
+
+    equipment = {}
+    for slot, kind in SLOT_KINDS.items():
+        options = [item for item in ITEMS.of_kind(kind) if item.get("level", 1) <= level]
+        # Some builds leave a slot empty
+        choice = rng.choice(options + [None]) if options else None
+        if choice:
+            equipment[slot] = choice["key"]
+    return Build(name, player_class, level, skills, equipment)
+
+def random_builds(count, level, classes=CLASSES, seed=None):
+    """count random builds per class"""
+    rng = random.Random(seed)
+    return [random_build(f"{player_class} #{index + 1}", player_class, level, rng)
+            for player_class in classes for index in range(count)]
+
+def load_builds(path):
+    with open(path, 'r') as file:
+        return [Build.from_dict(data) for data in json.load(file)]
+
+def choose_action(player, mask):
+    """Arena policy: drink when low, special when ready, otherwise attack
+
+    The AI never defends or flees, defending only matters against monsters.
+    """
+    if player.hp < player.max_hp * 0.35 and mask.is_legal("3"):
+        return "3"
+    if mask.is_legal("2"):
+        return "2"
+    if player.mana < player.special_mana_cost and player.special_cooldown <= 1 and mask.is_legal("4"):
+        return "4"
+    return "1"
+
+def fight(first, second, actions, max_turns=MAX_TURNS):
+    """One game between two players at their start states, first moves first
+
+    Actions are combat.py's own, with the other player standing in for the
+    monster. Returns FIRST_WINS, SECOND_WINS or DRAW.
+    """
+    sides = (first, second)
+    for turn in range(2 * max_turns):
+        attacker, defender = sides[turn % 2], sides[1 - turn % 2]
+        mask = ActionMask.compute(actions, attacker)
+        actions[choose_action(attacker, mask)].execute(attacker, defender)
+        if not defender.is_alive:
+            return turn % 2
+        attacker.reduce_special_cooldown()
+    return DRAW
+
+# Per worker process: the tournament's builds and their players, made on first use
+_builds = None
+_players = {}
+
+def _init_worker(builds):
+    global _builds
+    _builds = builds
+    _players.clear()
+    terminal.use_io(TerminalIO(SilentConsole(quiet=True)))
+
+def _player(index):
+    entry = _players.get(index)
+    if entry is None:
+        player = _builds[index].create_player()
+        entry = _players[index] = (player, player.battle_state())
+    return entry
+
+def play_chunk(chunk_index, matchups, games, seed):
+    """Play every game of some matchups, returns [(a, b, results)] with a result per game"""
+    random.seed(f"{seed}:{chunk_index}")
+    actions = create_battle_actions()
+    played = []
+    for a, b in matchups:
+        player_a, start_a = _player(a)
+        player_b, start_b = _player(b)
+        results = bytearray()
+        for game in range(games):
+            player_a.restore_battle_state(start_a)
+            player_b.restore_battle_state(start_b)
+            # Sides take turns moving first
+            if game % 2 == 0:
+                results.append(fight(player_a, player_b, actions))
+            else:
+                result = fight(player_b, player_a, actions)
+                results.append(result if result == DRAW else 1 - result)
+        played.append((a, b, bytes(results)))
+    return played
+
+class Standings:
+    """Elo ratings and win/draw/loss records, updated game by game"""
+
+    def __init__(self, builds, k=ELO_K):
+        self.builds = builds
+        self.k = k
+        self.ratings = [float(ELO_START)] * len(builds)
+        self.records = [[0, 0, 0] for _ in builds]
+        self.games = 0
+
+    def add(self, a, b, results):
+        for result in results:
+            score = 1.0 if result == FIRST_WINS else 0.0 if result == SECOND_WINS else 0.5
+            expected = 1 / (1 + 10 ** ((self.ratings[b] - self.ratings[a]) / 400))
+            change = self.k * (score - expected)
+            self.ratings[a] += change
+            self.ratings[b] -= change
+
+            if result == DRAW:
+                self.records[a][1] += 1
+                self.records[b][1] += 1
+            else:
+                winner, loser = (a, b) if result == FIRST_WINS else (b, a)
+                self.records[winner][0] += 1
+                self.records[loser][2] += 1
+            self.games += 1
+
+    def ranking(self):
+        """Build indexes, best rating first"""
+        return sorted(range(len(self.builds)), key=lambda index: -self.ratings[index])
+
+    def table(self, top=20, title="🏟️ Arena Standings"):
+        table = Table(title=title)
+        table.add_column("#", style="dim", justify="right")
+        table.add_column("Build", style="cyan")
+        table.add_column("Class", style="green")
+        table.add_column("Elo", style="bold yellow", justify="right")
+        table.add_column("W-D-L", style="white", justify="right")
+        table.add_column("Win %", style="bold", justify="right")
+        table.add_column("Skills | Gear", style="dim")
+        for rank, index in enumerate(self.ranking()[:top], 1):
+            build = self.builds[index]
+            wins, draws, losses = self.records[index]
+            played = wins + draws + losses
+            table.add_row(
+                str(rank), build.name, build.player_class, f"{self.ratings[index]:.0f}",
+                f"{wins}-{draws}-{losses}", f"{wins / played * 100:.1f}%" if played else "-", build.summary
+            )
+        return table
+
+    def class_table(self):
+        table = Table(title="🧙 Classes")
+        table.add_column("Class", style="green")
+        table.add_column("Builds", style="white", justify="right")
+        table.add_column("Mean Elo", style="yellow", justify="right")
+        table.add_column("Best", style="cyan")
+        for player_class in CLASSES:
+            indexes = [i for i, build in enumerate(self.builds) if build.player_class == player_class]
+            if not indexes:
+                continue
+            best = max(indexes, key=lambda index: self.ratings[index])
+            mean = sum(self.ratings[index] for index in indexes) / len(indexes)
+            table.add_row(player_class, str(len(indexes)), f"{mean:.0f}",
+                          f"{self.builds[best].name} ({self.ratings[best]:.0f})")
+        return table
+
+def _chunks(builds, seed):
+    """Every pairing once, shuffled so no build plays all its games first"""
+    matchups = list(itertools.combinations(range(len(builds)), 2))
+    random.Random(seed).shuffle(matchups)
+    return [matchups[start:start + CHUNK_SIZE] for start in range(0, len(matchups), CHUNK_SIZE)]
+
+def run_tournament(builds, games=10, workers=None, seed=0, on_progress=None):
+    """Round robin over builds on a process pool, returns the Standings
+
+    Chunks are applied in submission order, so ratings only depend on the
+    seed, not on the number of workers.
+    """
+    if len(builds) < 2:
+        raise ValueError("A tournament needs at least two builds")
+    workers = workers or os.cpu_count() or 1
+    standings = Standings(builds)
+    chunks = _chunks(builds, seed)
+
+    def apply(played):
+        for a, b, results in played:
+            standings.add(a, b, results)
+        if on_progress:
+            on_progress(standings)
+
+    if workers == 1:
+        previous_io = terminal.current_io()
+        _init_worker(builds)
+        try:
+            for chunk_index, chunk in enumerate(chunks):
+                apply(play_chunk(chunk_index, chunk, games, seed))
+        finally:
+            terminal.use_io(previous_io)
+        return standings
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(builds,)) as executor:
+        results = executor.map(play_chunk, range(len(chunks)), chunks,
+                               itertools.repeat(games), itertools.repeat(seed))
+        for played in results:
+            apply(played)
+    return standings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank Python Adventure RPG builds in a player-vs-player round robin")
+    parser.add_argument("--builds", metavar="FILE", help="JSON list of builds (default: random builds)")
+    parser.add_argument("--random", type=int, default=20, metavar="N", help="Random builds per class (default: 20)")
+    parser.add_argument("--level", type=int, default=10, help="Level of random builds (default: 10)")
+    parser.add_argument("--classes", nargs="+", choices=CLASSES, default=list(CLASSES), help="Classes of random builds")
+    parser.add_argument("--games", type=int, default=10, help="Games per matchup (default: 10)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--top", type=int, default=20, help="Builds shown in the standings (default: 20)")
+    args = parser.parse_args(argv)
+
+    if args.builds:
+        if not os.path.exists(args.builds):
+            console.print(f"❌ Build file {args.builds} not found!", style="bold red")
+            return 2
+        builds = load_builds(args.builds)
+    else:
+        builds = random_builds(args.random, args.level, args.classes, args.seed)
+
+    matchups = len(builds) * (len(builds) - 1) // 2
+    console.print(f"🏟️ {len(builds)} builds, {matchups:,} matchups, {matchups * args.games:,} games", style="bold cyan")
+
+    live_console = terminal.current_io().console
+    with Live(console=live_console, refresh_per_second=4, transient=True) as live:
+        def show(standings):
+            live.update(standings.table(args.top, title=f"🏟️ Arena Standings ({standings.games:,} games)"))
+        standings = run_tournament(builds, args.games, args.workers, args.seed, on_progress=show)
+
+    console.print(standings.table(args.top))
+    console.print(standings.class_table())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
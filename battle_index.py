@@ -0,0 +1,362 @@
+# battle_index.py - Inverted index over recorded battles and a text replayer
+import argparse
+import bisect
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from urllib.parse import quote
+from rich.table import Table
+import telemetry
+from terminal import console
+
+# Battles started but not yet ended that update() remembers, the oldest are
+# forgotten first (a battle quit mid-fight never logs its end)
+MAX_PENDING_BATTLES = 1000
+
+class BattleIndex:
+    """Posting lists of battle ids per term, stored next to the telemetry logs
+
+    Every finished battle becomes a document: a fixed-size record in docs.bin
+    pointing at its battle_start and battle_end lines. Each term (monster,
+    rarity, boss, class, level, outcome, used item, action) has a sorted
+    array of document ids in its own .post file, so a query only reads the
+    lists it intersects. update() only reads log bytes it has not seen yet.
+    """
+
+    # start file, start offset, end file, end offset
+    DOC_RECORD = struct.Struct("<IQIQ")
+
+    def __init__(self, log_directory, index_directory=None):
+        self.log_directory = log_directory
+        self.index_directory = index_directory or os.path.join(log_directory, ".index")
+
+        if not os.path.exists(self.index_directory):
+            os.makedirs(self.index_directory)
+
+        self._meta = self._load_meta()
+
+    @property
+    def doc_count(self):
+        return self._meta["doc_count"]
+
+    def _path(self, name):
+        return os.path.join(self.index_directory, name)
+
+    def _term_path(self, term):
+        return self._path(quote(term, safe="") + ".post")
+
+    def _load_meta(self):
+        try:
+            with open(self._path("meta.json"), 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            # files: [name, bytes indexed], pending: battle id -> [file id, offset, terms]
+            return {"files": [], "doc_count": 0, "pending": {}}
+
+    def _save_meta(self):
+        temp_path = self._path("meta.json.tmp")
+        with open(temp_path, 'w') as file:
+            json.dump(self._meta, file, separators=(",", ":"))
+        os.replace(temp_path, self._path("meta.json"))
+
+    def _repair(self):
+        """Drop anything written after the last saved meta (an interrupted update)"""
+        doc_count = self.doc_count
+        docs_path = self._path("docs.bin")
+        if os.path.exists(docs_path) and os.path.getsize(docs_path) > doc_count * self.DOC_RECORD.size:
+            with open(docs_path, 'r+b') as file:
+                file.truncate(doc_count * self.DOC_RECORD.size)
+
+        for filename in os.listdir(self.index_directory):
+            if not filename.endswith(".post"):
+                continue
+            path = self._path(filename)
+            postings = _read_postings(path)
+            if postings and postings[-1] >= doc_count:
+                with open(path, 'wb') as file:
+                    array('I', (doc for doc in postings if doc < doc_count)).tofile(file)
+
+    @staticmethod
+    def battle_terms(event):
+        """Terms describing a battle, taken from its battle_end event"""
+        return [
+            f"monster:{event.get('monster_type')}",
+            f"rarity:{event.get('rarity')}",
+            f"boss:{'yes' if event.get('is_boss') else 'no'}",
+            f"class:{event.get('player_class')}",
+            f"level:{event.get('player_level')}",
+            f"outcome:{event.get('outcome')}"
+        ]
+
+    def update(self):
+        """Index battles appended to the logs since the last update, returns how many"""
+        self._repair()
+        files = self._meta["files"]
+        file_ids = {name: file_id for file_id, (name, _) in enumerate(files)}
+        for filename in sorted(os.listdir(self.log_directory)):
+            if filename.endswith(".jsonl") and filename not in file_ids:
+                file_ids[filename] = len(files)
+                files.append([filename, 0])
+
+        pending = self._meta["pending"]
+        new_postings = {}
+        new_docs = bytearray()
+        doc_count = self.doc_count
+
+        for file_id, (filename, indexed_bytes) in enumerate(files):
+            path = os.path.join(self.log_directory, filename)
+            if not os.path.exists(path) or os.path.getsize(path) <= indexed_bytes:
+                continue
+
+            with open(path, 'rb') as file:
+                file.seek(indexed_bytes)
+                position = indexed_bytes
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break  # Still being written, picked up next time
+                    offset = position
+                    position += len(line)
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    event_type = event.get("type")
+                    battle_id = event.get("battle_id")
+                    if event_type == telemetry.BATTLE_START:
+                        pending[battle_id] = [file_id, offset, []]
+                        if len(pending) > MAX_PENDING_BATTLES:
+                            del pending[next(iter(pending))]
+                    elif event_type == telemetry.POTION_USED and battle_id in pending:
+                        pending[battle_id][2].append(f"used:{event.get('potion')}_potion")
+                    elif event_type == telemetry.BATTLE_ACTION and battle_id in pending:
+                        pending[battle_id][2].append(f"action:{event.get('action')}")
+                    elif event_type == telemetry.BATTLE_END:
+                        # A battle resumed from a checkpoint has no start in this log
+                        start_file, start_offset, extra_terms = pending.pop(battle_id, (file_id, offset, []))
+                        new_docs += self.DOC_RECORD.pack(start_file, start_offset, file_id, offset)
+                        for term in set(self.battle_terms(event) + extra_terms):
+                            new_postings.setdefault(term, array('I')).append(doc_count)
+                        doc_count += 1
+            files[file_id][1] = position
+
+        with open(self._path("docs.bin"), 'ab') as file:
+            file.write(new_docs)
+        for term, postings in new_postings.items():
+            with open(self._term_path(term), 'ab') as file:
+                postings.tofile(file)
+
+        added = doc_count - self.doc_count
+        self._meta["doc_count"] = doc_count
+        self._save_meta()
+        return added
+
+    def postings(self, term):
+        """Sorted document ids containing a term"""
+        return _read_postings(self._term_path(term))
+
+    def query(self, monster=None, rarity=None, boss=None, player_class=None,
+              min_level=None, max_level=None, outcome=None, used=(), actions=()):
+        """Document ids of battles matching every given filter"""
+        lists = []
+        for term, value in (("monster", monster), ("rarity", rarity), ("class", player_class), ("outcome", outcome)):
+            if value is not None:
+                lists.append(self.postings(f"{term}:{value}"))
+        if boss is not None:
+            lists.append(self.postings(f"boss:{'yes' if boss else 'no'}"))
+        for item in used:
+            lists.append(self.postings(f"used:{item}"))
+        for action in actions:
+            lists.append(self.postings(f"action:{action}"))
+        if min_level is not None or max_level is not None:
+            for bound in (min_level, max_level):
+                if bound is not None and not isinstance(bound, int):
+                    raise ValueError(f"Level filters take whole numbers, got {bound!r}")
+            # Each battle has exactly one level, so the union of the range stays disjoint.
+            # Battles logged without a level (level:None) never match a range.
+            levels = []
+            for filename in os.listdir(self.index_directory):
+                value = filename[len("level%3A"):-len(".post")]
+                if filename.startswith("level%3A") and filename.endswith(".post") and value.isdigit():
+                    levels.append(int(value))
+            low = min_level if min_level is not None else 1
+            high = max_level if max_level is not None else max(levels, default=0)
+            band = array('I')
+            for level in levels:
+                if low <= level <= high:
+                    band.extend(self.postings(f"level:{level}"))
+            lists.append(array('I', sorted(band)))
+
+        if not lists:
+            return list(range(self.doc_count))
+        return intersect(lists)
+
+    def document(self, doc_id):
+        """(start file, start offset, end file, end offset) of a battle"""
+        with open(self._path("docs.bin"), 'rb') as file:
+            file.seek(doc_id * self.DOC_RECORD.size)
+            return self.DOC_RECORD.unpack(file.read(self.DOC_RECORD.size))
+
+    def _log_path(self, file_id):
+        return os.path.join(self.log_directory, self._meta["files"][file_id][0])
+
+    def summary(self, doc_id):
+        """The battle_end event of a battle"""
+        _, _, end_file, end_offset = self.document(doc_id)
+        with open(self._log_path(end_file), 'rb') as file:
+            file.seek(end_offset)
+            return json.loads(file.readline())
+
+    def battle_events(self, doc_id):
+        """Yield a battle's events in order, reading only between its first and last line"""
+        start_file, start_offset, end_file, end_offset = self.document(doc_id)
+        battle_id = self.summary(doc_id).get("battle_id")
+        for file_id in range(start_file, end_file + 1):
+            with open(self._log_path(file_id), 'rb') as file:
+                position = start_offset if file_id == start_file else 0
+                file.seek(position)
+                for line in file:
+                    if file_id == end_file and position > end_offset:
+                        return
+                    position += len(line)
+                    event = json.loads(line)
+                    if event.get("battle_id") == battle_id:
+                        yield event
+
+def _read_postings(path):
+    postings = array('I')
+    try:
+        with open(path, 'rb') as file:
+            postings.frombytes(file.read())
+    except OSError:
+        pass
+    return postings
+
+def intersect(lists):
+    """Intersect sorted id lists, probing the longer lists by binary search"""
+    lists = sorted(lists, key=len)
+    result = list(lists[0])
+    for other in lists[1:]:
+        if not result:
+            break
+        matches = []
+        low = 0
+        for doc in result:
+            low = bisect.bisect_left(other, doc, low)
+            if low == len(other):
+                break
+            if other[low] == doc:
+                matches.append(doc)
+        result = matches
+    return result
+
+def describe_event(event):
+    """One line of the text replay for an event, None for events not shown"""
+    event_type = event.get("type")
+    if event_type == telemetry.BATTLE_START:
+        boss = " 👑" if event.get("is_boss") else ""
+        return (f"⚔️ Level {event.get('player_level')} {event.get('player_class')} vs "
+                f"{str(event.get('rarity')).title()} {event.get('monster_type')}{boss} "
+                f"(HP {event.get('monster_hp')}, Attack {event.get('monster_attack')})")
+    if event_type == telemetry.BATTLE_ACTION:
+        return f"\n🎯 Turn {event.get('turn')}: {event.get('name')}"
+    if event_type == telemetry.DAMAGE_DEALT:
+        return f"   💥 Monster takes {event.get('amount')} damage"
+    if event_type == telemetry.DAMAGE_TAKEN:
+        if event.get("dodged"):
+            return "   💨 Dodged the monster's attack"
+        defending = " (defending)" if event.get("defending") else ""
+        return f"   👹 Player takes {event.get('amount')} damage{defending}"
+    if event_type == telemetry.POTION_USED:
+        return f"   🧪 Drinks a {event.get('potion')} potion"
+    if event_type == telemetry.BATTLE_END:
+        return (f"\n🏁 {str(event.get('outcome')).title()} after {event.get('turns')} turns "
+                f"(player HP {event.get('player_hp')}, monster HP {event.get('monster_hp')})")
+    return None
+
+def replay(index, doc_id, delay=0.0):
+    """Print a recorded battle turn by turn"""
+    for event in index.battle_events(doc_id):
+        line = describe_event(event)
+        if line is None:
+            continue
+        if delay and event.get("type") == telemetry.BATTLE_ACTION:
+            time.sleep(delay)
+        console.print(line)
+
+def _level_range(text):
+    low, _, high = text.partition("-")
+    if not low.isdigit() or not (high or low).isdigit() or int(low) > int(high or low):
+        raise argparse.ArgumentTypeError(f"'{text}' is not a level or range, use e.g. 12 or 10-15")
+    return int(low), int(high or low)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index and query recorded Python Adventure RPG battles")
+    parser.add_argument("logs", nargs="?", default="telemetry", help="Telemetry directory (default: telemetry)")
+    parser.add_argument("--monster", help="Monster type, e.g. 'Void Wraith'")
+    parser.add_argument("--rarity", choices=["common", "uncommon", "rare", "legendary"])
+    parser.add_argument("--boss", choices=["yes", "no"])
+    parser.add_argument("--class", dest="player_class", choices=["Warrior", "Mage", "Rogue"])
+    parser.add_argument("--level", type=_level_range, metavar="MIN[-MAX]", help="Player level or range, e.g. 10-15")
+    parser.add_argument("--outcome", choices=["victory", "defeat", "escaped"])
+    parser.add_argument("--used", action="append", default=[], choices=["health_potion", "mana_potion"],
+                        help="Item used during the battle (repeatable)")
+    parser.add_argument("--action", action="append", default=[], choices=["1", "2", "3", "4", "5", "6"],
+                        help="Battle action key used during the battle (repeatable)")
+    parser.add_argument("--limit", type=int, default=20, help="Matches to list (default: 20)")
+    parser.add_argument("--replay", type=int, metavar="N", help="Replay the N-th listed match")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between replayed turns")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.logs):
+        console.print(f"❌ Telemetry directory {args.logs} not found!", style="bold red")
+        return 2
+
+    index = BattleIndex(args.logs)
+    started = time.perf_counter()
+    added = index.update()
+    indexed = time.perf_counter()
+
+    min_level, max_level = args.level if args.level else (None, None)
+    matches = index.query(
+        monster=args.monster,
+        rarity=args.rarity,
+        boss=None if args.boss is None else args.boss == "yes",
+        player_class=args.player_class,
+        min_level=min_level,
+        max_level=max_level,
+        outcome=args.outcome,
+        used=args.used,
+        actions=args.action
+    )
+    queried = time.perf_counter()
+
+    console.print(f"📇 {index.doc_count} battles indexed (+{added} in {(indexed - started) * 1000:.0f} ms), "
+                  f"{len(matches)} match ({(queried - indexed) * 1000:.1f} ms)", style="cyan")
+
+    shown = matches[:args.limit]
+    if shown:
+        table = Table(title="🔎 Matching Battles")
+        for column in ("#", "Battle", "Class", "Level", "Monster", "Rarity", "Outcome", "Turns"):
+            table.add_column(column)
+        for number, doc_id in enumerate(shown, 1):
+            event = index.summary(doc_id)
+            table.add_row(
+                str(number), str(event.get("battle_id")), str(event.get("player_class")),
+                str(event.get("player_level")), str(event.get("monster_type")),
+                str(event.get("rarity")), str(event.get("outcome")), str(event.get("turns"))
+            )
+        console.print(table)
+
+    if args.replay:
+        if not 1 <= args.replay <= len(shown):
+            console.print(f"❌ No match number {args.replay} to replay!", style="bold red")
+            return 1
+        replay(index, shown[args.replay - 1], args.delay)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
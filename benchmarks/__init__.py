@@ -0,0 +1,2 @@
+# benchmarks - Seeded micro- and macro-benchmarks for core game paths
+"""Run with: python -m benchmarks [--output results.json] [--compare baseline.json]"""
@@ -0,0 +1,68 @@
+# benchmarks/__main__.py - python -m benchmarks
+import argparse
+import sys
+from rich.console import Console
+from rich.table import Table
+from benchmarks.cases import BENCHMARKS
+from benchmarks.runner import run_all, compare, load_results, save_results
+
+console = Console()
+
+def _format_ns(value):
+    if value is None:
+        return "-"
+    if value >= 1e6:
+        return f"{value / 1e6:.2f} ms"
+    if value >= 1e3:
+        return f"{value / 1e3:.2f} µs"
+    return f"{value:.0f} ns"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark core game paths")
+    parser.add_argument("-k", "--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed runs before measuring (default: 2)")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed runs per benchmark (default: 10)")
+    parser.add_argument("--output", metavar="FILE", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare medians against a saved JSON result")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown flagged as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if not names:
+        console.print(f"❌ No benchmark matches {args.filter!r}", style="bold red")
+        return 2
+
+    def progress(name, result):
+        console.print(f"⏱️ {name}: {_format_ns(result['median_ns'])} per op "
+                      f"(±{_format_ns(result['stdev_ns'])})", style="cyan")
+
+    results = run_all(names, args.warmup, args.repeats, progress)
+    if args.output:
+        save_results(results, args.output)
+        console.print(f"💾 Results written to {args.output}", style="green")
+
+    if not args.compare:
+        return 0
+
+    table = Table(title=f"📊 Compared with {args.compare}")
+    for column in ("Benchmark", "Baseline", "Current", "Change"):
+        table.add_column(column, justify="left" if column == "Benchmark" else "right")
+    regressions = 0
+    for name, before, after, change, regressed in compare(results, load_results(args.compare), args.threshold):
+        regressions += regressed
+        if change is None:
+            change_text = "[dim]new[/dim]"
+        else:
+            style = "bold red" if regressed else "green" if change < -args.threshold else "white"
+            change_text = f"[{style}]{change * 100:+.1f}%[/{style}]"
+        table.add_row(name, _format_ns(before), _format_ns(after), change_text)
+    console.print(table)
+
+    if regressions:
+        console.print(f"❌ {regressions} benchmark(s) regressed by more than {args.threshold * 100:.0f}%", style="bold red")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
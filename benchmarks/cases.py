@@ -0,0 +1,162 @@
+# benchmarks/cases.py - The benchmarked game paths
+import asyncio
+import os
+import tempfile
+import terminal
+from benchmarks.headless import ScriptedIO
+from catalog import EQUIPMENT_CATALOG
+from combat import ActionMask, Combat, create_battle_actions
+from monsters import Monster, REGULAR_MONSTER_TYPES
+from player import Player
+from shop import Shop
+from loot import LOOT_TABLES
+
+BENCHMARKS = {}
+
+def benchmark(name, operations=1):
+    """Register a benchmark
+
+    The function does the untimed setup and returns a callable that runs
+    `operations` operations, only that callable is timed.
+    """
+    def decorator(func):
+        BENCHMARKS[name] = (func, operations)
+        return func
+    return decorator
+
+def _player(level=5, player_class="Warrior"):
+    player = Player("Bench", player_class)
+    for _ in range(level - 1):
+        player.level_up()
+    return player
+
+def _sturdy_monster():
+    # Enough HP that a run of turns never ends the battle
+    return Monster("Training Dummy", 100000, 10, 5, REGULAR_MONSTER_TYPES[0])
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+def _quiet():
+    """Send game output of this benchmark to the null console"""
+    terminal.use_io(ScriptedIO())
+
+@benchmark("monster.create_monster", operations=1000)
+def bench_create_monster():
+    _quiet()
+
+    def run():
+        for level in range(1, 1001):
+            Monster.create_monster(level % 20 + 1)
+    return run
+
+@benchmark("combat.turn", operations=200)
+def bench_combat_turn():
+    terminal.use_io(ScriptedIO(("1", "")))
+    player = _player()
+    player._max_hp = player.hp = 100000
+    combat = Combat(player, _sturdy_monster())
+
+    async def turns():
+        for _ in range(200):
+            await combat._player_turn()
+            await combat._monster_turn()
+            combat._end_turn()
+    return lambda: _run(turns())
+
+@benchmark("combat.full_battle", operations=20)
+def bench_full_battle():
+    terminal.use_io(ScriptedIO(("1", "")))
+    fights = []
+    for _ in range(20):
+        player = _player()
+        fights.append(Combat(player, Monster.create_monster(player.level)))
+
+    async def battles():
+        for combat in fights:
+            await combat.start_battle()
+    return lambda: _run(battles())
+
+@benchmark("combat.render_frame", operations=100)
+def bench_render_frame():
+    _quiet()
+    combat = Combat(_player(), Monster.create_monster(5))
+
+    def run():
+        for _ in range(100):
+            combat._display_battle_status()
+    return run
+
+@benchmark("combat.action_mask", operations=10000)
+def bench_action_mask():
+    _quiet()
+    player = _player()
+    actions = create_battle_actions()
+
+    def run():
+        for turn in range(10000):
+            player.special_cooldown = turn % 3
+            ActionMask.compute(actions, player)
+    return run
+
+@benchmark("combat.battle_state", operations=10000)
+def bench_battle_state():
+    _quiet()
+    player = _player()
+    combat = Combat(player, _sturdy_monster(), practice=True)
+    start = combat.battle_state()
+
+    def run():
+        for turn in range(5000):
+            player.hp = player.max_hp - turn % 50
+            combat.battle_state()
+            combat.restore_battle_state(start)
+    return run
+
+@benchmark("loot.roll", operations=10000)
+def bench_loot_roll():
+    def run():
+        for _ in range(5000):
+            LOOT_TABLES.roll("Goblin", "common")
+            LOOT_TABLES.roll("Crimson Dragon", "legendary", 4.0)
+    return run
+
+@benchmark("player.stat_access", operations=10000)
+def bench_stat_access():
+    _quiet()
+    player = _player()
+
+    def run():
+        for _ in range(2500):
+            player.total_attack
+            player.total_max_hp
+            player.attack
+            player.max_hp
+    return run
+
+@benchmark("player.save_load_roundtrip", operations=50)
+def bench_save_load():
+    _quiet()
+    player = _player()
+    # Removed when the returned callable is dropped
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, "bench.json")
+
+    def run():
+        for _ in range(50):
+            player.save_to_file(path)
+            Player.load_from_file(path)
+    run.directory = directory
+    return run
+
+@benchmark("shop.available_equipment", operations=1000)
+def bench_available_equipment():
+    _quiet()
+    shop = Shop(_player())
+    categories = EQUIPMENT_CATALOG.categories
+
+    def run():
+        for _ in range(1000 // len(categories)):
+            for category in categories:
+                shop.get_available_equipment(category)
+    return run
@@ -0,0 +1,38 @@
+# benchmarks/headless.py - Scripted player input and a console that renders to nowhere
+import io
+import itertools
+from rich.console import Console
+from terminal import TerminalIO
+
+class NullFile(io.TextIOBase):
+    """Text sink that throws everything away"""
+
+    def write(self, text):
+        return len(text)
+
+def null_console(width=100):
+    """A Rich console that renders fully but writes nothing"""
+    return Console(file=NullFile(), width=width, force_terminal=True, color_system="truecolor",
+                   legacy_windows=False)
+
+class ScriptedIO(TerminalIO):
+    """Answers every prompt from a repeating script instead of a player"""
+
+    def __init__(self, answers=("1",), console=None):
+        super().__init__(console or null_console())
+        self._answers = itertools.cycle(answers)
+
+    async def input(self, prompt=""):
+        return next(self._answers)
+
+    async def ask(self, prompt, choices=None, default=None, checkpoint=False, observe=None):
+        answer = next(self._answers)
+        if choices and answer not in choices:
+            return default
+        return answer or default
+
+    async def confirm(self, prompt, default=False, observe=None):
+        return next(self._answers) in ("y", "")
+
+    async def status(self, message, seconds):
+        pass
@@ -0,0 +1,70 @@
+# benchmarks/runner.py - Warmup, repeated runs, JSON results and baseline comparison
+import json
+import platform
+import random
+import statistics
+import time
+from benchmarks.cases import BENCHMARKS
+
+SEED = 1234
+
+def run_benchmark(name, warmup=2, repeats=10):
+    """Time one benchmark, returns per-operation statistics in nanoseconds
+
+    Every run gets a fresh setup, only the callable it returns is timed.
+    """
+    setup, operations = BENCHMARKS[name]
+    for run in range(warmup):
+        random.seed(SEED + run)
+        setup()()
+
+    timings = []
+    for run in range(repeats):
+        # Same seed for the same run number, so every result sees the same rolls
+        random.seed(SEED + run)
+        func = setup()
+        start = time.perf_counter_ns()
+        func()
+        timings.append((time.perf_counter_ns() - start) / operations)
+
+    return {
+        "operations": operations,
+        "runs": repeats,
+        "min_ns": min(timings),
+        "median_ns": statistics.median(timings),
+        "mean_ns": statistics.fmean(timings),
+        "stdev_ns": statistics.stdev(timings) if repeats > 1 else 0.0
+    }
+
+def run_all(names, warmup=2, repeats=10, progress=None):
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(name, warmup, repeats)
+        if progress:
+            progress(name, results[name])
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": SEED,
+        "benchmarks": results
+    }
+
+def compare(results, baseline, threshold=0.10):
+    """Rows of (name, baseline median, current median, change, regressed)"""
+    rows = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            rows.append((name, None, current["median_ns"], None, False))
+            continue
+        change = current["median_ns"] / previous["median_ns"] - 1
+        rows.append((name, previous["median_ns"], current["median_ns"], change, change > threshold))
+    return rows
+
+def load_results(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def save_results(results, path):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2)
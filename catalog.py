@@ -0,0 +1,75 @@
+# catalog.py - Immutable equipment catalog loaded once from data/equipment.json
+import json
+import os
+from bisect import bisect_right
+from types import MappingProxyType
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "equipment.json")
+
+class EquipmentCatalog:
+    """Read-only equipment catalog with level-indexed availability"""
+
+    def __init__(self, raw_catalog):
+        items_by_id = {}
+        by_level = {}
+        self._level_keys = {}
+        self._available = {}
+
+        for category, items in raw_catalog.items():
+            frozen_items = sorted(
+                (MappingProxyType(dict(item)) for item in items),
+                key=lambda item: (item["level"], item["id"])
+            )
+
+            levels = {}
+            for item in frozen_items:
+                if item["id"] in items_by_id:
+                    raise ValueError(f"Duplicate equipment id {item['id']}")
+                items_by_id[item["id"]] = item
+                levels.setdefault(item["level"], []).append(item)
+
+            # Precompute "available at level >= L" for every unlock level
+            level_keys = tuple(sorted(levels))
+            available = []
+            cumulative = ()
+            for level_req in level_keys:
+                cumulative = cumulative + tuple(levels[level_req])
+                available.append(cumulative)
+
+            self._level_keys[category] = level_keys
+            self._available[category] = tuple(available)
+            by_level[category] = MappingProxyType({level: tuple(items) for level, items in levels.items()})
+
+        self._items_by_id = MappingProxyType(items_by_id)
+        self._by_level = MappingProxyType(by_level)
+
+    @property
+    def items_by_id(self):
+        return self._items_by_id
+
+    @property
+    def equipment_db(self):
+        """Items grouped by category and unlock level"""
+        return self._by_level
+
+    @property
+    def categories(self):
+        return tuple(self._by_level)
+
+    def get_item(self, item_id):
+        """Look up an item by its stable integer id"""
+        return self._items_by_id.get(item_id)
+
+    def available_equipment(self, category, level):
+        """All items of a category unlocked at the given level (shared tuple, no copy)"""
+        index = bisect_right(self._level_keys[category], level)
+        if index == 0:
+            return ()
+        return self._available[category][index - 1]
+
+def load_catalog(path=CATALOG_PATH):
+    """Load an equipment catalog from a JSON data file"""
+    with open(path, 'r') as file:
+        return EquipmentCatalog(json.load(file))
+
+EQUIPMENT_CATALOG = load_catalog()
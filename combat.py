@@ -1,14 +1,28 @@
 import random
+import uuid
 from abc import ABC, abstractmethod
-from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, BarColumn, TextColumn
 from rich.table import Table
-from rich.prompt import Prompt, Confirm
 from rich.text import Text
+import terminal
+import telemetry
+import metrics
+from terminal import console
 from utils import get_user_choice
+from monsters import Monster
+from items import HEALTH_POTION, MANA_POTION
+import damage
 
-console = Console()
+# Reasons an action is unavailable, shared by the menu, bots and AIs
+ON_COOLDOWN = "cooldown"
+NOT_ENOUGH_MANA = "not_enough_mana"
+NO_POTIONS = "no_potions"
+HP_FULL = "hp_full"
+MANA_FULL = "mana_full"
+
+# Menu choice that rewinds the battle in practice mode
+REWIND_KEY = "7"
 
 class BattleAction(ABC):
     """Abstract base class for battle actions"""
@@ -18,10 +32,13 @@ class BattleAction(ABC):
         """Execute the battle action"""
         pass
     
-    @abstractmethod
+    def unavailable_reason(self, player):
+        """Reason code the action can't be used right now, None when it can"""
+        return None
+    
     def can_execute(self, player):
         """Check if the action can be executed"""
-        pass
+        return self.unavailable_reason(player) is None
     
     @property
     @abstractmethod
@@ -34,17 +51,10 @@ class RegularAttack(BattleAction):
     def action_name(self):
         return "Regular Attack"
     
-    def can_execute(self, player):
-        return True
-    
     def execute(self, player, monster):
-        damage_variance = random.randint(-3, 3)
-        player_damage = player.attack + damage_variance
-        
-        # Critical hit logic
-        is_critical = random.random() < 0.10  # 10% chance
-        if is_critical:
-            player_damage = int(player_damage * 1.5)
+        # Variance, then the critical roll (with the Rogue's bonus chance)
+        player_damage, event = damage.pipeline_for(damage.ATTACK, player, monster).roll(player.attack)
+        if event == damage.CRITICAL:
             console.print(f"\n💥 CRITICAL HIT! 💥", style="bold yellow")
         
         console.print(f"⚔️  You attack {monster.name} for [bold red]{player_damage}[/bold red] damage!", style="bold green")
@@ -56,14 +66,17 @@ class SpecialAttack(BattleAction):
     def action_name(self):
         return "Special Attack"
     
-    def can_execute(self, player):
-        return player.special_cooldown == 0 and player.mana >= player.special_mana_cost
+    def unavailable_reason(self, player):
+        if player.special_cooldown > 0:
+            return ON_COOLDOWN
+        if player.mana < player.special_mana_cost:
+            return NOT_ENOUGH_MANA
+        return None
     
     def execute(self, player, monster):
         success, message = player.use_special_attack()
         if success:
-            damage_variance = random.randint(-5, 5)
-            player_damage = player.special_damage + damage_variance
+            player_damage, _ = damage.pipeline_for(damage.SPECIAL, player, monster).roll(player.special_damage)
             
             if player.player_class == "Warrior":
                 console.print(f"\n💥 You use [bold yellow]MIGHTY SLASH[/bold yellow] on {monster.name}!", style="bold red")
@@ -86,8 +99,12 @@ class UseHealthPotion(BattleAction):
     def action_name(self):
         return "Use Health Potion"
     
-    def can_execute(self, player):
-        return player.inventory["health_potions"] > 0 and player.hp < player.max_hp
+    def unavailable_reason(self, player):
+        if player.item_count(HEALTH_POTION) <= 0:
+            return NO_POTIONS
+        if player.hp >= player.max_hp:
+            return HP_FULL
+        return None
     
     def execute(self, player, monster):
         player.use_health_potion()
@@ -98,8 +115,12 @@ class UseManaPotion(BattleAction):
     def action_name(self):
         return "Use Mana Potion"
     
-    def can_execute(self, player):
-        return player.inventory["mana_potions"] > 0 and player.mana < player.max_mana
+    def unavailable_reason(self, player):
+        if player.item_count(MANA_POTION) <= 0:
+            return NO_POTIONS
+        if player.mana >= player.max_mana:
+            return MANA_FULL
+        return None
     
     def execute(self, player, monster):
         player.use_mana_potion()
@@ -110,9 +131,6 @@ class DefendAction(BattleAction):
     def action_name(self):
         return "Defend"
 
-    def can_execute(self, player):
-        return True
-
     def execute(self, player, monster):
         console.print(f"\n🛡️ You brace for the next attack, reducing incoming damage!", style="bold blue")
         return "defend"
@@ -122,9 +140,6 @@ class TryEscape(BattleAction):
     def action_name(self):
         return "Try to Run Away"
     
-    def can_execute(self, player):
-        return True
-    
     def execute(self, player, monster):
         escape_chance = random.randint(1, 100)
         if escape_chance <= 30:  # 30% chance to escape
@@ -134,22 +149,77 @@ class TryEscape(BattleAction):
             console.print(f"\n❌ You couldn't escape from {monster.name}!", style="bold red")
             return "continue"
 
+def create_battle_actions():
+    """Battle actions keyed by their menu choice"""
+    return {
+        "1": RegularAttack(),
+        "2": SpecialAttack(),
+        "3": UseHealthPotion(),
+        "4": UseManaPotion(),
+        "5": TryEscape(),
+        "6": DefendAction()
+    }
+
+class ActionMask:
+    """Legal actions for one turn as a bitmask, with the reason each illegal one is blocked
+
+    Bit i stands for the i-th action in menu order. Computed once per turn so
+    the menu, the validator, bots and search-based AIs all share one answer.
+    """
+
+    def __init__(self, keys, bits, reasons):
+        self.keys = keys
+        self.bits = bits
+        # key -> reason code, only for illegal actions
+        self.reasons = reasons
+
+    @classmethod
+    def compute(cls, actions, player):
+        """Mask of actions (keyed in menu order) for the player's current state"""
+        bits = 0
+        reasons = {}
+        for index, (key, action) in enumerate(actions.items()):
+            reason = action.unavailable_reason(player)
+            if reason is None:
+                bits |= 1 << index
+            else:
+                reasons[key] = reason
+        return cls(tuple(actions), bits, reasons)
+
+    def is_legal(self, key):
+        return key in self.keys and key not in self.reasons
+
+    @property
+    def legal_keys(self):
+        return [key for key in self.keys if key not in self.reasons]
+
 class Combat:
-    def __init__(self, player, monster):
+    """One battle between the player and a monster
+
+    In practice mode the state at the start of every turn is kept, so the
+    player can rewind to an earlier turn and play on from there. States are
+    small tuples that share whatever did not change, so the history costs a
+    few hundred bytes per turn; battle_state()/restore_battle_state() are
+    the same primitive a search can use to try moves and back out of them.
+    """
+
+    def __init__(self, player, monster, on_checkpoint=None, practice=False):
         self._player = player
         self._monster = monster
         self._turn = 1
         self._player_is_defending = False
+        self.battle_id = uuid.uuid4().hex[:16]
+        # Awaited with the battle at the start of every turn so it can be persisted
+        self._on_checkpoint = on_checkpoint
         
         # Initialize battle actions
-        self.actions = {
-            "1": RegularAttack(),
-            "2": SpecialAttack(),
-            "3": UseHealthPotion(),
-            "4": UseManaPotion(),
-            "5": TryEscape(),
-            "6": DefendAction()
-        }
+        self.actions = create_battle_actions()
+        self._action_mask = None
+        
+        self.practice = practice
+        # Battle states at the start of each turn, from turn _history_start on
+        self._history = []
+        self._history_start = 1
     
     @property
     def player(self):
@@ -169,30 +239,146 @@ class Combat:
             raise ValueError("Turn number must be positive")
         self._turn = value
     
-    def start_battle(self):
-        """Main battle function"""
-        console.clear()
-        
-        # Create battle start panel
-        battle_panel = Panel.fit(
-            f"🗡️  BATTLE BEGINS! 🗡️\n\nA wild [bold red]{self.monster.name}[/bold red] appears!\n"
-            f"HP: [red]{self.monster.hp}[/red] | Attack: [yellow]{self.monster.attack}[/yellow]",
-            title="⚔️ COMBAT ⚔️",
-            border_style="red"
+    @property
+    def action_mask(self):
+        """Legal actions at this turn's menu"""
+        if self._action_mask is None:
+            self._action_mask = ActionMask.compute(self.actions, self._player)
+        return self._action_mask
+    
+    def snapshot(self):
+        """Compact tuple of the battle state (the player is saved separately)"""
+        return (self._turn, self._player_is_defending, self._monster.snapshot(), self.battle_id)
+    
+    @classmethod
+    def from_snapshot(cls, player, snapshot, on_checkpoint=None, practice=False):
+        """Restore a battle from snapshot() against a player"""
+        turn, player_is_defending, monster = snapshot[:3]
+        combat = cls(player, Monster.from_snapshot(monster), on_checkpoint, practice)
+        combat.turn = turn
+        combat._player_is_defending = player_is_defending
+        if len(snapshot) > 3:
+            combat.battle_id = snapshot[3]
+        return combat
+    
+    def battle_state(self):
+        """Immutable (turn, defending, player state, monster state) tuple of the battle right now"""
+        return (self._turn, self._player_is_defending, self._player.battle_state(), self._monster.battle_state())
+    
+    def restore_battle_state(self, state):
+        """Put the battle, player and monster back in a state from battle_state()"""
+        turn, player_is_defending, player_state, monster_state = state
+        self._turn = turn
+        self._player_is_defending = player_is_defending
+        self._player.restore_battle_state(player_state)
+        self._monster.restore_battle_state(monster_state)
+        self._action_mask = None
+    
+    @property
+    def rewind_turns(self):
+        """Turns that can be rewound to, oldest first"""
+        return list(range(self._history_start, self._history_start + len(self._history)))
+    
+    def _record_turn(self):
+        if not self._history:
+            self._history_start = self._turn
+        self._history.append(self.battle_state())
+    
+    def rewind_to(self, turn):
+        """Go back to the start of an earlier turn, forgetting the turns after it"""
+        if not self.practice:
+            raise ValueError("Rewinding is only allowed in practice mode")
+        index = turn - self._history_start
+        if not 0 <= index < len(self._history):
+            raise ValueError(f"Turn {turn} is not in the battle history")
+        from_turn = self._turn
+        state = self._history[index]
+        # The turn is recorded again when the battle loop reaches it
+        del self._history[index:]
+        self.restore_battle_state(state)
+        telemetry.publish(telemetry.BATTLE_REWIND, battle_id=self.battle_id, from_turn=from_turn, to_turn=turn)
+    
+    def rewind(self, turns=1):
+        """Go back a number of turns"""
+        self.rewind_to(self._turn - turns)
+    
+    def observation(self):
+        """Observable battle state at the action prompt, for bots"""
+        mask = self.action_mask
+        return {
+            "screen": "battle",
+            "battle_id": self.battle_id,
+            "turn": self._turn,
+            "player": self._player.observation(),
+            "monster": self._monster.observation(),
+            "actions": {key: action.action_name for key, action in self.actions.items()},
+            "legal_actions": mask.legal_keys,
+            "unavailable": mask.reasons,
+            "rewind_turns": self.rewind_turns[:-1] if self.practice else []
+        }
+    
+    def _battle_fields(self):
+        """Telemetry fields identifying the battle"""
+        monster_type = self._monster.monster_type
+        return {
+            "battle_id": self.battle_id,
+            "player_class": self._player.player_class,
+            "player_level": self._player.level,
+            "monster_type": monster_type.base_name if monster_type else None,
+            "rarity": self._monster.rarity,
+            "is_boss": self._monster.is_boss,
+            "monster_level": self._monster.level
+        }
+    
+    def _finish(self, outcome):
+        metrics.increment(f"battles.{outcome}")
+        telemetry.publish(
+            telemetry.BATTLE_END,
+            outcome=outcome,
+            turns=self._turn,
+            player_hp=self._player.hp,
+            monster_hp=self._monster.hp,
+            **self._battle_fields()
         )
-        console.print(battle_panel)
-        console.input("\nPress Enter to start battle...")
+        return outcome
+    
+    async def start_battle(self, resume=False):
+        """Main battle function, resume=True continues a restored battle"""
+        if not resume:
+            console.clear()
+            
+            # Create battle start panel
+            battle_panel = Panel.fit(
+                f"🗡️  BATTLE BEGINS! 🗡️\n\nA wild [bold red]{self.monster.name}[/bold red] appears!\n"
+                f"HP: [red]{self.monster.hp}[/red] | Attack: [yellow]{self.monster.attack}[/yellow]",
+                title="⚔️ COMBAT ⚔️",
+                border_style="red"
+            )
+            console.print(battle_panel)
+            telemetry.publish(
+                telemetry.BATTLE_START,
+                monster_hp=self._monster.max_hp,
+                monster_attack=self._monster.attack,
+                **self._battle_fields()
+            )
+            await terminal.input("\nPress Enter to start battle...")
         
         # Battle loop
         while self.monster.is_alive and self.player.is_alive:
+            if self.practice:
+                self._record_turn()
+            if self._on_checkpoint:
+                await self._on_checkpoint(self)
             console.clear()
             self._display_battle_status()
             
             # Player turn
-            action_result = self._player_turn()
+            action_result = await self._player_turn()
             
             if action_result == "escaped":
-                return "escaped"
+                return self._finish("escaped")
+            elif action_result == "rewound":
+                continue
             elif action_result == "skip_monster_turn":
                 self._end_turn()
                 continue
@@ -201,23 +387,27 @@ class Combat:
             if not self.monster.is_alive:
                 console.print(f"\n🏆 {self.monster.name} is defeated!", style="bold green")
                 console.print("🎉 Victory!", style="bold yellow")
-                console.input("\nPress Enter to continue...")
-                return "victory"
+                await terminal.input("\nPress Enter to continue...")
+                return self._finish("victory")
             
             # Monster turn (only if player didn't use potions)
             if action_result != "skip_monster_turn":
-                self._monster_turn()
+                await self._monster_turn()
                 
                 # Check if player is defeated
                 if not self.player.is_alive:
                     console.print(f"\n💀 You have been defeated by {self.monster.name}!", style="bold red")
-                    console.input("Press Enter to continue...")
-                    return "defeat"
+                    if self.practice and await terminal.confirm("⏪ Rewind and try again?", default=True):
+                        await self._rewind_prompt(self.rewind_turns)
+                        continue
+                    await terminal.input("Press Enter to continue...")
+                    return self._finish("defeat")
             
             self._end_turn()
         
         return "ongoing"
     
+    @metrics.timed("combat.display_battle_status")
     def _display_battle_status(self):
         """Display current battle status with Rich formatting"""
         # Create battle status table
@@ -257,9 +447,9 @@ class Combat:
         inventory_text.append("💰 Gold: ", style="yellow")
         inventory_text.append(str(self.player.gold), style="bold yellow")
         inventory_text.append(" | 🧪 Health Potions: ", style="red")
-        inventory_text.append(str(self.player.inventory['health_potions']), style="bold red")
+        inventory_text.append(str(self.player.item_count(HEALTH_POTION)), style="bold red")
         inventory_text.append(" | 🔮 Mana Potions: ", style="blue")
-        inventory_text.append(str(self.player.inventory['mana_potions']), style="bold blue")
+        inventory_text.append(str(self.player.item_count(MANA_POTION)), style="bold blue")
         
         console.print(Panel(inventory_text, title="💼 Inventory", border_style="green"))
     
@@ -294,66 +484,109 @@ class Combat:
         empty = "░" * (10 - filled_blocks)
         return f"[blue]{filled}[/blue][dim]{empty}[/dim]"
     
-    def _player_turn(self):
+    @metrics.timed("combat.player_turn")
+    async def _player_turn(self):
         """Handle player's turn"""
         self._player_is_defending = False
         console.print("\n🎯 Choose your action:", style="bold cyan")
         
         # Display available actions
+        mask = self._action_mask = ActionMask.compute(self.actions, self.player)
         for key, action in self.actions.items():
-            status = ""
-            if not action.can_execute(self.player):
-                if isinstance(action, SpecialAttack):
-                    if self.player.special_cooldown > 0:
-                        status = f" [dim](COOLDOWN: {self.player.special_cooldown} turns)[/dim]"
-                    elif self.player.mana < self.player.special_mana_cost:
-                        status = f" [dim](Need {self.player.special_mana_cost} mana, have {self.player.mana})[/dim]"
-                elif isinstance(action, UseHealthPotion):
-                    if self.player.inventory["health_potions"] <= 0:
-                        status = " [dim](No potions)[/dim]"
-                    elif self.player.hp >= self.player.max_hp:
-                        status = " [dim](HP full)[/dim]"
-                elif isinstance(action, UseManaPotion):
-                    if self.player.inventory["mana_potions"] <= 0:
-                        status = " [dim](No potions)[/dim]"
-                    elif self.player.mana >= self.player.max_mana:
-                        status = " [dim](Mana full)[/dim]"
-            
+            reason = mask.reasons.get(key)
+            status = f" [dim]({self._reason_text(reason)})[/dim]" if reason else ""
             console.print(f"{key}. {action.action_name}{status}")
         
-        choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5", "6"], default="1")
+        choices = mask.legal_keys
+        # Earlier turns only, the current one is where the player already is
+        rewind_turns = self.rewind_turns[:-1] if self.practice else []
+        if rewind_turns:
+            console.print(f"{REWIND_KEY}. ⏪ Rewind [dim](practice)[/dim]")
+            choices = choices + [REWIND_KEY]
+        
+        # Waiting for the action is a safe point to park an idle session
+        choice = await terminal.ask("Enter your choice", choices=choices, default="1",
+                                    checkpoint=True, observe=self.observation)
+        
+        if choice == REWIND_KEY:
+            await self._rewind_prompt(rewind_turns)
+            return "rewound"
         
         action = self.actions[choice]
-        if action.can_execute(self.player):
+        if mask.is_legal(choice):
+            monster_hp = self.monster.hp
             result = action.execute(self.player, self.monster)
+            # The action changed the player, so the next menu needs a fresh mask
+            self._action_mask = None
+            if telemetry.is_enabled():
+                self._publish_action(choice, action, result, monster_hp - self.monster.hp)
             if result == "defend":
                 self._player_is_defending = True
             if result != "retry":
-                console.input("\nPress Enter to continue...")
+                await terminal.input("\nPress Enter to continue...")
             return result
         else:
             console.print("❌ Cannot perform that action right now!", style="bold red")
-            console.input("\nPress Enter to continue...")
+            await terminal.input("\nPress Enter to continue...")
             return "retry"
     
-    def _monster_turn(self):
+    async def _rewind_prompt(self, turns):
+        """Ask which turn to go back to and rewind there"""
+        turn = await terminal.ask("⏪ Go back to the start of turn", choices=[str(t) for t in turns],
+                                  default=str(turns[-1]))
+        self.rewind_to(int(turn))
+        console.print(f"⏪ Rewound to turn {turn}", style="bold cyan")
+    
+    def _reason_text(self, reason):
+        """Menu hint for an unavailable action"""
+        if reason == ON_COOLDOWN:
+            return f"COOLDOWN: {self.player.special_cooldown} turns"
+        if reason == NOT_ENOUGH_MANA:
+            return f"Need {self.player.special_mana_cost} mana, have {self.player.mana}"
+        if reason == NO_POTIONS:
+            return "No potions"
+        if reason == HP_FULL:
+            return "HP full"
+        if reason == MANA_FULL:
+            return "Mana full"
+        return reason
+    
+    def _publish_action(self, key, action, result, damage):
+        telemetry.publish(telemetry.BATTLE_ACTION, battle_id=self.battle_id, turn=self._turn,
+                          action=key, name=action.action_name, result=result)
+        if damage > 0:
+            telemetry.publish(telemetry.DAMAGE_DEALT, battle_id=self.battle_id, turn=self._turn,
+                              action=key, amount=damage)
+        if isinstance(action, (UseHealthPotion, UseManaPotion)):
+            potion = "health" if isinstance(action, UseHealthPotion) else "mana"
+            telemetry.publish(telemetry.POTION_USED, battle_id=self.battle_id, turn=self._turn,
+                              potion=potion, player_class=self._player.player_class,
+                              player_level=self._player.level)
+    
+    @metrics.timed("combat.monster_turn")
+    async def _monster_turn(self):
         """Handle monster's turn"""
-        if random.random() < 0.15: # 15% dodge chance
+        # Dodge, variance, the defend halving and the player's damage reduction
+        pipeline = damage.pipeline_for(damage.MONSTER_ATTACK, self.monster, self.player, self._player_is_defending)
+        monster_damage, event = pipeline.roll(self.monster.attack)
+        
+        if event == damage.DODGED:
             console.print(f"\n💨 You deftly DODGED the {self.monster.name}'s attack!", style="bold cyan")
-            console.input("Press Enter to continue...")
+            telemetry.publish(telemetry.DAMAGE_TAKEN, battle_id=self.battle_id, turn=self._turn,
+                              amount=0, dodged=True, defending=self._player_is_defending)
+            await terminal.input("Press Enter to continue...")
             return
 
-        monster_damage_variance = random.randint(-2, 2)
-        monster_damage = self.monster.attack + monster_damage_variance
-        
         if self._player_is_defending:
-            monster_damage = int(monster_damage / 2) # Halve the damage
             console.print(f"\n🛡️ Your defense softened the blow!", style="bold blue")
 
         console.print(f"\n👹 {self.monster.name} attacks you for [bold red]{monster_damage}[/bold red] damage!", style="bold red")
+        player_hp = self.player.hp
         self.player.take_damage(monster_damage)
+        telemetry.publish(telemetry.DAMAGE_TAKEN, battle_id=self.battle_id, turn=self._turn,
+                          amount=player_hp - self.player.hp, dodged=False, defending=self._player_is_defending)
         
-        console.input("Press Enter to continue...")
+        await terminal.input("Press Enter to continue...")
     
     def _end_turn(self):
         """End the current turn"""
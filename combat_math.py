@@ -0,0 +1,89 @@
+# combat_math.py - Closed-form damage and time-to-kill calculator for encounter previews
+from functools import lru_cache
+import damage
+
+# Turn limit for the distributions and the probability mass considered negligible
+MAX_TURNS = 200
+EPSILON = 1e-12
+
+class EncounterForecast:
+    """Exact outcome distribution of a battle where the player only uses regular attacks"""
+
+    def __init__(self, player_damage, monster_damage, turns_to_kill, turns_to_die):
+        self.player_damage = player_damage
+        self.monster_damage = monster_damage
+        # turns_to_kill[n] = P(the monster falls to the player's n-th attack)
+        self.turns_to_kill = turns_to_kill
+        # turns_to_die[n] = P(the player falls to the monster's n-th attack)
+        self.turns_to_die = turns_to_die
+
+        self.win_probability = 0.0
+        self.expected_turns_to_win = 0.0
+        survival = 1.0  # P(the player survives the first n-1 monster attacks)
+        for turn in range(1, len(turns_to_kill)):
+            if turn - 1 < len(turns_to_die):
+                survival -= turns_to_die[turn - 1]
+            # The player strikes first, so the monster's n-th attack never lands if it dies on turn n
+            win_now = turns_to_kill[turn] * max(0.0, survival)
+            self.win_probability += win_now
+            self.expected_turns_to_win += win_now * turn
+
+        if self.win_probability > 0:
+            self.expected_turns_to_win /= self.win_probability
+        self.win_probability = min(1.0, self.win_probability)
+
+    @property
+    def loss_probability(self):
+        return 1.0 - self.win_probability
+
+def damage_stats(pmf):
+    """Mean and variance of a damage distribution"""
+    mean = sum(damage * p for damage, p in pmf.items())
+    variance = sum((damage - mean) ** 2 * p for damage, p in pmf.items())
+    return mean, variance
+
+def turns_to_kill_distribution(pmf, hp):
+    """P(target with hp falls on hit n) for n = 0..MAX_TURNS, by repeated convolution"""
+    distribution = [0.0]
+    alive = {0: 1.0}  # accumulated damage -> probability, for targets still standing
+    hits = tuple(pmf.items())
+
+    for _ in range(MAX_TURNS):
+        if not alive:
+            break
+        next_alive = {}
+        killed = 0.0
+        for dealt, p in alive.items():
+            for damage, q in hits:
+                total = dealt + damage
+                if total >= hp:
+                    killed += p * q
+                else:
+                    next_alive[total] = next_alive.get(total, 0.0) + p * q
+        distribution.append(killed)
+        alive = {dealt: p for dealt, p in next_alive.items() if p > EPSILON}
+
+    return distribution
+
+@lru_cache(maxsize=1024)
+def forecast(player_pipeline, monster_pipeline, player_attack, player_hp, monster_hp, monster_attack):
+    """Forecast a battle from both sides' damage pipelines and stats (cached per combination)"""
+    player_pmf = player_pipeline.pmf(player_attack)
+    monster_pmf = monster_pipeline.pmf(monster_attack)
+    return EncounterForecast(
+        damage_stats(player_pmf),
+        damage_stats(monster_pmf),
+        turns_to_kill_distribution(player_pmf, monster_hp),
+        turns_to_kill_distribution(monster_pmf, player_hp)
+    )
+
+def forecast_encounter(player, monster):
+    """Forecast a battle between a player and a monster as they stand now"""
+    return forecast(
+        damage.pipeline_for(damage.ATTACK, player, monster),
+        damage.pipeline_for(damage.MONSTER_ATTACK, monster, player),
+        player.attack,
+        player.hp,
+        monster.hp,
+        monster.attack
+    )
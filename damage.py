@@ -0,0 +1,445 @@
+# damage.py - Damage pipeline: ordered modifier stages compiled into one function per configuration
+import argparse
+import math
+import random
+import sys
+from rich.table import Table
+from monsters import Monster, REGULAR_MONSTER_TYPES
+from terminal import console
+
+# Kinds of attack a pipeline is built for
+ATTACK = "attack"                  # a player's regular attack
+SPECIAL = "special"                # a player's special attack
+MONSTER_ATTACK = "monster_attack"  # a monster's basic attack
+
+# Notable things that happened to a hit, returned next to the damage
+CRITICAL = "critical"
+DODGED = "dodged"
+
+# Stage order, lower runs first
+ORDER_DODGE = 0
+ORDER_VARIANCE = 10
+ORDER_CRITICAL = 20
+ORDER_DEFEND = 30
+ORDER_REDUCTION = 40
+
+# Base combat rules
+PLAYER_DAMAGE_VARIANCE = 3
+SPECIAL_DAMAGE_VARIANCE = 5
+MONSTER_DAMAGE_VARIANCE = 2
+CRIT_CHANCE = 0.10
+CRIT_MULTIPLIER = 1.5
+DODGE_CHANCE = 0.15
+DEFEND_FACTOR = 0.5
+
+def _finish(damage, rng):
+    return damage, None
+
+def _distribute(stages, pmf):
+    if not stages:
+        return pmf
+    return stages[0].distribute(pmf, lambda rest_pmf: _distribute(stages[1:], rest_pmf))
+
+class DamageStage:
+    """One step of a damage pipeline
+
+    compile() wraps the rest of the pipeline in a closure that applies this
+    step to a live hit, distribute() does the same to a damage distribution,
+    so rolled and exact damage can never disagree.
+    """
+
+    order = 0
+
+    @property
+    def key(self):
+        """Hashable description, equal keys behave the same"""
+        raise NotImplementedError
+
+    @property
+    def factor(self):
+        """Average multiplier on damage, ignoring rounding"""
+        return 1.0
+
+    def merge(self, other):
+        """Single stage doing the work of both, None when they don't combine"""
+        return None
+
+    def compile(self, rest):
+        raise NotImplementedError
+
+    def distribute(self, pmf, rest):
+        raise NotImplementedError
+
+class Dodge(DamageStage):
+    """The whole hit misses with some chance"""
+
+    order = ORDER_DODGE
+
+    def __init__(self, chance):
+        self.chance = chance
+
+    @property
+    def key(self):
+        return ("dodge", self.chance)
+
+    @property
+    def factor(self):
+        return 1 - self.chance
+
+    def merge(self, other):
+        # Dodge sources roll independently, the hit lands only if neither dodges
+        if isinstance(other, Dodge):
+            return Dodge(1 - (1 - self.chance) * (1 - other.chance))
+        return None
+
+    def compile(self, rest):
+        chance = self.chance
+        def stage(damage, rng):
+            if rng.random() < chance:
+                return 0, DODGED
+            return rest(damage, rng)
+        return stage
+
+    def distribute(self, pmf, rest):
+        result = rest({damage: p * (1 - self.chance) for damage, p in pmf.items()})
+        result[0] = result.get(0, 0.0) + self.chance
+        return result
+
+class Variance(DamageStage):
+    """Uniform spread of +/- spread around the damage, never below 0"""
+
+    order = ORDER_VARIANCE
+
+    def __init__(self, spread):
+        self.spread = spread
+
+    @property
+    def key(self):
+        return ("variance", self.spread)
+
+    def compile(self, rest):
+        low, high = -self.spread, self.spread
+        def stage(damage, rng):
+            return rest(max(0, damage + rng.randint(low, high)), rng)
+        return stage
+
+    def distribute(self, pmf, rest):
+        share = 1 / (2 * self.spread + 1)
+        spread = {}
+        for damage, p in pmf.items():
+            for variance in range(-self.spread, self.spread + 1):
+                value = max(0, damage + variance)
+                spread[value] = spread.get(value, 0.0) + p * share
+        return rest(spread)
+
+class Critical(DamageStage):
+    """Multiplies the damage with some chance"""
+
+    order = ORDER_CRITICAL
+
+    def __init__(self, chance, multiplier=CRIT_MULTIPLIER):
+        self.chance = chance
+        self.multiplier = multiplier
+
+    @property
+    def key(self):
+        return ("critical", self.chance, self.multiplier)
+
+    @property
+    def factor(self):
+        return 1 + self.chance * (self.multiplier - 1)
+
+    def merge(self, other):
+        # Crit chance bonuses stack onto the same roll
+        if isinstance(other, Critical) and other.multiplier == self.multiplier:
+            return Critical(min(1.0, self.chance + other.chance), self.multiplier)
+        return None
+
+    def compile(self, rest):
+        chance, multiplier = self.chance, self.multiplier
+        def stage(damage, rng):
+            if rng.random() < chance:
+                return rest(int(damage * multiplier), rng)[0], CRITICAL
+            return rest(damage, rng)
+        return stage
+
+    def distribute(self, pmf, rest):
+        mixed = {}
+        for damage, p in pmf.items():
+            crit_damage = int(damage * self.multiplier)
+            mixed[damage] = mixed.get(damage, 0.0) + p * (1 - self.chance)
+            mixed[crit_damage] = mixed.get(crit_damage, 0.0) + p * self.chance
+        return rest(mixed)
+
+class Scale(DamageStage):
+    """Multiplies the damage and rounds down"""
+
+    def __init__(self, factor, order=ORDER_DEFEND):
+        self._factor = factor
+        self.order = order
+
+    @property
+    def key(self):
+        return ("scale", self._factor, self.order)
+
+    @property
+    def factor(self):
+        return self._factor
+
+    def compile(self, rest):
+        factor = self._factor
+        def stage(damage, rng):
+            return rest(int(damage * factor), rng)
+        return stage
+
+    def distribute(self, pmf, rest):
+        scaled = {}
+        for damage, p in pmf.items():
+            value = int(damage * self._factor)
+            scaled[value] = scaled.get(value, 0.0) + p
+        return rest(scaled)
+
+class Reduction(Scale):
+    """Takes a fraction off the damage, fractions from several sources add up"""
+
+    def __init__(self, fraction):
+        super().__init__(1 - fraction, ORDER_REDUCTION)
+        self.fraction = fraction
+
+    def merge(self, other):
+        if isinstance(other, Reduction):
+            return Reduction(min(1.0, self.fraction + other.fraction))
+        return None
+
+class DamagePipeline:
+    """Stages of one combatant configuration compiled into a single function
+
+    roll(base) applies every stage to one live hit and returns
+    (damage, event), where event is CRITICAL, DODGED or None. pmf(base) is
+    the exact distribution of the same hit and factor its average effect,
+    for the calculators. Get pipelines from compile_pipeline() or
+    pipeline_for(), which only compile a configuration once.
+    """
+
+    def __init__(self, stages):
+        self.stages = tuple(stages)
+        self.key = tuple(stage.key for stage in self.stages)
+
+        compiled = _finish
+        for stage in reversed(self.stages):
+            compiled = stage.compile(compiled)
+        self._compiled = compiled
+        self._pmfs = {}
+
+        self.factor = 1.0
+        for stage in self.stages:
+            self.factor *= stage.factor
+
+    def roll(self, base, rng=random):
+        return self._compiled(base, rng)
+
+    def pmf(self, base):
+        """{damage: probability} of one hit, cached per base damage"""
+        pmf = self._pmfs.get(base)
+        if pmf is None:
+            pmf = self._pmfs[base] = _distribute(self.stages, {base: 1.0})
+        return pmf
+
+    def mean(self, base):
+        """Exact expected damage of one hit"""
+        return sum(damage * p for damage, p in self.pmf(base).items())
+
+    def __repr__(self):
+        return f"DamagePipeline({list(self.key)})"
+
+# Stage key tuple -> its compiled pipeline
+_pipelines = {}
+
+def compile_pipeline(stages):
+    """Pipeline for a list of stages, ordered, merged and compiled once per configuration"""
+    ordered = []
+    for stage in sorted(stages, key=lambda stage: stage.order):
+        merged = ordered[-1].merge(stage) if ordered and ordered[-1].order == stage.order else None
+        if merged is not None:
+            ordered[-1] = merged
+        else:
+            ordered.append(stage)
+
+    key = tuple(stage.key for stage in ordered)
+    pipeline = _pipelines.get(key)
+    if pipeline is None:
+        pipeline = _pipelines[key] = DamagePipeline(ordered)
+    return pipeline
+
+# Functions (kind, attacker, defender, defending) -> stages, in registration order
+MODIFIERS = []
+
+# (kind, attacker profile, defender profile, defending) -> pipeline
+_configurations = {}
+
+def modifier(func):
+    """Register a function contributing stages to every pipeline
+
+    Modifiers see a CombatantProfile for a player and None for a monster,
+    so they can only read what the pipeline cache is keyed on.
+    """
+    MODIFIERS.append(func)
+    _configurations.clear()
+    return func
+
+class CombatantProfile:
+    """The part of a player a modifier may read: its class, class passives and gear
+
+    Pipelines are cached per profile, so reading anything else (level,
+    skills, HP) would serve a stale pipeline. Those attributes don't exist
+    here and a modifier trying raises AttributeError instead.
+    """
+
+    __slots__ = ("player_class", "equipment", "get_class_passive_bonus", "key")
+
+    def __init__(self, player):
+        self.player_class = player.player_class
+        self.equipment = player.equipment
+        # Passives only depend on the class
+        self.get_class_passive_bonus = player.get_class_passive_bonus
+        self.key = (player.player_class, tuple(player.equipment_ids.values()))
+
+def _profile(combatant):
+    """What modifiers get of a combatant, None for monsters (and for "any monster")"""
+    if combatant is None or isinstance(combatant, Monster):
+        return None
+    return CombatantProfile(combatant)
+
+def pipeline_for(kind, attacker, defender, defending=False):
+    """Compiled pipeline for an attack, either combatant may be None for "any monster" or "any player" """
+    attacker, defender = _profile(attacker), _profile(defender)
+    key = (kind, attacker and attacker.key, defender and defender.key, defending)
+    pipeline = _configurations.get(key)
+    if pipeline is None:
+        stages = []
+        for func in MODIFIERS:
+            stages.extend(func(kind, attacker, defender, defending))
+        pipeline = _configurations[key] = compile_pipeline(stages)
+    return pipeline
+
+def _is_player(combatant):
+    return combatant is not None
+
+def _passive(combatant, bonus_type):
+    if _is_player(combatant):
+        return combatant.get_class_passive_bonus(bonus_type)
+    return 0
+
+def _equipment_bonus(combatant, field):
+    if not _is_player(combatant):
+        return 0
+    return sum(item.get(field, 0) for item in combatant.equipment.values() if item)
+
+@modifier
+def base_rules(kind, attacker, defender, defending):
+    if kind == ATTACK:
+        return [Variance(PLAYER_DAMAGE_VARIANCE), Critical(CRIT_CHANCE)]
+    if kind == SPECIAL:
+        return [Variance(SPECIAL_DAMAGE_VARIANCE)]
+    if kind == MONSTER_ATTACK:
+        return [Variance(MONSTER_DAMAGE_VARIANCE)]
+    raise ValueError(f"Unknown attack kind {kind!r}")
+
+@modifier
+def player_dodge(kind, attacker, defender, defending):
+    # Players can dodge, monsters take every hit
+    if kind == MONSTER_ATTACK or _is_player(defender):
+        return [Dodge(DODGE_CHANCE)]
+    return []
+
+@modifier
+def class_passives(kind, attacker, defender, defending):
+    stages = []
+    crit_bonus = _passive(attacker, "critical_chance")
+    if kind == ATTACK and crit_bonus:
+        stages.append(Critical(crit_bonus))
+    reduction = _passive(defender, "damage_reduction")
+    if reduction:
+        stages.append(Reduction(reduction))
+    return stages
+
+@modifier
+def equipment(kind, attacker, defender, defending):
+    # Items may carry critical_chance or damage_reduction fields
+    stages = []
+    crit_bonus = _equipment_bonus(attacker, "critical_chance")
+    if kind == ATTACK and crit_bonus:
+        stages.append(Critical(crit_bonus))
+    reduction = _equipment_bonus(defender, "damage_reduction")
+    if reduction:
+        stages.append(Reduction(reduction))
+    return stages
+
+@modifier
+def defend(kind, attacker, defender, defending):
+    return [Scale(DEFEND_FACTOR, ORDER_DEFEND)] if defending else []
+
+def check_pipeline(pipeline, base, rolls, rng=random):
+    """Compare roll() against pmf() over many hits
+
+    Returns (largest gap between a rolled frequency and its exact
+    probability, the gap allowed for that many rolls, damage values rolled
+    that pmf() says are impossible, mean rolled damage).
+    """
+    pmf = pipeline.pmf(base)
+    counts = {}
+    for _ in range(rolls):
+        damage, _ = pipeline.roll(base, rng)
+        counts[damage] = counts.get(damage, 0) + 1
+    impossible = sorted(damage for damage in counts if pmf.get(damage, 0.0) <= 0.0)
+    gap = max(abs(counts.get(damage, 0) / rolls - p) for damage, p in pmf.items())
+    # Five standard errors of the widest possible bucket, so chance alone never fails a check
+    allowed = 5 * math.sqrt(0.25 / rolls)
+    mean = sum(damage * count for damage, count in counts.items()) / rolls
+    return gap, allowed, impossible, mean
+
+def main(argv=None):
+    from player import Player
+
+    parser = argparse.ArgumentParser(description="Check that rolled damage follows the exact distributions")
+    parser.add_argument("--base", type=int, nargs="+", default=[1, 12, 40], help="Base damage values (default: 1 12 40)")
+    parser.add_argument("--rolls", type=int, default=20000, help="Hits rolled per pipeline (default: 20000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    monster = Monster("Training Dummy", 100, 10, 1, REGULAR_MONSTER_TYPES[0])
+    configurations = []
+    for player_class in ("Warrior", "Mage", "Rogue"):
+        player = Player("Check", player_class)
+        configurations.append((f"{player_class} attack", pipeline_for(ATTACK, player, monster)))
+        configurations.append((f"{player_class} special", pipeline_for(SPECIAL, player, monster)))
+        for defending in (False, True):
+            name = f"Monster vs {player_class}" + (" (defending)" if defending else "")
+            configurations.append((name, pipeline_for(MONSTER_ATTACK, monster, player, defending)))
+
+    table = Table(title=f"🎲 roll() vs pmf() over {args.rolls:,} hits")
+    table.add_column("Pipeline", style="cyan")
+    table.add_column("Base", style="white", justify="right")
+    table.add_column("Largest Gap", style="white", justify="right")
+    table.add_column("Mean (rolled / exact)", style="white", justify="right")
+    table.add_column("Result")
+    failures = 0
+    for name, pipeline in configurations:
+        for base in args.base:
+            gap, allowed, impossible, rolled_mean = check_pipeline(pipeline, base, args.rolls, rng)
+            failed = gap > allowed or impossible
+            failures += bool(failed)
+            result = f"[bold red]impossible {impossible}[/bold red]" if impossible else \
+                "[bold red]mismatch[/bold red]" if gap > allowed else "[green]ok[/green]"
+            table.add_row(name, str(base), f"{gap:.4f}", f"{rolled_mean:.2f} / {pipeline.mean(base):.2f}", result)
+    console.print(table)
+
+    if failures:
+        console.print(f"❌ {failures} pipeline(s) roll differently from their distribution", style="bold red")
+        return 1
+    console.print("✅ Every pipeline rolls as its distribution says", style="bold green")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
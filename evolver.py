@@ -0,0 +1,293 @@
+# evolver.py - Genetic search for skill point and gear builds that survive this level's spawns
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from rich.live import Live
+from rich.table import Table
+import damage
+import terminal
+from arena import CLASSES, SLOT_KINDS, Build, choose_action, skill_points_at
+from combat import ActionMask, create_battle_actions
+from items import ITEMS
+from monsters import Monster
+from player import RECOMMENDED_BUILDS_PATH, SKILL_BONUSES
+from terminal import SilentConsole, TerminalIO, console
+
+SKILLS = tuple(SKILL_BONUSES)
+DEFAULT_LEVELS = (1, 3, 5, 10, 15, 20)
+
+# A battle still going after this many turns counts as lost
+MAX_TURNS = 100
+
+# Evolution settings
+POPULATION = 32
+GENERATIONS = 20
+ELITES = 4
+TOURNAMENT_SIZE = 3
+MUTATION_RATE = 0.3
+# Stop a search once the best build hasn't improved for this many generations
+STALL_GENERATIONS = 6
+
+# Genomes handed to a worker at a time
+BATCH_SIZE = 4
+
+# A genome is (skill points in SKILLS order, weapon key, armor key, accessory key),
+# gear keys being None for an empty slot. Fitness is (survival rate, mean HP left
+# after a win as a fraction of max HP), compared as a tuple.
+
+def gear_options(level):
+    """slot -> item keys unlocked at a level, None standing for an empty slot"""
+    return {slot: [None] + [item["key"] for item in ITEMS.of_kind(kind) if item.get("level", 1) <= level]
+            for slot, kind in SLOT_KINDS.items()}
+
+def genome_build(player_class, level, genome):
+    """The arena Build a genome describes"""
+    skills, *gear = genome
+    return Build(f"{player_class} L{level}", player_class, level,
+                 dict(zip(SKILLS, skills)), dict(zip(SLOT_KINDS, gear)))
+
+def survive(player, monster, actions, max_turns=MAX_TURNS):
+    """One headless battle with combat.py's rules, True when the player wins"""
+    for _ in range(max_turns):
+        mask = ActionMask.compute(actions, player)
+        result = actions[choose_action(player, mask)].execute(player, monster)
+        if not monster.is_alive:
+            return True
+        # Drinking a potion skips the monster's turn, as in Combat
+        if result != "skip_monster_turn":
+            pipeline = damage.pipeline_for(damage.MONSTER_ATTACK, monster, player)
+            hit, _ = pipeline.roll(monster.attack)
+            player.take_damage(hit)
+            if not player.is_alive:
+                return False
+        player.reduce_special_cooldown()
+    return False
+
+# Per worker process: sampled spawns per level, made on first use
+_spawns = {}
+
+def _init_worker():
+    _spawns.clear()
+    terminal.use_io(TerminalIO(SilentConsole(quiet=True)))
+
+def _spawns_for(level, battles, seed):
+    """The same monsters for every genome of a level, so builds are compared on equal terms"""
+    key = (level, battles, seed)
+    spawns = _spawns.get(key)
+    if spawns is None:
+        random.seed(f"{seed}:spawns:{level}")
+        spawns = []
+        for _ in range(battles):
+            monster = Monster.create_monster(level)
+            spawns.append((monster, monster.battle_state()))
+        _spawns[key] = spawns
+    return spawns
+
+def evaluate_batch(player_class, level, genomes, battles, seed):
+    """Fitness of each genome over battles fights against sampled spawns"""
+    spawns = _spawns_for(level, battles, seed)
+    actions = create_battle_actions()
+    results = []
+    for genome in genomes:
+        random.seed(f"{seed}:{player_class}:{level}:{genome}")
+        player = genome_build(player_class, level, genome).create_player()
+        start = player.battle_state()
+        wins = 0
+        hp_left = 0.0
+        for monster, monster_start in spawns:
+            player.restore_battle_state(start)
+            monster.restore_battle_state(monster_start)
+            if survive(player, monster, actions):
+                wins += 1
+                hp_left += player.hp / player.max_hp
+        results.append((wins / battles, hp_left / wins if wins else 0.0))
+    return results
+
+class Evolution:
+    """Genetic search over the builds of one class at one level
+
+    Genomes are only simulated the first time they are seen, the fitness
+    cache answers every later appearance, so elites and repeat children
+    are free.
+    """
+
+    def __init__(self, player_class, level, rng):
+        self.player_class = player_class
+        self.level = level
+        self.rng = rng
+        self.points = skill_points_at(level)
+        self.gear = gear_options(level)
+        self.fitness = {}
+        self.generation = 0
+        self.best = None
+
+    def random_genome(self):
+        skills = [0] * len(SKILLS)
+        for _ in range(self.points):
+            skills[self.rng.randrange(len(SKILLS))] += 1
+        return (tuple(skills),) + tuple(self.rng.choice(options) for options in self.gear.values())
+
+    def _repair(self, skills):
+        """Add or remove random points until the allocation spends exactly the points available"""
+        skills = list(skills)
+        while sum(skills) > self.points:
+            skills[self.rng.choice([index for index, points in enumerate(skills) if points])] -= 1
+        while sum(skills) < self.points:
+            skills[self.rng.randrange(len(SKILLS))] += 1
+        return tuple(skills)
+
+    def crossover(self, first, second):
+        """Each skill count and gear slot from either parent"""
+        skills = tuple(self.rng.choice(pair) for pair in zip(first[0], second[0]))
+        gear = tuple(self.rng.choice(pair) for pair in zip(first[1:], second[1:]))
+        return (self._repair(skills),) + gear
+
+    def mutate(self, genome):
+        """Move a skill point to another skill and maybe swap a piece of gear"""
+        skills, *gear = genome
+        skills = list(skills)
+        if self.points and self.rng.random() < MUTATION_RATE * 2:
+            source = self.rng.choice([index for index, points in enumerate(skills) if points])
+            skills[source] -= 1
+            skills[self.rng.randrange(len(SKILLS))] += 1
+        for index, options in enumerate(self.gear.values()):
+            if self.rng.random() < MUTATION_RATE / len(self.gear):
+                gear[index] = self.rng.choice(options)
+        return (tuple(skills),) + tuple(gear)
+
+    def _select(self, ranked):
+        contenders = self.rng.sample(ranked, min(TOURNAMENT_SIZE, len(ranked)))
+        return max(contenders, key=self.fitness.__getitem__)
+
+    def next_population(self, population):
+        ranked = sorted(dict.fromkeys(population), key=self.fitness.__getitem__, reverse=True)
+        children = ranked[:ELITES]
+        while len(children) < len(population):
+            child = self.crossover(self._select(ranked), self._select(ranked))
+            children.append(self.mutate(child))
+        return children
+
+    def unscored(self, population):
+        """Genomes of a population not in the fitness cache, each once"""
+        return [genome for genome in dict.fromkeys(population) if genome not in self.fitness]
+
+    def record(self, population):
+        """Note the best build after a generation, True when it improved"""
+        best = max(population, key=self.fitness.__getitem__)
+        improved = self.best is None or self.fitness[best] > self.fitness[self.best]
+        if improved:
+            self.best = best
+        self.generation += 1
+        return improved
+
+def _batches(items):
+    return [items[start:start + BATCH_SIZE] for start in range(0, len(items), BATCH_SIZE)]
+
+def evolve(player_class, level, executor=None, population=POPULATION, generations=GENERATIONS,
+           battles=200, seed=0, on_generation=None):
+    """Search the builds of a class and level, returns the finished Evolution
+
+    Batches of unscored genomes run on the executor when there is one,
+    in order, so results only depend on the seed.
+    """
+    evolution = Evolution(player_class, level, random.Random(f"{seed}:{player_class}:{level}"))
+    genomes = [evolution.random_genome() for _ in range(population)]
+    stalled = 0
+    for _ in range(generations):
+        batches = _batches(evolution.unscored(genomes))
+        args = (itertools.repeat(player_class), itertools.repeat(level), batches,
+                itertools.repeat(battles), itertools.repeat(seed))
+        scored = executor.map(evaluate_batch, *args) if executor else map(evaluate_batch, *args)
+        for batch, results in zip(batches, scored):
+            evolution.fitness.update(zip(batch, results))
+
+        stalled = 0 if evolution.record(genomes) else stalled + 1
+        if on_generation:
+            on_generation(evolution)
+        if stalled >= STALL_GENERATIONS:
+            break
+        genomes = evolution.next_population(genomes)
+    return evolution
+
+def build_entry(player_class, level, genome, fitness):
+    """A recommended_builds.json entry"""
+    entry = genome_build(player_class, level, genome).to_dict()
+    del entry["name"], entry["class"]
+    entry["survival"] = round(fitness[0], 4)
+    entry["hp_left"] = round(fitness[1], 4)
+    return entry
+
+def write_recommendations(path, recommendations, battles, seed):
+    """Save {class: [entries by level]} for the skill menu"""
+    with open(path, 'w') as file:
+        json.dump({"battles": battles, "seed": seed, "builds": recommendations}, file, indent=4)
+
+def _row(evolution):
+    best = evolution.best
+    return (evolution.player_class, evolution.level, evolution.generation, best, evolution.fitness[best])
+
+def _results_table(rows):
+    table = Table(title="🧬 Recommended Builds")
+    table.add_column("Class", style="green")
+    table.add_column("Level", style="white", justify="right")
+    table.add_column("Generation", style="dim", justify="right")
+    table.add_column("Survival", style="bold yellow", justify="right")
+    table.add_column("HP Left", style="red", justify="right")
+    table.add_column("Skills | Gear", style="cyan")
+    for player_class, level, generation, genome, fitness in rows:
+        table.add_row(player_class, str(level), str(generation), f"{fitness[0] * 100:.1f}%",
+                      f"{fitness[1] * 100:.0f}%", genome_build(player_class, level, genome).summary)
+    return table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evolve Python Adventure RPG builds that survive the monsters of each level")
+    parser.add_argument("--classes", nargs="+", choices=CLASSES, default=list(CLASSES), help="Classes to optimize")
+    parser.add_argument("--levels", nargs="+", type=int, default=list(DEFAULT_LEVELS), help="Levels to optimize")
+    parser.add_argument("--population", type=int, default=POPULATION, help=f"Genomes per generation (default: {POPULATION})")
+    parser.add_argument("--generations", type=int, default=GENERATIONS, help=f"Maximum generations (default: {GENERATIONS})")
+    parser.add_argument("--battles", type=int, default=200, help="Battles per fitness evaluation (default: 200)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--output", default=RECOMMENDED_BUILDS_PATH, help="Where to write the recommendations")
+    args = parser.parse_args(argv)
+
+    if args.population <= ELITES:
+        parser.error(f"--population must be larger than {ELITES}")
+    if min(args.levels) < 1:
+        parser.error("--levels must be 1 or higher")
+
+    workers = args.workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 else None
+    previous_io = terminal.current_io()
+    if executor is None:
+        _init_worker()
+
+    rows = []
+    recommendations = {}
+    try:
+        with Live(console=previous_io.console, refresh_per_second=4, transient=True) as live:
+            for player_class in args.classes:
+                for level in sorted(set(args.levels)):
+                    def show(evolution):
+                        live.update(_results_table(rows + [_row(evolution)]))
+                    evolution = evolve(player_class, level, executor, args.population,
+                                       args.generations, args.battles, args.seed, on_generation=show)
+                    rows.append(_row(evolution))
+                    recommendations.setdefault(player_class, []).append(
+                        build_entry(player_class, level, evolution.best, evolution.fitness[evolution.best]))
+    finally:
+        terminal.use_io(previous_io)
+        if executor:
+            executor.shutdown()
+
+    write_recommendations(args.output, recommendations, args.battles, args.seed)
+    console.print(_results_table(rows))
+    console.print(f"💾 Recommendations saved to {args.output}", style="bold green")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,49 @@
+import asyncio
 import random
 import os
-from rich.console import Console
+import json
+from urllib.parse import quote
 from rich.panel import Panel
 from rich.table import Table
-from rich.prompt import Prompt, Confirm
 from rich.text import Text
 from rich.progress import Progress, BarColumn, TextColumn, SpinnerColumn
+import terminal
+import telemetry
+from terminal import console
 from player import Player
 from monsters import Monster
+from items import ITEMS, HEALTH_POTION, MANA_POTION
+from loot import LOOT_TABLES
 from combat import Combat
 from shop import Shop
+from save_store import create_save_store
+from combat_math import forecast_encounter
 
-console = Console()
+# Save files listed per page in the save and load menus
+SAVES_PER_PAGE = 10
 
 class Game:
-    def __init__(self):
+    def __init__(self, save_backend="json", practice=False):
         self.player = None
+        self.combat = None  # Battle in progress, if any
+        self.practice = practice  # Battles can be rewound
+        self.save_slot = None  # Slot the player was loaded from or last saved to
+        self._running = False
         self.save_directory = "saves"
         
         # Create saves directory if it doesn't exist
         if not os.path.exists(self.save_directory):
             os.makedirs(self.save_directory)
+        
+        # Save backend: loose JSON files or a single SQLite database
+        self.save_store = create_save_store(save_backend, self.save_directory)
+        
+        # Battles in progress are checkpointed here every turn, one file per save slot
+        self.checkpoint_directory = os.path.join(self.save_directory, "checkpoints")
+        if not os.path.exists(self.checkpoint_directory):
+            os.makedirs(self.checkpoint_directory)
     
-    def start(self):
+    async def start(self):
         """Start the game"""
         console.clear()
         
@@ -47,10 +68,10 @@ class Game:
         
         console.print(menu_table)
         
-        choice = Prompt.ask("Enter your choice", choices=["1", "2", "3"], default="1")
+        choice = await terminal.ask("Enter your choice", choices=["1", "2", "3"], default="1")
         
         if choice == "1":
-            self.player = Player.create_new_player()
+            self.player = await Player.create_new_player()
             welcome_text = Text()
             welcome_text.append(f"Welcome, ", style="cyan")
             welcome_text.append(f"{self.player.name}", style="bold yellow")
@@ -58,10 +79,12 @@ class Game:
             welcome_text.append("\n\nYour adventure begins now...", style="green")
             
             console.print(Panel(welcome_text, title="🌟 Adventure Begins", border_style="green"))
-            console.input("\nPress Enter to continue...")
-            self.main_game_loop()
+            await terminal.input("\nPress Enter to continue...")
+            await self.main_game_loop()
         elif choice == "2":
-            self.load_game()
+            # Loading may also pick up a battle the save was in the middle of
+            if await self.load_game():
+                await self.resume()
         elif choice == "3":
             farewell_panel = Panel.fit(
                 "Thanks for playing Python Adventure RPG!\n"
@@ -72,9 +95,90 @@ class Game:
             console.print(farewell_panel)
             return
     
-    def main_game_loop(self):
+    def observation(self):
+        """Observable state at the main menu, for bots"""
+        return {"screen": "main_menu", "player": self.player.observation()}
+    
+    def snapshot(self):
+        """Serialize the running game (player and any battle in progress)"""
+        return {
+            "player": self.player.to_dict(),
+            "combat": self.combat.snapshot() if self.combat else None,
+            "save_slot": self.save_slot
+        }
+    
+    def restore(self, state):
+        """Restore a game serialized with snapshot"""
+        self.player = Player.from_dict(state["player"])
+        self.save_slot = state.get("save_slot")
+        self.combat = None
+        if state.get("combat"):
+            self.combat = Combat.from_snapshot(self.player, state["combat"], self._checkpoint_battle, self.practice)
+    
+    def _checkpoint_path(self, slot):
+        # Percent-encoding keeps distinct slot names distinct on disk
+        return os.path.join(self.checkpoint_directory, quote(slot, safe="") + ".battle")
+    
+    async def _checkpoint_battle(self, combat):
+        """Persist the battle at the start of a turn (atomic replace, compact JSON)
+        
+        Only battles of a saved player are checkpointed, under their save slot.
+        The snapshot is taken here, the write runs in a thread so other
+        sessions of a server keep going.
+        """
+        if self.save_slot is None:
+            return
+        path = self._checkpoint_path(self.save_slot)
+        # One dumps() and one write is much cheaper than dump()'s many small writes
+        data = json.dumps(self.snapshot(), separators=(",", ":"))
+        try:
+            await asyncio.to_thread(_write_atomic, path, data)
+        except OSError as e:
+            console.print(f"⚠️ Could not checkpoint battle: {e}", style="yellow")
+    
+    def _clear_battle_checkpoint(self):
+        if self.save_slot is None:
+            return
+        path = self._checkpoint_path(self.save_slot)
+        if os.path.exists(path):
+            os.remove(path)
+    
+    async def _offer_battle_resume(self):
+        """Restore the battle the loaded save was interrupted in, if the player wants it
+        
+        Returns True when a battle was restored into self.combat.
+        """
+        path = self._checkpoint_path(self.save_slot)
+        if not os.path.exists(path):
+            return False
+        if not await terminal.confirm("⚔️ This hero was interrupted mid-battle. Resume the fight?", default=True):
+            self._clear_battle_checkpoint()
+            return False
+        try:
+            with open(path, 'r') as file:
+                state = json.load(file)
+            # The checkpoint belongs to this slot whatever it says inside
+            state["save_slot"] = self.save_slot
+            self.restore(state)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            console.print(f"❌ Error resuming battle: {e}", style="bold red")
+            await terminal.input("Press Enter to continue...")
+            return False
+        return True
+    
+    async def resume(self):
+        """Continue a restored game where it left off"""
+        if self.combat is not None:
+            self._running = True
+            await self._run_battle(self.combat, resume=True)
+            if not self._running:
+                return
+        await self.main_game_loop()
+    
+    async def main_game_loop(self):
         """Main game loop"""
-        while True:
+        self._running = True
+        while self._running:
             console.clear()
             
             # Display player status at top
@@ -100,31 +204,34 @@ class Game:
             
             console.print(action_table)
             
-            choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5", "6", "7", "8"], default="1")
+            # The main menu is a safe point to park an idle session
+            choice = await terminal.ask("Enter your choice", choices=["1", "2", "3", "4", "5", "6", "7", "8"], default="1",
+                                        checkpoint=True, observe=self.observation)
             
             if choice == "1":
-                self.fight_monster()
+                await self.fight_monster()
             elif choice == "2":
                 shop = Shop(self.player)
-                shop.visit_shop()
+                await shop.visit_shop()
             elif choice == "3":
-                self._use_health_potion()
+                await self._use_health_potion()
             elif choice == "4":
-                self._use_mana_potion()
+                await self._use_mana_potion()
             elif choice == "5":
-                self._view_character_info()
+                await self._view_character_info()
             elif choice == "6":
-                self.save_game()
+                await self.save_game()
             elif choice == "7":
-                self.load_game()
+                if await self.load_game() and self.combat is not None:
+                    await self._run_battle(self.combat, resume=True)
             elif choice == "8":
-                if Confirm.ask("Are you sure you want to quit?"):
+                if await terminal.confirm("Are you sure you want to quit?"):
                     farewell_text = Text()
                     farewell_text.append("Thanks for playing Python Adventure RPG!\n", style="bold green")
                     farewell_text.append("Come back soon for more adventures! ⚔️✨", style="cyan")
                     
                     console.print(Panel(farewell_text, title="👋 See You Later", border_style="blue"))
-                    break
+                    self._running = False
     
     def _display_player_status(self):
         """Display current player status"""
@@ -152,8 +259,8 @@ class Game:
         # Inventory and cooldown info
         info_text = Text()
         info_text.append("🎒 Inventory: ", style="bold cyan")
-        info_text.append(f"🧪 {self.player.inventory['health_potions']} health ", style="red")
-        info_text.append(f"🔮 {self.player.inventory['mana_potions']} mana ", style="blue")
+        info_text.append(f"🧪 {self.player.item_count(HEALTH_POTION)} health ", style="red")
+        info_text.append(f"🔮 {self.player.item_count(MANA_POTION)} mana ", style="blue")
         
         if self.player.special_cooldown > 0:
             info_text.append(f"| ⏰ Special cooldown: {self.player.special_cooldown} turns", style="yellow")
@@ -198,60 +305,87 @@ class Game:
         else:
             return "[red]Depleted[/red]"
     
-    def _use_health_potion(self):
+    async def _use_health_potion(self):
         """Use a health potion from main menu"""
         if self.player.use_health_potion():
-            console.input("\nPress Enter to continue...")
+            telemetry.publish(telemetry.POTION_USED, battle_id=None, potion="health",
+                              player_class=self.player.player_class, player_level=self.player.level)
+            await terminal.input("\nPress Enter to continue...")
         else:
-            console.input("\nPress Enter to continue...")
+            await terminal.input("\nPress Enter to continue...")
     
-    def _use_mana_potion(self):
+    async def _use_mana_potion(self):
         """Use a mana potion from main menu"""
         if self.player.use_mana_potion():
-            console.input("\nPress Enter to continue...")
+            telemetry.publish(telemetry.POTION_USED, battle_id=None, potion="mana",
+                              player_class=self.player.player_class, player_level=self.player.level)
+            await terminal.input("\nPress Enter to continue...")
         else:
-            console.input("\nPress Enter to continue...")
+            await terminal.input("\nPress Enter to continue...")
     
-    def _view_character_info(self):
+    async def _view_character_info(self):
         """View detailed character information"""
         console.clear()
         console.print(self.player.get_status_display())
-        console.input("\nPress Enter to continue...")
+        await terminal.input("\nPress Enter to continue...")
     
-    def fight_monster(self):
+    async def fight_monster(self):
         """Fight a monster"""
         # Show loading animation
-        with console.status("[bold green]🎲 Searching for monsters...", spinner="dots"):
-            import time
-            time.sleep(1)  # Dramatic pause
+        await terminal.status("[bold green]🎲 Searching for monsters...", 1)  # Dramatic pause
         
         monster = Monster.create_monster(self.player.level)
         
+        # Nothing is shown to bots, so skip building the panel and forecast
+        if not console.quiet:
+            self._display_encounter(monster)
+        
+        observe = lambda: {"screen": "encounter", "player": self.player.observation(), "monster": monster.observation()}
+        if not await terminal.confirm("Do you want to fight this monster?", default=True, observe=observe):
+            console.print("🏃 You decided to avoid the fight and retreat safely.", style="cyan")
+            await terminal.input("\nPress Enter to continue...")
+            return
+        
+        await self._run_battle(Combat(self.player, monster, self._checkpoint_battle, self.practice))
+    
+    def _display_encounter(self, monster):
+        """Show the monster encounter panel with a battle forecast"""
         # Monster encounter panel
         encounter_text = Text()
         encounter_text.append("🚨 MONSTER ENCOUNTER! 🚨\n\n", style="bold red")
         encounter_text.append(monster.get_combat_message("appears"), style="bold yellow")
         encounter_text.append(f"\n\n{monster.get_description()}", style="dim")
         
-        console.print(Panel(encounter_text, title="⚔️ BATTLE INCOMING", border_style="red"))
+        # Battle forecast from the exact damage distributions
+        forecast = forecast_encounter(self.player, monster)
+        win_chance = forecast.win_probability * 100
+        chance_color = "green" if win_chance >= 80 else "yellow" if win_chance >= 50 else "red"
+        encounter_text.append(f"\n\n🎯 Win chance: ", style="cyan")
+        encounter_text.append(f"{win_chance:.0f}%", style=f"bold {chance_color}")
+        if forecast.win_probability > 0:
+            encounter_text.append(f" | ⏱️ ~{forecast.expected_turns_to_win:.1f} turns to win", style="cyan")
+        encounter_text.append(f" | ⚠️ Threat: {monster.threat_level}", style=monster.threat_color)
         
-        if not Confirm.ask("Do you want to fight this monster?", default=True):
-            console.print("🏃 You decided to avoid the fight and retreat safely.", style="cyan")
-            console.input("\nPress Enter to continue...")
-            return
+        console.print(Panel(encounter_text, title="⚔️ BATTLE INCOMING", border_style="red"))
         
-        combat = Combat(self.player, monster)
-        battle_result = combat.start_battle()
+    async def _run_battle(self, combat, resume=False):
+        """Fight a battle to the end and handle the outcome"""
+        self.combat = combat
+        battle_result = await combat.start_battle(resume=resume)
+        # The checkpoint only survives if the battle never finished
+        self.combat = None
+        self._clear_battle_checkpoint()
+        monster = combat.monster
         
         if battle_result == "victory":
-            self._handle_victory(monster)
+            await self._handle_victory(monster, combat.battle_id)
         elif battle_result == "defeat":
-            self._handle_defeat()
+            await self._handle_defeat()
         elif battle_result == "escaped":
             console.print("🏃 You successfully escaped from the battle!", style="bold yellow")
-            console.input("\nPress Enter to continue...")
+            await terminal.input("\nPress Enter to continue...")
     
-    def _handle_victory(self, monster):
+    async def _handle_victory(self, monster, battle_id=None):
         """Handle victory rewards"""
         # Calculate rewards
         base_xp = random.randint(10, 20)
@@ -264,9 +398,15 @@ class Game:
         monster_bonus_gold = monster.level
         total_gold = base_gold + level_bonus_gold + monster_bonus_gold
         
+        # Loot rolls scale with the monster's reward multiplier
+        drops = LOOT_TABLES.roll_for(monster)
+        
         # Award rewards
         self.player.xp += total_xp
         self.player.gold += total_gold
+        telemetry.publish(telemetry.VICTORY_REWARD, battle_id=battle_id, xp=total_xp, gold=total_gold,
+                          loot={ITEMS[item_id]["key"]: quantity for item_id, quantity in drops.items()},
+                          player_class=self.player.player_class, player_level=self.player.level)
         
         # Create victory panel
         victory_text = Text()
@@ -275,17 +415,42 @@ class Game:
         victory_text.append("💰 Rewards Earned:\n", style="bold cyan")
         victory_text.append(f"⭐ XP: +{total_xp}\n", style="yellow")
         victory_text.append(f"💰 Gold: +{total_gold}", style="gold1")
+        if drops:
+            victory_text.append("\n\n🎁 Loot:", style="bold cyan")
+            for item_id, quantity in drops.items():
+                victory_text.append(f"\n{ITEMS[item_id]['name']} x{quantity}", style="magenta")
         
         console.print(Panel(victory_text, title="🎉 BATTLE WON", border_style="green"))
+        self._collect_loot(drops)
         
         # Check for level up
         if self.player.xp >= self.player.xp_to_next:
-            console.input("\nPress Enter to continue...")
+            await terminal.input("\nPress Enter to continue...")
             self.player.level_up()
+            await terminal.input("\nPress Enter to continue...")
         
-        console.input("\nPress Enter to continue...")
+        await terminal.input("\nPress Enter to continue...")
     
-    def _handle_defeat(self):
+    def _collect_loot(self, drops):
+        """Put drops in the inventory, equipping gear that beats what is worn"""
+        for item_id, quantity in drops.items():
+            item = ITEMS[item_id]
+            slot = item["slot"]
+            if slot is not None:
+                current = self.player.equipment.get(slot)
+                if current is None or self._gear_value(item) > self._gear_value(current):
+                    self.player.equip_item(slot, item_id)
+                    if current is not None:
+                        self.player.add_item(current["id"])
+                    quantity -= 1
+            if quantity:
+                self.player.add_item(item_id, quantity)
+    
+    @staticmethod
+    def _gear_value(item):
+        return item.get("attack_bonus", 0) * 5 + item.get("hp_bonus", 0)
+    
+    async def _handle_defeat(self):
         """Handle player defeat"""
         defeat_panel = Panel.fit(
             "💀 GAME OVER 💀\n\n"
@@ -296,48 +461,105 @@ class Game:
             border_style="red"
         )
         console.print(defeat_panel)
-        console.input("\nPress Enter to exit...")
-        exit()
+        await terminal.input("\nPress Enter to exit...")
+        self._running = False
     
-    def save_game(self):
-        """Save the current game"""
-        save_files = [f for f in os.listdir(self.save_directory) if f.endswith('.json')]
-        
-        console.print("\n💾 Save Game", style="bold cyan")
-        
-        if save_files:
-            save_table = Table(title="Existing Save Files")
-            save_table.add_column("Slot", style="cyan", no_wrap=True)
-            save_table.add_column("File Name", style="green")
+    async def _choose_save(self, title, allow_new=False):
+        """Page through saves, most recently played first, returns a slot or None to go back
+
+        Only one page is read from the store at a time, so the menu stays
+        fast with many characters. allow_new offers typing a new slot name.
+        """
+        filters = {}
+        page = 0
+        while True:
+            # One extra row tells whether there is a next page
+            summaries = self.save_store.search(limit=SAVES_PER_PAGE + 1, offset=page * SAVES_PER_PAGE, **filters)
+            has_next = len(summaries) > SAVES_PER_PAGE
+            summaries = summaries[:SAVES_PER_PAGE]
             
-            for i, save_file in enumerate(save_files, 1):
-                save_table.add_row(str(i), save_file)
-            save_table.add_row(str(len(save_files) + 1), "[italic]Create new save file[/italic]")
+            if filters:
+                title_text = f"{title} ({', '.join(filters.values())}), page {page + 1}"
+            else:
+                title_text = f"{title}, page {page + 1}"
+            save_table = Table(title=title_text)
+            save_table.add_column("Slot", style="cyan", no_wrap=True)
+            save_table.add_column("Save Name", style="green")
+            save_table.add_column("Hero", style="yellow")
+            save_table.add_column("Class", style="magenta")
+            save_table.add_column("Level", style="white", justify="right")
             
+            choices = []
+            for i, summary in enumerate(summaries, 1):
+                save_table.add_row(str(i), summary["slot"], summary["name"], summary["player_class"], str(summary["level"]))
+                choices.append(str(i))
             console.print(save_table)
             
-            choice = Prompt.ask(f"Choose save slot", 
-                               choices=[str(i) for i in range(1, len(save_files) + 2)],
-                               default="1")
+            options = []
+            if allow_new:
+                options.append(("c", "Create new save file"))
+            if has_next:
+                options.append(("n", "Next page"))
+            if page > 0:
+                options.append(("p", "Previous page"))
+            options.append(("f", "Find by hero name or class"))
+            if filters:
+                options.append(("a", "Show all saves"))
+            options.append(("b", "Back"))
+            for key, description in options:
+                console.print(f"{key}. {description}", style="dim")
+            choices += [key for key, _ in options]
             
-            if int(choice) <= len(save_files):
-                filename = save_files[int(choice) - 1]
-                if not Confirm.ask(f"Overwrite {filename}?"):
-                    return
+            choice = await terminal.ask("Choose save file", choices=choices, default=choices[0])
+            if choice == "c":
+                slot = (await terminal.ask("Enter save file name")).strip()
+                return slot or None
+            elif choice == "n":
+                page += 1
+            elif choice == "p":
+                page -= 1
+            elif choice == "f":
+                filters = await self._ask_save_filters()
+                page = 0
+            elif choice == "a":
+                filters = {}
+                page = 0
+            elif choice == "b":
+                return None
             else:
-                filename = Prompt.ask("Enter save file name (without .json)").strip() + ".json"
+                return summaries[int(choice) - 1]["slot"]
+    
+    async def _ask_save_filters(self):
+        """Ask for a hero name and class to search saves by"""
+        filters = {}
+        name = (await terminal.ask("Hero name (Enter for any)", default="")).strip()
+        if name:
+            filters["name"] = name
+        player_class = await terminal.ask("Class", choices=["any", "Warrior", "Mage", "Rogue"], default="any")
+        if player_class != "any":
+            filters["player_class"] = player_class
+        return filters
+    
+    async def save_game(self):
+        """Save the current game"""
+        console.print("\n💾 Save Game", style="bold cyan")
+        
+        if not self.save_store.is_empty():
+            slot = await self._choose_save("Existing Save Files", allow_new=True)
+            if slot is None:
+                return
+            if self.save_store.exists(slot) and not await terminal.confirm(f"Overwrite {slot}?"):
+                return
         else:
-            filename = Prompt.ask("Enter save file name (without .json)").strip() + ".json"
+            slot = (await terminal.ask("Enter save file name")).strip()
         
-        filepath = os.path.join(self.save_directory, filename)
-        if self.player.save_to_file(filepath):
-            console.input("\nPress Enter to continue...")
+        if self.save_store.save(slot, self.player):
+            self.save_slot = slot
+            await terminal.input("\nPress Enter to continue...")
     
-    def load_game(self):
-        """Load a saved game"""
-        save_files = [f for f in os.listdir(self.save_directory) if f.endswith('.json')]
-        
-        if not save_files:
+    async def load_game(self):
+        """Load a saved game, returns True if a player was loaded"""
+        if self.save_store.is_empty():
             no_saves_panel = Panel.fit(
                 "No save files found!\n"
                 "Start a new game to create your first save.",
@@ -345,37 +567,36 @@ class Game:
                 border_style="yellow"
             )
             console.print(no_saves_panel)
-            console.input("Press Enter to continue...")
-            return
+            await terminal.input("Press Enter to continue...")
+            return False
         
         console.print("\n📁 Load Game", style="bold cyan")
         
-        load_table = Table(title="Available Save Files")
-        load_table.add_column("Slot", style="cyan", no_wrap=True)
-        load_table.add_column("File Name", style="green")
+        slot = await self._choose_save("Available Save Files")
+        if slot is None:
+            return False
         
-        for i, save_file in enumerate(save_files, 1):
-            load_table.add_row(str(i), save_file)
-        
-        console.print(load_table)
-        
-        choice = Prompt.ask(f"Choose save file", 
-                           choices=[str(i) for i in range(1, len(save_files) + 1)],
-                           default="1")
-        
-        filename = save_files[int(choice) - 1]
-        filepath = os.path.join(self.save_directory, filename)
-        
-        loaded_player = Player.load_from_file(filepath)
+        loaded_player = self.save_store.load(slot)
         if loaded_player:
             self.player = loaded_player
+            self.save_slot = slot
+            self.combat = None
             welcome_back_text = Text()
             welcome_back_text.append("Welcome back, ", style="cyan")
             welcome_back_text.append(f"{self.player.name}", style="bold yellow")
             welcome_back_text.append("!\nYour adventure continues...", style="cyan")
             
             console.print(Panel(welcome_back_text, title="🎮 Game Loaded", border_style="green"))
-            console.input("\nPress Enter to continue...")
-            self.main_game_loop()
+            await terminal.input("\nPress Enter to continue...")
+            await self._offer_battle_resume()
+            return True
         else:
-            console.input("Press Enter to continue...")
\ No newline at end of file
+            await terminal.input("Press Enter to continue...")
+            return False
+
+def _write_atomic(path, data):
+    """Write text to a temporary file and move it over path"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w') as file:
+        file.write(data)
+    os.replace(temp_path, path)
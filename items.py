@@ -0,0 +1,155 @@
+# items.py - Item registry: every potion, equipment piece and loot drop under a compact integer id
+import json
+import os
+import re
+from array import array
+from collections.abc import Mapping
+from types import MappingProxyType
+from catalog import EQUIPMENT_CATALOG
+
+ITEMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "items.json")
+
+# Data file group -> (item kind, equipment slot it fits)
+GROUPS = {
+    "weapons": ("weapon", "weapon"),
+    "armor": ("armor", "armor"),
+    "accessories": ("accessory", "accessory"),
+    "potions": ("potion", None),
+    "loot": ("loot", None)
+}
+
+# Inventory keys used by saves written before the registry existed
+LEGACY_KEYS = {"health_potions": "health_potion", "mana_potions": "mana_potion"}
+
+def item_key(name):
+    """Registry key for an item name, "Dragon's Bane" -> "dragons_bane" """
+    return re.sub(r"[^a-z0-9]+", "_", name.lower().replace("'", "")).strip("_")
+
+class ItemRegistry:
+    """Read-only registry of every item, looked up by integer id or string key
+
+    Ids are small and dense, so per-item state such as inventory counts is a
+    flat array indexed by id instead of a dict keyed by name.
+    """
+
+    def __init__(self, groups):
+        items_by_id = {}
+        by_kind = {}
+        for group, raw_items in groups.items():
+            kind, slot = GROUPS[group]
+            for raw_item in raw_items:
+                item = dict(raw_item, kind=kind, slot=slot)
+                item.setdefault("key", item_key(item["name"]))
+                if item["id"] in items_by_id:
+                    raise ValueError(f"Duplicate item id {item['id']}")
+                items_by_id[item["id"]] = MappingProxyType(item)
+                by_kind.setdefault(kind, []).append(items_by_id[item["id"]])
+
+        self._items = tuple(items_by_id.get(item_id) for item_id in range(max(items_by_id, default=0) + 1))
+        self._by_key = {}
+        for item in items_by_id.values():
+            if item["key"] in self._by_key:
+                raise ValueError(f"Duplicate item key {item['key']!r}")
+            self._by_key[item["key"]] = item
+        self._by_kind = {
+            kind: tuple(sorted(items, key=lambda item: (item.get("level", 0), item["id"])))
+            for kind, items in by_kind.items()
+        }
+
+    def __len__(self):
+        """Length of an id-indexed array that fits every item"""
+        return len(self._items)
+
+    def __iter__(self):
+        return (item for item in self._items if item is not None)
+
+    def __getitem__(self, item_id):
+        item = self.get(item_id)
+        if item is None:
+            raise KeyError(item_id)
+        return item
+
+    def get(self, item_id):
+        """Item with an id, None for unknown ids and anything that isn't an int"""
+        if isinstance(item_id, int) and 0 < item_id < len(self._items):
+            return self._items[item_id]
+        return None
+
+    def by_key(self, key):
+        return self._by_key.get(LEGACY_KEYS.get(key, key))
+
+    def of_kind(self, kind):
+        """Items of one kind, ordered by unlock level"""
+        return self._by_kind.get(kind, ())
+
+    def resolve(self, ref):
+        """Item for an id, a key or an old-style item dict, None when unknown"""
+        if isinstance(ref, int):
+            return self.get(ref)
+        if isinstance(ref, str):
+            return self.by_key(ref)
+        if isinstance(ref, Mapping):
+            item = self.get(ref["id"]) if isinstance(ref.get("id"), int) else None
+            if item is not None and item["name"] == ref.get("name", item["name"]):
+                return item
+            return self.by_key(item_key(ref.get("name", "")))
+        return None
+
+    def new_counts(self):
+        """Zeroed per-item count array"""
+        return array('I', [0]) * len(self._items)
+
+class Inventory(Mapping):
+    """Read-only view of a count array, item id -> count
+
+    Any registered id reads as its count (0 when not held); iterating only
+    visits the items actually held.
+    """
+
+    def __init__(self, counts):
+        self._counts = counts
+
+    def __getitem__(self, item_id):
+        if ITEMS.get(item_id) is None:
+            raise KeyError(item_id)
+        return self._counts[item_id]
+
+    def __iter__(self):
+        return (item_id for item_id, count in enumerate(self._counts) if count)
+
+    def __len__(self):
+        return sum(1 for count in self._counts if count)
+
+    def to_dict(self):
+        """Held items as {key: count}, the save format"""
+        return {ITEMS[item_id]["key"]: count for item_id, count in enumerate(self._counts) if count}
+
+def buy_price(item, level):
+    """Shop price of an item for a player of the given level"""
+    return item["price"] + item.get("price_per_level", 0) * level
+
+def sell_price(item, level):
+    """Gold the shop pays for one of an item"""
+    if item["kind"] == "potion":
+        return max(1, buy_price(item, level) // 2)
+    if item["kind"] == "loot":
+        return item["price"]
+    return item["price"] // 3
+
+def restore_amount(potion, level):
+    """HP or mana a potion restores at the given level"""
+    return potion["restore"] + potion["restore_per_level"] * level
+
+def load_registry(path=ITEMS_PATH, catalog=EQUIPMENT_CATALOG):
+    """Build the registry from the equipment catalog plus the other item data"""
+    groups = {
+        category: [dict(item) for items in catalog.equipment_db[category].values() for item in items]
+        for category in catalog.categories
+    }
+    with open(path, 'r') as file:
+        groups.update(json.load(file))
+    return ItemRegistry(groups)
+
+ITEMS = load_registry()
+HEALTH_POTION = ITEMS.by_key("health_potion")["id"]
+MANA_POTION = ITEMS.by_key("mana_potion")["id"]
@@ -0,0 +1,157 @@
+# loot.py - Loot drops rolled from alias tables compiled per monster type and rarity
+import argparse
+import json
+import os
+import random
+import sys
+from rich.table import Table
+from items import ITEMS
+from monsters import REGULAR_MONSTER_TYPES, BOSS_MONSTER_TYPES, RARITY_WEIGHTS
+from terminal import console
+
+LOOT_TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "loot_tables.json")
+
+# Table used for monsters without one of their own
+DEFAULT_TABLE = "default"
+
+class AliasTable:
+    """Weighted choice in O(1) per sample (Vose's alias method)
+
+    Setup splits the weights into n columns of equal height, each holding at
+    most two outcomes, so a sample is one random number: pick a column, then
+    one of its two outcomes.
+    """
+
+    def __init__(self, outcomes, weights):
+        count = len(outcomes)
+        total = sum(weights)
+        if not count or total <= 0:
+            raise ValueError("An alias table needs at least one positive weight")
+
+        scaled = [weight * count / total for weight in weights]
+        probability = [1.0] * count
+        alias = list(range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1]
+        large = [index for index, value in enumerate(scaled) if value >= 1]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] += scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+        # Whatever is left is exactly 1 up to rounding
+
+        self.outcomes = tuple(outcomes)
+        self._probability = tuple(probability)
+        self._alias = tuple(alias)
+
+    def sample(self, rng=random):
+        point = rng.random() * len(self.outcomes)
+        column = int(point)
+        if point - column < self._probability[column]:
+            return self.outcomes[column]
+        return self.outcomes[self._alias[column]]
+
+class LootTables:
+    """Drop tables for every monster type and rarity, compiled once at load"""
+
+    def __init__(self, raw_tables, registry=ITEMS):
+        known_monsters = {monster_type.base_name for monster_type in REGULAR_MONSTER_TYPES + BOSS_MONSTER_TYPES}
+        monsters = raw_tables["monsters"]
+        for name in monsters:
+            if name != DEFAULT_TABLE and name not in known_monsters:
+                raise ValueError(f"Loot table for unknown monster {name!r}")
+
+        self._tables = {}
+        for rarity, _ in RARITY_WEIGHTS:
+            bonus = raw_tables["rarity_bonus"].get(rarity, [])
+            nothing_weight = raw_tables["nothing_weight"].get(rarity, 0)
+            for name, entries in monsters.items():
+                self._tables[(name, rarity)] = self._compile(entries + bonus, nothing_weight, registry)
+
+    @staticmethod
+    def _compile(entries, nothing_weight, registry):
+        # None is the "no drop" outcome, items are (item id, min, max)
+        outcomes = [None]
+        weights = [nothing_weight]
+        for key, weight, low, high in entries:
+            item = registry.by_key(key)
+            if item is None:
+                raise ValueError(f"Loot table names unknown item {key!r}")
+            outcomes.append((item["id"], low, high))
+            weights.append(weight)
+        return AliasTable(outcomes, weights)
+
+    def table(self, monster_name, rarity):
+        table = self._tables.get((monster_name, rarity))
+        if table is None:
+            table = self._tables[(DEFAULT_TABLE, rarity)]
+        return table
+
+    def roll(self, monster_name, rarity, multiplier=1.0, rng=random):
+        """Drops from one kill as {item id: quantity}
+
+        The reward multiplier is the number of rolls, its fraction being the
+        chance of one extra roll.
+        """
+        rolls = int(multiplier)
+        if rng.random() < multiplier - rolls:
+            rolls += 1
+
+        table = self.table(monster_name, rarity)
+        drops = {}
+        for _ in range(rolls):
+            outcome = table.sample(rng)
+            if outcome is None:
+                continue
+            item_id, low, high = outcome
+            drops[item_id] = drops.get(item_id, 0) + (low if low == high else rng.randint(low, high))
+        return drops
+
+    def roll_for(self, monster, rng=random):
+        """Drops from defeating a monster, scaled by its reward multiplier"""
+        monster_type = monster.monster_type
+        name = monster_type.base_name if monster_type else DEFAULT_TABLE
+        return self.roll(name, monster.rarity, monster.get_reward_multiplier(), rng)
+
+def load_loot_tables(path=LOOT_TABLES_PATH):
+    """Load and compile drop tables from a JSON data file"""
+    with open(path, 'r') as file:
+        return LootTables(json.load(file))
+
+LOOT_TABLES = load_loot_tables()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Python Adventure RPG loot drops")
+    parser.add_argument("--monster", default="Goblin", help="Monster type (default: Goblin)")
+    parser.add_argument("--rarity", default="common", choices=[rarity for rarity, _ in RARITY_WEIGHTS])
+    parser.add_argument("--multiplier", type=float, default=1.0, help="Reward multiplier (default: 1.0)")
+    parser.add_argument("--kills", type=int, default=100000, help="Kills to simulate (default: 100000)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    totals = {}
+    kills_with_drops = 0
+    for _ in range(args.kills):
+        drops = LOOT_TABLES.roll(args.monster, args.rarity, args.multiplier, rng)
+        if drops:
+            kills_with_drops += 1
+        for item_id, quantity in drops.items():
+            totals[item_id] = totals.get(item_id, 0) + quantity
+
+    table = Table(title=f"🎁 Drops from {args.kills:,} {args.rarity} {args.monster} kills")
+    table.add_column("Item", style="cyan")
+    table.add_column("Total", style="white", justify="right")
+    table.add_column("Per Kill", style="green", justify="right")
+    table.add_column("Shop Value", style="gold1", justify="right")
+    for item_id, quantity in sorted(totals.items(), key=lambda entry: -entry[1]):
+        item = ITEMS[item_id]
+        table.add_row(item["name"], f"{quantity:,}", f"{quantity / args.kills:.4f}", f"{quantity * item['price']:,}")
+    console.print(table)
+    console.print(f"🎲 {kills_with_drops / args.kills * 100:.1f}% of kills dropped something", style="dim")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,81 @@
 # main.py - Entry point
+import argparse
+import asyncio
+import atexit
+import metrics
+import terminal
 from game import Game
+from terminal import SessionClosed
 
-if __name__ == "__main__":
-    game = Game()
-    game.start()
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Python Adventure RPG")
+    parser.add_argument("--save-backend", choices=["json", "sqlite"], default="json",
+                        help="Store saves as JSON files or in a single SQLite database")
+    parser.add_argument("--serve", action="store_true",
+                        help="Host many players over a socket instead of playing locally")
+    parser.add_argument("--host", default="127.0.0.1", help="Server address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=7777, help="Server TCP port (default: 7777)")
+    parser.add_argument("--unix", metavar="PATH", help="Serve on a Unix socket instead of TCP")
+    parser.add_argument("--max-resident", type=int, default=1000,
+                        help="Games kept in memory before idle players are parked on disk (default: 1000)")
+    parser.add_argument("--idle-timeout", type=float, default=300,
+                        help="Seconds before an idle player is parked on disk (default: 300)")
+    parser.add_argument("--telemetry", metavar="DIR",
+                        help="Record gameplay events as rotating JSONL files in DIR")
+    parser.add_argument("--plain", action="store_true",
+                        help="Plain-text output without clears or boxes (automatic when stdout is not a terminal)")
+    parser.add_argument("--bot", action="store_true",
+                        help="Speak the JSON lines bot protocol on stdin/stdout instead of rendering")
+    parser.add_argument("--practice", action="store_true",
+                        help="Practice mode: rewind battles to an earlier turn and try again")
+    parser.add_argument("--stats", action="store_true",
+                        help="Print latency histograms of the game loop on exit")
+    parser.add_argument("--profile", nargs="?", const="profile.txt", metavar="FILE",
+                        help="Run under cProfile and write the hottest functions to FILE (default: profile.txt)")
+    return parser.parse_args()
 
+def run(args):
+    """Play locally or host a server"""
+    if args.serve:
+        from server import run_server
+        run_server(args.host, args.port, args.unix, args.save_backend,
+                   args.max_resident, args.idle_timeout)
+    else:
+        game = Game(save_backend=args.save_backend, practice=args.practice)
+        try:
+            asyncio.run(game.start())
+        except SessionClosed:
+            pass  # Input ran out, e.g. a piped script ended
 
+def run_profiled(args, report_path):
+    """Run under cProfile and write a report sorted by time spent in each function"""
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run, args)
+    finally:
+        with open(report_path, 'w') as report:
+            stats = pstats.Stats(profiler, stream=report)
+            stats.sort_stats("tottime").print_stats(40)
+            stats.sort_stats("cumulative").print_stats(40)
+        print(f"📊 Profile written to {report_path}")
 
+if __name__ == "__main__":
+    args = parse_args()
+    if args.telemetry:
+        import telemetry
+        telemetry.enable(args.telemetry)
+    if args.bot:
+        terminal.use_bot_protocol()
+    elif args.plain:
+        terminal.use_plain_output()
+    if args.stats:
+        metrics.enable()
+        atexit.register(metrics.print_report)
+    
+    if args.profile:
+        run_profiled(args, args.profile)
+    else:
+        run(args)
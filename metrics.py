@@ -0,0 +1,194 @@
+# metrics.py - Lightweight timers, counters and latency histograms
+import contextvars
+import functools
+import inspect
+import time
+from collections import Counter
+from contextlib import contextmanager
+from rich.table import Table
+
+# Bits of precision kept per power of two, values are recorded within ~1.6%
+SUB_BUCKET_BITS = 7
+
+class Histogram:
+    """HDR-style latency histogram in nanoseconds
+
+    Values below 2**SUB_BUCKET_BITS get exact buckets; above that each power of
+    two is split into the same number of linear sub-buckets, so memory grows
+    with the log of the range while relative error stays constant.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def _bucket(value):
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+        return (shift << SUB_BUCKET_BITS) | (value >> shift)
+
+    @staticmethod
+    def _bucket_value(bucket):
+        """Highest value that lands in a bucket"""
+        shift = bucket >> SUB_BUCKET_BITS
+        if shift == 0:
+            return bucket
+        sub_bucket = bucket & ((1 << SUB_BUCKET_BITS) - 1)
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value):
+        value = max(0, int(value))
+        bucket = self._bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def value_at_quantile(self, q):
+        """Value at quantile q (0..1), 0 when empty"""
+        if not self.count:
+            return 0
+        target = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self._bucket_value(bucket), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+_enabled = False
+_timers = {}
+_counters = Counter()
+
+# Nanoseconds the current task spent waiting on the player, see waiting()
+_wait_ns = contextvars.ContextVar("metrics_wait_ns", default=None)
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    _timers.clear()
+    _counters.clear()
+
+def histogram(name):
+    timer = _timers.get(name)
+    if timer is None:
+        timer = _timers[name] = Histogram()
+    return timer
+
+def increment(name, amount=1):
+    if _enabled:
+        _counters[name] += amount
+
+def _task_wait():
+    wait = _wait_ns.get()
+    if wait is None:
+        wait = [0]
+        _wait_ns.set(wait)
+    return wait
+
+@contextmanager
+def waiting():
+    """Mark time spent waiting on player input so timers can leave it out"""
+    if not _enabled:
+        yield
+        return
+    wait = _task_wait()
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        wait[0] += time.perf_counter_ns() - start
+
+@contextmanager
+def timer(name):
+    """Time a block into the named histogram"""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        histogram(name).record(time.perf_counter_ns() - start)
+
+def timed(name):
+    """Decorator timing every call into the named histogram
+
+    Coroutines are timed without the time they spent waiting on the player,
+    so battle turns and shop screens show the game's own cost.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                wait = _task_wait()
+                waited = wait[0]
+                start = time.perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter_ns() - start - (wait[0] - waited)
+                    histogram(name).record(elapsed)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram(name).record(time.perf_counter_ns() - start)
+        return wrapper
+    return decorator
+
+def report_table():
+    """Rich table of every timer and counter"""
+    table = Table(title="⏱️ Game Loop Metrics (ms, excluding time waiting on input)")
+    table.add_column("Timer", style="cyan", no_wrap=True)
+    for label in ("Calls", "p50", "p90", "p99", "Max", "Total"):
+        table.add_column(label, justify="right")
+
+    for name in sorted(_timers):
+        timer = _timers[name]
+        row = [timer.value_at_quantile(q) for q in (0.5, 0.9, 0.99)] + [timer.max, timer.total]
+        table.add_row(name, str(timer.count), *(f"{value / 1e6:.2f}" for value in row))
+
+    for name in sorted(_counters):
+        table.add_row(name, str(_counters[name]), "", "", "", "", "")
+    return table
+
+def print_report(console=None):
+    if console is None:
+        from terminal import console
+    if _timers or _counters:
+        console.print(report_table())
@@ -1,13 +1,20 @@
+import hashlib
+import inspect
+import json
+import os
 import random
+import tempfile
+from types import MappingProxyType
 from abc import ABC, abstractmethod
-from rich.console import Console
 from rich.text import Text
-
-console = Console()
+import metrics
+from terminal import console
 
 class Character(ABC):
     """Abstract base class for all characters (shared with Player)"""
     
+    __slots__ = ("_name", "_level", "_hp", "_max_hp", "_attack")
+    
     def __init__(self, name="", level=1):
         self._name = name
         self._level = level
@@ -569,85 +576,222 @@ class VoidWraith(MonsterType):
             "Reality seems to bend and warp around the wraith's form."
         ]
 
+# Spawn tables used by Monster.create_monster
+REGULAR_MONSTER_TYPES = (
+    Goblin(), Orc(), Skeleton(), Wolf(),
+    Bandit(), Troll(), DarkKnight(), DragonWhelp()
+)
+
+BOSS_MONSTER_TYPES = (AncientLich(), CrimsonDragon(), VoidWraith())
+
+# Lookup used when a monster is restored from a saved battle
+MONSTER_TYPES_BY_NAME = {t.base_name: t for t in REGULAR_MONSTER_TYPES + BOSS_MONSTER_TYPES}
+
+# (rarity, spawn probability) for regular monsters
+RARITY_WEIGHTS = (
+    ("common", 0.70),
+    ("uncommon", 0.20),
+    ("rare", 0.08),
+    ("legendary", 0.02)
+)
+
+RARITY_STAT_MULTIPLIERS = {
+    "common": 1.0,
+    "uncommon": 1.2,
+    "rare": 1.4,
+    "legendary": 1.7
+}
+
+# Threat is weighted by rarity on top of the stats themselves
+RARITY_THREAT_MULTIPLIERS = {
+    "common": 1.0,
+    "uncommon": 1.3,
+    "rare": 1.6,
+    "legendary": 2.0
+}
+
+BOSS_TITLES = ("Overlord", "Destroyer", "Terror", "Nightmare", "Doom Bringer")
+
+def threat_tier(max_hp, attack, rarity, is_boss):
+    """Threat tier name for a stat block"""
+    total_power = (max_hp + attack * 5) * RARITY_THREAT_MULTIPLIERS.get(rarity, 1.0)
+    
+    if is_boss:
+        total_power *= 1.5
+    
+    if total_power < 100:
+        return "Low"
+    elif total_power < 200:
+        return "Medium"
+    elif total_power < 350:
+        return "High"
+    elif total_power < 500:
+        return "Extreme"
+    else:
+        return "Legendary"
+
+THREAT_COLORS = {
+    "Low": "green",
+    "Medium": "yellow",
+    "High": "red",
+    "Extreme": "bright_red",
+    "Legendary": "magenta"
+}
+
+RARITY_COLORS = {
+    "common": "white",
+    "uncommon": "green",
+    "rare": "blue",
+    "legendary": "gold1"
+}
+
+# Shown before the name when a monster appears, bosses use "boss"
+RARITY_PREFIXES = {
+    "boss": "💀 BOSS: ",
+    "legendary": "✨ LEGENDARY: ",
+    "rare": "💎 RARE: ",
+    "uncommon": "⭐ ELITE: "
+}
+
+# Appended to the flavor text, bosses get theirs on top
+RARITY_DESCRIPTIONS = {
+    "uncommon": " This specimen seems unusually strong.",
+    "rare": " An aura of power surrounds this rare creature.",
+    "legendary": " This legendary being radiates immense power."
+}
+BOSS_DESCRIPTION = " Its presence fills you with dread."
+UNKNOWN_DESCRIPTION = "A mysterious creature of unknown origin."
+
+REWARD_MULTIPLIERS = {
+    "common": 1.0,
+    "uncommon": 1.3,
+    "rare": 1.6,
+    "legendary": 2.0
+}
+
+class MonsterTemplate:
+    """Everything shared by the spawns of one (type, rarity, boss, level)
+
+    Stats, name, threat tier, colors and texts are worked out once here, so a
+    Monster only carries what changes in battle and reads the rest from its
+    template. Templates are immutable and shared, get them from
+    monster_template().
+    """
+
+    __slots__ = (
+        "monster_type", "rarity", "is_boss", "level",
+        "hp", "attack", "name", "threat", "threat_color",
+        "rarity_color", "prefix", "emoji", "descriptions", "reward_multiplier"
+    )
+
+    def __init__(self, monster_type, rarity, is_boss, level):
+        if monster_type is not None:
+            hp, attack, name, threat = encounter_cache().lookup(level, monster_type, rarity, is_boss)
+            descriptions = tuple(monster_type.flavor_texts)
+        else:
+            hp = attack = name = threat = None
+            descriptions = ()
+
+        suffix = RARITY_DESCRIPTIONS.get(rarity, "") + (BOSS_DESCRIPTION if is_boss else "")
+        reward_multiplier = REWARD_MULTIPLIERS.get(rarity, 1.0) * (2.0 if is_boss else 1.0)
+
+        fields = {
+            "monster_type": monster_type,
+            "rarity": rarity,
+            "is_boss": is_boss,
+            "level": level,
+            "hp": hp,
+            "attack": attack,
+            "name": name,
+            "threat": threat,
+            "threat_color": THREAT_COLORS.get(threat, "white"),
+            "rarity_color": RARITY_COLORS.get(rarity, "white"),
+            "prefix": RARITY_PREFIXES.get("boss" if is_boss else rarity, ""),
+            "emoji": monster_type.emoji if monster_type is not None else "👾",
+            "descriptions": tuple(text + suffix for text in descriptions),
+            "reward_multiplier": reward_multiplier
+        }
+        for field, value in fields.items():
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Monster templates are read-only")
+
+    def __repr__(self):
+        type_name = self.monster_type.base_name if self.monster_type else None
+        return f"MonsterTemplate({type_name!r}, rarity='{self.rarity}', is_boss={self.is_boss}, level={self.level})"
+
+_templates = {}
+
+def monster_template(monster_type, rarity, is_boss, level):
+    """The shared template for a spawn, built on first use"""
+    key = (monster_type, rarity, is_boss, level)
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = MonsterTemplate(monster_type, rarity, is_boss, level)
+    return template
+
 class Monster(Character):
+    """A monster in battle: its template plus HP, buffed attack, effects and cooldown"""
+
+    __slots__ = ("_template", "_threat", "_status_effects", "_status_effects_view", "_special_cooldown")
+
     def __init__(self, name, hp, attack, level=1, monster_type=None, rarity="common", is_boss=False):
         super().__init__(name, level)
+        self._template = monster_template(monster_type, rarity, is_boss, level)
         self.max_hp = hp
         self.hp = hp
         self.attack = attack
-        self._monster_type = monster_type
-        self._rarity = rarity
-        self._is_boss = is_boss
         self._status_effects = {}  # For tracking poison, stun, etc.
+        self._status_effects_view = MappingProxyType(self._status_effects)
         self._special_cooldown = 0
     
+    @Character.max_hp.setter
+    def max_hp(self, value):
+        Character.max_hp.fset(self, value)
+        self._threat = None
+    
+    @Character.attack.setter
+    def attack(self, value):
+        Character.attack.fset(self, value)
+        self._threat = None
+    
+    @property
+    def template(self):
+        return self._template
+    
     @property
     def monster_type(self):
-        return self._monster_type
+        return self._template.monster_type
     
     @property
     def rarity(self):
-        return self._rarity
+        return self._template.rarity
     
     @property
     def is_boss(self):
-        return self._is_boss
+        return self._template.is_boss
     
     @property
     def status_effects(self):
-        return self._status_effects.copy()
+        return self._status_effects_view
     
     @property
     def threat_level(self):
-        """Calculate threat level based on stats and rarity"""
-        base_power = self.max_hp + (self.attack * 5)
-        
-        # Adjust for rarity
-        rarity_multiplier = {
-            "common": 1.0,
-            "uncommon": 1.3,
-            "rare": 1.6,
-            "legendary": 2.0
-        }
-        
-        total_power = base_power * rarity_multiplier.get(self._rarity, 1.0)
-        
-        if self._is_boss:
-            total_power *= 1.5
-        
-        if total_power < 100:
-            return "Low"
-        elif total_power < 200:
-            return "Medium"
-        elif total_power < 350:
-            return "High"
-        elif total_power < 500:
-            return "Extreme"
-        else:
-            return "Legendary"
+        """Threat tier from the actual stats, worked out again only after they change"""
+        if self._threat is None:
+            self._threat = threat_tier(self._max_hp, self._attack, self._template.rarity, self._template.is_boss)
+        return self._threat
     
     @property
     def threat_color(self):
         """Get color based on threat level"""
-        threat_colors = {
-            "Low": "green",
-            "Medium": "yellow", 
-            "High": "red",
-            "Extreme": "bright_red",
-            "Legendary": "magenta"
-        }
-        return threat_colors.get(self.threat_level, "white")
+        return THREAT_COLORS.get(self.threat_level, "white")
     
     @property
     def rarity_color(self):
         """Get color based on rarity"""
-        rarity_colors = {
-            "common": "white",
-            "uncommon": "green",
-            "rare": "blue",
-            "legendary": "gold1"
-        }
-        return rarity_colors.get(self._rarity, "white")
+        return self._template.rarity_color
     
     def add_status_effect(self, effect, duration):
         """Add a status effect"""
@@ -692,16 +836,17 @@ class Monster(Character):
     
     def use_special_ability(self, player):
         """Use the monster's special ability"""
-        if not self._monster_type or not self._monster_type.special_ability:
+        monster_type = self._template.monster_type
+        if not monster_type or not monster_type.special_ability:
             return False
         
         if self._special_cooldown > 0:
             return False
         
-        if random.random() > self._monster_type.special_ability_chance:
+        if random.random() > monster_type.special_ability_chance:
             return False
         
-        ability = self._monster_type.special_ability
+        ability = monster_type.special_ability
         
         if ability == "sneak_attack":
             bonus_damage = random.randint(5, 10)
@@ -807,22 +952,77 @@ class Monster(Character):
         
         return actual_damage
     
+    def snapshot(self):
+        """Compact tuple of the monster's state, cheap enough to take every turn"""
+        template = self._template
+        return (
+            template.monster_type.base_name if template.monster_type else None,
+            self.name,
+            self.level,
+            self.hp,
+            self.max_hp,
+            self.attack,
+            template.rarity,
+            template.is_boss,
+            tuple(self._status_effects.items()),
+            self._special_cooldown
+        )
+    
+    def battle_state(self):
+        """Immutable tuple of what a battle changes, the template and name are never copied"""
+        return (self.hp, self.attack, tuple(self._status_effects.items()), self._special_cooldown)
+    
+    def restore_battle_state(self, state):
+        """Put the monster back in a state from battle_state()"""
+        hp, attack, status_effects, self._special_cooldown = state
+        self.attack = attack
+        self.hp = hp
+        self._status_effects.clear()
+        self._status_effects.update(status_effects)
+    
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Restore a monster from snapshot() (tuples may come back from JSON as lists)"""
+        (type_name, name, level, hp, max_hp, attack,
+         rarity, is_boss, status_effects, special_cooldown) = snapshot
+        monster = cls(name, max_hp, attack, level, MONSTER_TYPES_BY_NAME.get(type_name), rarity, is_boss)
+        monster.hp = hp
+        monster._status_effects.update(status_effects)
+        monster._special_cooldown = special_cooldown
+        return monster
+    
+    def observation(self):
+        """Observable state as plain data, for bots"""
+        template = self._template
+        return {
+            "name": self.name,
+            "monster_type": template.monster_type.base_name if template.monster_type else None,
+            "level": self.level,
+            "hp": self.hp,
+            "max_hp": self.max_hp,
+            "attack": self.attack,
+            "rarity": template.rarity,
+            "is_boss": template.is_boss,
+            "threat_level": self.threat_level,
+            "status_effects": dict(self._status_effects)
+        }
+    
     def get_status_display(self):
         """Get formatted status display"""
         status_text = Text()
-        emoji = self._monster_type.emoji if self._monster_type else "👾"
+        template = self._template
         
         # Name with rarity coloring
-        status_text.append(f"{emoji} ", style="white")
+        status_text.append(f"{template.emoji} ", style="white")
         status_text.append(f"{self.name}", style=f"bold {self.rarity_color}")
         
-        if self._is_boss:
+        if template.is_boss:
             status_text.append(" 👑", style="gold1")
         
         status_text.append(f"\nLevel: {self.level} | ", style="cyan")
         status_text.append(f"HP: {self.hp}/{self.max_hp} | ", style="red")
         status_text.append(f"Attack: {self.attack}\n", style="yellow")
-        status_text.append(f"Rarity: {self._rarity.title()}", style=self.rarity_color)
+        status_text.append(f"Rarity: {template.rarity.title()}", style=template.rarity_color)
         status_text.append(f" | Threat: {self.threat_level}", style=self.threat_color)
         
         # Show active status effects
@@ -835,24 +1035,58 @@ class Monster(Character):
         
         return status_text
     
+    @staticmethod
+    def boss_chance(player_level):
+        """Chance of a boss spawn at a player level"""
+        if player_level < 5:
+            return 0.0
+        return max(0, (player_level - 4) * 0.02)
+    
+    @staticmethod
+    def scaled_stats(monster_type, player_level, rarity, is_boss):
+        """Scale a monster type's base stats, before random variance"""
+        # Scale monster stats based on player level and rarity
+        level_multiplier = 1 + (player_level - 1) * 0.3
+        
+        total_multiplier = level_multiplier * RARITY_STAT_MULTIPLIERS[rarity]
+        
+        if is_boss:
+            total_multiplier *= 1.5
+        
+        scaled_hp = int(monster_type.base_hp * total_multiplier)
+        scaled_attack = int(monster_type.base_attack * total_multiplier)
+        return scaled_hp, scaled_attack
+    
+    @classmethod
+    def spawn_distribution(cls, player_level):
+        """List (probability, monster_type, rarity, is_boss) for every possible spawn"""
+        boss_chance = cls.boss_chance(player_level)
+        spawns = []
+        
+        if boss_chance > 0:
+            for monster_type in BOSS_MONSTER_TYPES:
+                spawns.append((boss_chance / len(BOSS_MONSTER_TYPES), monster_type, "legendary", True))
+        
+        for monster_type in REGULAR_MONSTER_TYPES:
+            for rarity, weight in RARITY_WEIGHTS:
+                probability = (1 - boss_chance) * weight / len(REGULAR_MONSTER_TYPES)
+                spawns.append((probability, monster_type, rarity, False))
+        
+        return spawns
+    
     @classmethod
+    @metrics.timed("monsters.create_monster")
     def create_monster(cls, player_level):
         """Create a monster scaled to player level"""
         # Determine if boss spawn (5% chance at level 5+, increases with level)
-        boss_chance = max(0, (player_level - 4) * 0.02)
-        is_boss = random.random() < boss_chance and player_level >= 5
+        is_boss = random.random() < cls.boss_chance(player_level)
         
         if is_boss:
             # Boss monsters
-            boss_types = [AncientLich(), CrimsonDragon(), VoidWraith()]
-            monster_type = random.choice(boss_types)
+            monster_type = random.choice(BOSS_MONSTER_TYPES)
         else:
             # Regular monsters
-            monster_types = [
-                Goblin(), Orc(), Skeleton(), Wolf(),
-                Bandit(), Troll(), DarkKnight(), DragonWhelp()
-            ]
-            monster_type = random.choice(monster_types)
+            monster_type = random.choice(REGULAR_MONSTER_TYPES)
         
         # Determine rarity
         if is_boss:
@@ -868,38 +1102,29 @@ class Monster(Character):
             else:
                 rarity = "legendary"
         
-        # Scale monster stats based on player level and rarity
-        level_multiplier = 1 + (player_level - 1) * 0.3
-        
-        # Rarity multipliers
-        rarity_multipliers = {
-            "common": 1.0,
-            "uncommon": 1.2,
-            "rare": 1.4,
-            "legendary": 1.7
-        }
-        
-        total_multiplier = level_multiplier * rarity_multipliers[rarity]
-        
-        if is_boss:
-            total_multiplier *= 1.5
-        
         hp_variance = random.randint(-5, 10)
         attack_variance = random.randint(-2, 3)
         
-        scaled_hp = int(monster_type.base_hp * total_multiplier) + hp_variance
-        scaled_attack = int(monster_type.base_attack * total_multiplier) + attack_variance
+        # Scaled stats and name come from the template, only the variance is rolled here
+        template = monster_template(monster_type, rarity, is_boss, player_level)
         
         # Ensure minimum stats
-        scaled_hp = max(scaled_hp, 20)
-        scaled_attack = max(scaled_attack, 5)
+        scaled_hp = max(template.hp + hp_variance, 20)
+        scaled_attack = max(template.attack + attack_variance, 5)
+        
+        name = template.name
+        if is_boss:
+            name = name.format(random.choice(BOSS_TITLES))
         
-        # Create name with modifiers
+        return cls(name, scaled_hp, scaled_attack, player_level, monster_type, rarity, is_boss)
+    
+    @staticmethod
+    def display_name(monster_type, player_level, rarity, is_boss):
+        """Name with rarity and level titles, bosses get a {} for their random title"""
         name = monster_type.base_name
         
         if is_boss:
-            boss_titles = ["Overlord", "Destroyer", "Terror", "Nightmare", "Doom Bringer"]
-            name = f"{random.choice(boss_titles)} {name}"
+            name = "{} " + name
         elif rarity == "legendary":
             name = f"Legendary {name}"
         elif rarity == "rare":
@@ -915,70 +1140,195 @@ class Monster(Character):
         elif player_level > 6:
             name = f"Veteran {name}"
         
-        return cls(name, scaled_hp, scaled_attack, player_level, monster_type, rarity, is_boss)
+        return name
     
     def get_description(self):
         """Get a description of the monster with variety"""
-        if self._monster_type and self._monster_type.flavor_texts:
-            base_description = random.choice(self._monster_type.flavor_texts)
-            
-            # Add rarity-based flavor
-            if self._rarity == "uncommon":
-                base_description += " This specimen seems unusually strong."
-            elif self._rarity == "rare":
-                base_description += " An aura of power surrounds this rare creature."
-            elif self._rarity == "legendary":
-                base_description += " This legendary being radiates immense power."
-            
-            if self._is_boss:
-                base_description += " Its presence fills you with dread."
-            
-            return base_description
-        return "A mysterious creature of unknown origin."
+        descriptions = self._template.descriptions
+        if descriptions:
+            return random.choice(descriptions)
+        return UNKNOWN_DESCRIPTION
     
     def get_combat_message(self, action="appears"):
         """Get a formatted combat message"""
-        emoji = self._monster_type.emoji if self._monster_type else "👾"
-        
-        rarity_prefix = ""
-        if self._is_boss:
-            rarity_prefix = "💀 BOSS: "
-        elif self._rarity == "legendary":
-            rarity_prefix = "✨ LEGENDARY: "
-        elif self._rarity == "rare":
-            rarity_prefix = "💎 RARE: "
-        elif self._rarity == "uncommon":
-            rarity_prefix = "⭐ ELITE: "
+        template = self._template
         
         if action == "appears":
-            return f"{rarity_prefix}{emoji} A wild [bold {self.rarity_color}]{self.name}[/bold {self.rarity_color}] appears!"
+            return f"{template.prefix}{template.emoji} A wild [bold {template.rarity_color}]{self.name}[/bold {template.rarity_color}] appears!"
         elif action == "attacks":
-            return f"{emoji} {self.name} prepares to attack!"
+            return f"{template.emoji} {self.name} prepares to attack!"
         elif action == "defeated":
             return f"💀 {self.name} has been defeated!"
         
-        return f"{emoji} {self.name} {action}!"
+        return f"{template.emoji} {self.name} {action}!"
     
     def get_reward_multiplier(self):
         """Get reward multiplier based on rarity and boss status"""
-        multipliers = {
-            "common": 1.0,
-            "uncommon": 1.3,
-            "rare": 1.6,
-            "legendary": 2.0
-        }
-        
-        base_multiplier = multipliers.get(self._rarity, 1.0)
-        
-        if self._is_boss:
-            base_multiplier *= 2.0
-        
-        return base_multiplier
+        return self._template.reward_multiplier
     
     def __str__(self):
-        rarity_indicator = f" ({self._rarity.title()})" if self._rarity != "common" else ""
-        boss_indicator = " [BOSS]" if self._is_boss else ""
+        rarity = self._template.rarity
+        rarity_indicator = f" ({rarity.title()})" if rarity != "common" else ""
+        boss_indicator = " [BOSS]" if self._template.is_boss else ""
         return f"{self.name}{rarity_indicator}{boss_indicator} (Level {self.level}) - HP: {self.hp}/{self.max_hp}, Attack: {self.attack}"
     
     def __repr__(self):
-        return f"Monster(name='{self.name}', hp={self.hp}, attack={self.attack}, level={self.level}, rarity='{self._rarity}', is_boss={self._is_boss})"
\ No newline at end of file
+        return f"Monster(name='{self.name}', hp={self.hp}, attack={self.attack}, level={self.level}, rarity='{self.rarity}', is_boss={self.is_boss})"
+
+# Bump when rules outside the hashed data and functions change, so old cache files are ignored
+ENCOUNTER_CACHE_VERSION = 1
+ENCOUNTER_CACHE_LEVELS = 100
+ENCOUNTER_CACHE_NAME = "python-adventure-rpg"
+
+def cache_directories():
+    """Where cache files may go, best first: the user cache directory, then a temp directory"""
+    if os.environ.get("XDG_CACHE_HOME"):
+        base = os.environ["XDG_CACHE_HOME"]
+    elif os.name == "nt" and os.environ.get("LOCALAPPDATA"):
+        base = os.environ["LOCALAPPDATA"]
+    else:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return [os.path.join(base, ENCOUNTER_CACHE_NAME),
+            os.path.join(tempfile.gettempdir(), f"{ENCOUNTER_CACHE_NAME}-cache")]
+
+def _code_hash(func):
+    """Hash of a function's source, or of its bytecode when the source isn't shipped"""
+    try:
+        code = inspect.getsource(func).encode("utf-8")
+    except (OSError, TypeError):
+        code = func.__code__.co_code + repr(func.__code__.co_consts).encode("utf-8")
+    return hashlib.sha256(code).hexdigest()
+
+class EncounterCache:
+    """Scaled stats, names and threat tiers for every spawn up to a level cap
+
+    Rows are (hp, attack, name, threat) before random variance. They are saved
+    to the user cache directory under a hash of the monster data and of the
+    code computing the rows, so a later start just loads them, and any change
+    to the data or rules builds a fresh file.
+    """
+
+    def __init__(self, max_level=ENCOUNTER_CACHE_LEVELS, directory=None):
+        self.max_level = max_level
+        self.directories = [directory] if directory else cache_directories()
+        self.data_hash = self._data_hash()
+        self.filename = f"encounters-{self.data_hash}.json"
+        # The file loaded or saved, None while there is none
+        self.path = None
+        self._keys = self._spawn_keys()
+        # (type name, rarity, is_boss) -> position of its row in every level
+        self._index = None
+        self._levels = None
+
+    def _spawn_keys(self):
+        keys = [(monster_type, "legendary", True) for monster_type in BOSS_MONSTER_TYPES]
+        keys += [(monster_type, rarity, False) for monster_type in REGULAR_MONSTER_TYPES for rarity, _ in RARITY_WEIGHTS]
+        return keys
+
+    def _data_hash(self):
+        data = {
+            "version": ENCOUNTER_CACHE_VERSION,
+            "max_level": self.max_level,
+            "types": [(t.base_name, t.base_hp, t.base_attack) for t in REGULAR_MONSTER_TYPES + BOSS_MONSTER_TYPES],
+            "rarity_weights": RARITY_WEIGHTS,
+            "rarity_stats": RARITY_STAT_MULTIPLIERS,
+            "rarity_threat": RARITY_THREAT_MULTIPLIERS,
+            "code": [_code_hash(func) for func in (Monster.scaled_stats, Monster.display_name,
+                                                   threat_tier, EncounterCache.build_row)]
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def build_row(player_level, monster_type, rarity, is_boss):
+        hp, attack = Monster.scaled_stats(monster_type, player_level, rarity, is_boss)
+        name = Monster.display_name(monster_type, player_level, rarity, is_boss)
+        return hp, attack, name, threat_tier(hp, attack, rarity, is_boss)
+
+    def build(self):
+        """Compute every row, returns rows per level in spawn key order"""
+        return [
+            [self.build_row(level, monster_type, rarity, is_boss) for monster_type, rarity, is_boss in self._keys]
+            for level in range(1, self.max_level + 1)
+        ]
+
+    def load(self):
+        """Load the cache file, building and saving it first if it is missing or stale"""
+        levels = None
+        for directory in self.directories:
+            levels = self._read(os.path.join(directory, self.filename))
+            if levels is not None:
+                self.path = os.path.join(directory, self.filename)
+                break
+        if levels is None:
+            levels = self.build()
+            self._save(levels)
+
+        self._index = {(monster_type.base_name, rarity, is_boss): index
+                       for index, (monster_type, rarity, is_boss) in enumerate(self._keys)}
+        self._levels = [None] + levels
+
+    def _read(self, path):
+        """Rows per level from a cache file, None when it is missing or unreadable"""
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+            strings = data["strings"]
+            # Each level is a flat [hp, attack, name index, threat index, ...] list
+            levels = [
+                [(row[i], row[i + 1], strings[row[i + 2]], strings[row[i + 3]]) for i in range(0, len(row), 4)]
+                for row in data["levels"]
+            ]
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
+        return levels if len(levels) == self.max_level else None
+
+    def _save(self, levels):
+        # Names and threat tiers repeat a lot, so rows point into one string table
+        strings = {}
+        flat_levels = []
+        for rows in levels:
+            flat = []
+            for hp, attack, name, threat in rows:
+                flat += (hp, attack, strings.setdefault(name, len(strings)), strings.setdefault(threat, len(strings)))
+            flat_levels.append(flat)
+        data = {"strings": list(strings), "levels": flat_levels}
+
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        for directory in self.directories:
+            path = os.path.join(directory, self.filename)
+            try:
+                os.makedirs(directory, exist_ok=True)
+                with open(path + ".tmp", 'w') as file:
+                    file.write(text)
+                os.replace(path + ".tmp", path)
+            except OSError:
+                continue
+            self.path = path
+            # Files for older data can never match again
+            for filename in os.listdir(directory):
+                if filename.startswith("encounters-") and filename.endswith(".json") and filename != self.filename:
+                    try:
+                        os.remove(os.path.join(directory, filename))
+                    except OSError:
+                        pass
+            return
+        # Nowhere writable, the game still works and just rebuilds on every start
+
+    def lookup(self, player_level, monster_type, rarity, is_boss):
+        """(hp, attack, name, threat) before variance for one spawn"""
+        if self._levels is None:
+            self.load()
+        if 1 <= player_level <= self.max_level:
+            index = self._index.get((monster_type.base_name, rarity, is_boss))
+            if index is not None:
+                return self._levels[player_level][index]
+        return self.build_row(player_level, monster_type, rarity, is_boss)
+
+_encounter_cache = None
+
+def encounter_cache():
+    """The shared encounter cache, loaded on first use"""
+    global _encounter_cache
+    if _encounter_cache is None:
+        _encounter_cache = EncounterCache()
+    return _encounter_cache
@@ -0,0 +1,245 @@
+# optimizer.py - Loadout optimizer: best equipment and skill allocation for a gold budget
+import math
+from functools import lru_cache
+import damage
+from catalog import EQUIPMENT_CATALOG
+from monsters import Monster
+from player import SKILL_BONUSES
+
+# Average of the random spawn variance in Monster.create_monster
+MEAN_HP_VARIANCE = 2.5
+MEAN_ATTACK_VARIANCE = 0.5
+
+# Fight length the power objective averages special attacks over
+REFERENCE_TURNS = 10
+
+# Stat block order, and the gear bonus feeding each stat (special damage has none)
+STATS = ("attack", "max_hp", "max_mana", "special_damage")
+GEAR_BONUSES = ("attack_bonus", "hp_bonus", "mana_bonus")
+
+# Slots the shop sells and their catalog category, the accessory is kept
+SLOTS_FOR_SALE = (("weapon", "weapons"), ("armor", "armor"))
+
+OBJECTIVES = {
+    "power": "Effective HP × damage per turn",
+    "win_rate": "Expected win rate against this level's monsters"
+}
+
+class Loadout:
+    """A purchase plan plus a skill point allocation"""
+
+    def __init__(self, weapon, armor, skills, cost, score, stats):
+        self.weapon = weapon
+        self.armor = armor
+        self.skills = skills
+        self.cost = cost
+        self.score = score
+        self.stats = stats
+
+    def __repr__(self):
+        weapon = self.weapon["name"] if self.weapon else None
+        armor = self.armor["name"] if self.armor else None
+        return f"Loadout(weapon={weapon!r}, armor={armor!r}, skills={self.skills}, cost={self.cost}, score={self.score:.3f})"
+
+def special_casts(max_mana, special_mana_cost):
+    """Specials a full mana bar pays for, mana doesn't come back during a battle"""
+    if special_mana_cost <= 0:
+        return math.inf
+    return max_mana // special_mana_cost
+
+def damage_over_turns(turns, attack, special_damage, special_cooldown, casts, attack_factor):
+    """Expected damage of a fight's first turns
+
+    Regular attacks, with the special replacing one of them every cooldown
+    cycle from the first turn on, for as long as the mana lasts.
+    """
+    regular = attack * attack_factor
+    specials = min(casts, math.ceil(turns / max(1, special_cooldown)))
+    return regular * turns + specials * max(0, special_damage - regular)
+
+def turns_to_kill(monster_hp, attack, special_damage, special_cooldown, casts, attack_factor):
+    """Turns until the expected damage reaches the monster's HP, inf when it never does"""
+    regular = attack * attack_factor
+    cycle = max(1, special_cooldown)
+    turns = 1
+    while damage_over_turns(turns, attack, special_damage, special_cooldown, casts, attack_factor) < monster_hp:
+        # Out of specials and no regular damage, nothing more is coming
+        if regular <= 0 and turns >= casts * cycle:
+            return math.inf
+        turns += 1
+    return turns
+
+@lru_cache(maxsize=None)
+def _spawn_table(player_level):
+    """Expected monster stats for every spawn at a level"""
+    table = []
+    for probability, monster_type, rarity, is_boss in Monster.spawn_distribution(player_level):
+        hp, attack = Monster.scaled_stats(monster_type, player_level, rarity, is_boss)
+        table.append((
+            probability,
+            max(20, hp + MEAN_HP_VARIANCE),
+            max(5, attack + MEAN_ATTACK_VARIANCE)
+        ))
+    return tuple(table)
+
+@lru_cache(maxsize=65536)
+def _evaluate(objective, stats, profile, player_level):
+    """Score a stat block, memoized since many loadouts share stats"""
+    attack, max_hp, max_mana, special_damage = stats
+    # Average effect of the player's attack and of the monsters' attacks on the player
+    attack_factor, taken_factor, special_mana_cost, special_cooldown = profile
+    # Max mana is special attack uptime: how many specials a fight can pay for
+    casts = special_casts(max_mana, special_mana_cost)
+
+    if objective == "power":
+        effective_hp = max_hp / taken_factor
+        damage_per_turn = damage_over_turns(
+            REFERENCE_TURNS, attack, special_damage, special_cooldown, casts, attack_factor
+        ) / REFERENCE_TURNS
+        return effective_hp * damage_per_turn
+
+    win_rate = 0.0
+    for probability, monster_hp, monster_attack in _spawn_table(player_level):
+        damage_taken = monster_attack * taken_factor
+        turns_to_die = math.ceil(max_hp / damage_taken)
+        # The player strikes first every turn
+        if turns_to_kill(monster_hp, attack, special_damage, special_cooldown, casts, attack_factor) <= turns_to_die:
+            win_rate += probability
+    return win_rate
+
+def _gear_bonuses(item):
+    """An item's (attack, hp, mana) bonuses, zeros for an empty slot"""
+    return tuple(item.get(bonus, 0) for bonus in GEAR_BONUSES) if item else (0,) * len(GEAR_BONUSES)
+
+def _pareto(options):
+    """Drop (cost, bonuses, payload) options another beats on cost and every bonus"""
+    options = sorted(options, key=lambda option: (option[0], [-bonus for bonus in option[1]]))
+    kept = []
+    for option in options:
+        cost, bonuses = option[0], option[1]
+        if not any(k_cost <= cost and all(a >= b for a, b in zip(k_bonuses, bonuses))
+                   for k_cost, k_bonuses, _ in kept):
+            kept.append(option)
+    return kept
+
+class LoadoutOptimizer:
+    """Find the best equipment purchases and skill allocation for a player"""
+
+    def __init__(self, player, objective="power"):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Objective must be one of: {list(OBJECTIVES)}")
+        self.player = player
+        self.objective = objective
+        self._profile = (
+            damage.pipeline_for(damage.ATTACK, player, None).factor,
+            damage.pipeline_for(damage.MONSTER_ATTACK, None, player).factor,
+            player.special_mana_cost,
+            player.special_max_cooldown
+        )
+
+    def score(self, stats):
+        """Score a (attack, max_hp, max_mana, special_damage) stat block"""
+        return _evaluate(self.objective, stats, self._profile, self.player.level)
+
+    def _slot_options(self, slot, category, budget):
+        """Keep-current option plus every affordable catalog item, without dominated ones"""
+        current = self.player.equipment.get(slot)
+        options = [(0, _gear_bonuses(current), current)]
+        for item in EQUIPMENT_CATALOG.available_equipment(category, self.player.level):
+            if current and item["name"] == current["name"]:
+                continue
+            if item["price"] <= budget:
+                options.append((item["price"], _gear_bonuses(item), item))
+        return _pareto(options)
+
+    def _gear_plans(self, budget):
+        """Knapsack over the slots for sale, one slot at a time
+
+        Each step extends the plans so far by every option of the next slot
+        and keeps only the non-dominated ones within budget, so the number of
+        plans stays small however big the catalog is.
+        """
+        plans = [(0, (0,) * len(GEAR_BONUSES), ())]
+        for slot, category in SLOTS_FOR_SALE:
+            options = self._slot_options(slot, category, budget)
+            plans = _pareto([
+                (cost + price, tuple(a + b for a, b in zip(bonuses, item_bonuses)), items + (item,))
+                for cost, bonuses, items in plans
+                for price, item_bonuses, item in options
+                if cost + price <= budget
+            ])
+        return plans
+
+    def optimize(self, budget=None):
+        """Return the best Loadout affordable within the gold budget
+
+        Branch and bound: every gear plan and partial skill allocation is
+        first scored optimistically, as if each remaining skill got all the
+        remaining points. Scores only grow with each stat, so a branch whose
+        optimistic score can't beat the best plan so far is skipped.
+        """
+        budget = self.player.gold if budget is None else budget
+        base = self.player.base_stats
+        allocated = self.player.allocated_skills
+        points = self.player.skill_points
+        skills = list(SKILL_BONUSES)
+        # Stat block index and per-point bonus of each skill
+        skill_stats = [(STATS.index(SKILL_BONUSES[skill][0]), SKILL_BONUSES[skill][1]) for skill in skills]
+
+        accessory = _gear_bonuses(self.player.equipment.get("accessory"))
+        plans = []
+        for cost, bonuses, (weapon, armor) in self._gear_plans(budget):
+            stats = [base[stat] for stat in STATS]
+            for index, bonus in enumerate(bonuses):
+                stats[index] += bonus + accessory[index]
+            for skill, (index, per_point) in zip(skills, skill_stats):
+                stats[index] += allocated[skill] * per_point
+            plans.append((cost, weapon, armor, stats))
+
+        best = None
+
+        def optimistic(stats, first_skill, remaining):
+            stats = list(stats)
+            for index, per_point in skill_stats[first_skill:]:
+                stats[index] += remaining * per_point
+            return self.score(tuple(stats))
+
+        def search(plan, skill, remaining, stats, spent):
+            nonlocal best
+            cost, weapon, armor, _ = plan
+            if skill == len(skills) - 1:
+                # The last skill takes whatever is left
+                stats = list(stats)
+                index, per_point = skill_stats[skill]
+                stats[index] += remaining * per_point
+                stats = tuple(stats)
+                score = self.score(stats)
+                # Prefer the cheaper plan when scores tie
+                if best is None or score > best.score or (score == best.score and cost < best.cost):
+                    allocation = dict(zip(skills, spent + (remaining,)))
+                    best = Loadout(weapon, armor, allocation, cost, score, stats)
+                return
+            if best is not None:
+                bound = optimistic(stats, skill, remaining)
+                if bound < best.score or (bound == best.score and cost >= best.cost):
+                    return
+            index, per_point = skill_stats[skill]
+            for used in range(remaining, -1, -1):
+                next_stats = list(stats)
+                next_stats[index] += used * per_point
+                search(plan, skill + 1, remaining - used, next_stats, spent + (used,))
+
+        # Most promising plans first, so the bound starts cutting early
+        plans.sort(key=lambda plan: (-optimistic(plan[3], 0, points), plan[0]))
+        for plan in plans:
+            search(plan, 0, points, plan[3], ())
+        return best
+
+    def current_score(self):
+        """Score of the player's loadout as it is now"""
+        return self.score((
+            self.player.total_attack,
+            self.player.total_max_hp,
+            self.player.total_max_mana,
+            self.player.total_special_damage
+        ))
@@ -1,15 +1,64 @@
 import json
 import os
+from array import array
+from types import MappingProxyType
 from abc import ABC, abstractmethod
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from rich.prompt import Prompt
 from rich.text import Text
 from rich.progress import Progress, BarColumn, TextColumn
+import terminal
+import telemetry
+import metrics
+from terminal import console
 from utils import get_user_choice
+from items import ITEMS, HEALTH_POTION, MANA_POTION, Inventory, restore_amount
 
-console = Console()
+# Stat gained per allocated skill point
+SKILL_BONUSES = {
+    "strength": ("attack", 2),
+    "vitality": ("max_hp", 10),
+    "intelligence": ("max_mana", 8),
+    "agility": ("special_damage", 1)
+}
+
+# Written by evolver.py, shown in the skill menu
+RECOMMENDED_BUILDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "recommended_builds.json")
+# path -> (modification time, {class: [builds]}), so a rewritten file is read again
+_recommended_builds = {}
+
+def _valid_build(build):
+    """Whether a recommended_builds.json entry has the fields the skill menu shows"""
+    if not isinstance(build, dict):
+        return False
+    level, skills, equipment = build.get("level"), build.get("skills"), build.get("equipment")
+    return (isinstance(level, int) and not isinstance(level, bool)
+            and isinstance(skills, dict) and all(isinstance(points, int) for points in skills.values())
+            and isinstance(equipment, dict) and all(key is None or isinstance(key, str) for key in equipment.values())
+            and isinstance(build.get("survival"), (int, float)))
+
+def _load_recommended_builds(path):
+    """{class: [valid builds]} from a recommendations file, empty when it can't be read"""
+    try:
+        with open(path, 'r') as file:
+            classes = json.load(file)["builds"]
+        return {name: [build for build in builds if _valid_build(build)]
+                for name, builds in classes.items() if isinstance(builds, list)}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+def recommended_build(player_class, level, path=RECOMMENDED_BUILDS_PATH):
+    """Evolved build for the highest level at or below level, None without one"""
+    try:
+        modified = os.path.getmtime(path)
+    except OSError:
+        modified = None
+    cached = _recommended_builds.get(path)
+    if cached is None or cached[0] != modified:
+        cached = _recommended_builds[path] = (modified, _load_recommended_builds(path))
+    classes = cached[1]
+    builds = [build for build in classes.get(player_class, []) if build["level"] <= level]
+    return max(builds, key=lambda build: build["level"], default=None)
 
 class Character(ABC):
     """Abstract base class for all characters"""
@@ -49,7 +98,8 @@ class Character(ABC):
     def hp(self, value):
         if not isinstance(value, int) or value < 0:
             raise ValueError("HP must be a non-negative integer")
-        self._hp = min(value, self._max_hp)
+        # max_hp is the total for players, so skill and gear HP isn't cut off
+        self._hp = min(value, self.max_hp)
     
     @property
     def max_hp(self):
@@ -77,9 +127,9 @@ class Character(ABC):
     
     @property
     def hp_percentage(self):
-        if self._max_hp <= 0:
+        if self.max_hp <= 0:
             return 0
-        return (self._hp / self._max_hp) * 100
+        return (self._hp / self.max_hp) * 100
     
     @abstractmethod
     def take_damage(self, damage):
@@ -104,14 +154,19 @@ class Player(Character):
         self._xp = 0
         self._xp_to_next = 50
         self._gold = 50
-        self._inventory = {"health_potions": 2, "mana_potions": 1}
+        # NEW: Item counts indexed by registry id
+        self._item_counts = ITEMS.new_counts()
+        self._item_counts[HEALTH_POTION] = 2
+        self._item_counts[MANA_POTION] = 1
         
-        # NEW: Equipment system
+        # NEW: Equipment system, slots hold item ids
         self._equipment = {
             "weapon": None,
             "armor": None,
             "accessory": None
         }
+        self._equipped_items = {}
+        self._equipment_bonus = {"attack_bonus": 0, "hp_bonus": 0, "mana_bonus": 0}
         
         # NEW: Skill points system
         self._skill_points = 0
@@ -133,6 +188,14 @@ class Player(Character):
             "levels_gained": 0
         }
         
+        # NEW: Change tracking, bumped by every inventory/equipment/skill/stat write
+        self._version = 0
+        self._listeners = []
+        # Inventory and stats as tuples, shared by battle states until the next tracked change
+        self._tracked_state = None
+        self._tracked_state_version = -1
+        self._bind_views()
+        
         if name and player_class:
             self._set_class_stats()
     
@@ -147,9 +210,54 @@ class Player(Character):
             raise ValueError(f"Player class must be one of: {valid_classes}")
         self._player_class = value
     
+    def _bind_views(self):
+        """Read-only views over the state, reads share it instead of copying"""
+        self._inventory_view = Inventory(self._item_counts)
+        self._equipment_view = MappingProxyType(self._equipped_items)
+        self._equipment_ids_view = MappingProxyType(self._equipment)
+        self._refresh_equipment()
+        self._allocated_skills_view = MappingProxyType(self._allocated_skills)
+        self._stats_view = MappingProxyType(self._stats)
+    
+    @property
+    def version(self):
+        """Counter bumped on every inventory, equipment, skill or stat change"""
+        return self._version
+    
+    def add_listener(self, listener):
+        """Call listener(player, kind, key) after every tracked change"""
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _changed(self, kind, key):
+        self._version += 1
+        for listener in self._listeners:
+            listener(self, kind, key)
+    
+    def _refresh_equipment(self):
+        """Resolve equipped ids through the registry and total their bonuses"""
+        self._equipped_items.clear()
+        for bonus in self._equipment_bonus:
+            self._equipment_bonus[bonus] = 0
+        for slot, item_id in self._equipment.items():
+            item = ITEMS.get(item_id) if item_id else None
+            self._equipped_items[slot] = item
+            if item:
+                for bonus in self._equipment_bonus:
+                    self._equipment_bonus[bonus] += item.get(bonus, 0)
+    
     @property
     def equipment(self):
-        return self._equipment.copy()
+        """Equipped items by slot (None for an empty slot)"""
+        return self._equipment_view
+    
+    @property
+    def equipment_ids(self):
+        """Equipped item ids by slot"""
+        return self._equipment_ids_view
     
     @property
     def skill_points(self):
@@ -157,50 +265,50 @@ class Player(Character):
     
     @property
     def allocated_skills(self):
-        return self._allocated_skills.copy()
+        return self._allocated_skills_view
     
     @property
     def stats(self):
-        return self._stats.copy()
+        return self._stats_view
     
     @property
     def total_attack(self):
         """Calculate total attack including equipment and skills"""
         base_attack = self._attack
-        skill_bonus = self._allocated_skills["strength"] * 2
-        equipment_bonus = 0
-        
-        if self._equipment["weapon"]:
-            equipment_bonus += self._equipment["weapon"]["attack_bonus"]
-        
-        return base_attack + skill_bonus + equipment_bonus
+        skill_bonus = self._allocated_skills["strength"] * SKILL_BONUSES["strength"][1]
+        return base_attack + skill_bonus + self._equipment_bonus["attack_bonus"]
     
     @property
     def total_max_hp(self):
         """Calculate total max HP including equipment and skills"""
         base_hp = self._max_hp
-        skill_bonus = self._allocated_skills["vitality"] * 10
-        equipment_bonus = 0
-        
-        if self._equipment["armor"]:
-            equipment_bonus += self._equipment["armor"]["hp_bonus"]
-        
-        return base_hp + skill_bonus + equipment_bonus
+        skill_bonus = self._allocated_skills["vitality"] * SKILL_BONUSES["vitality"][1]
+        return base_hp + skill_bonus + self._equipment_bonus["hp_bonus"]
     
     @property
     def total_max_mana(self):
-        """Calculate total max mana including skills"""
+        """Calculate total max mana including equipment and skills"""
         base_mana = self._max_mana
-        skill_bonus = self._allocated_skills["intelligence"] * 8
-        return base_mana + skill_bonus
+        skill_bonus = self._allocated_skills["intelligence"] * SKILL_BONUSES["intelligence"][1]
+        return base_mana + skill_bonus + self._equipment_bonus["mana_bonus"]
     
     @property
     def total_special_damage(self):
         """Calculate total special damage including skills"""
         base_special = self._special_damage
-        skill_bonus = self._allocated_skills["agility"] * 1
+        skill_bonus = self._allocated_skills["agility"] * SKILL_BONUSES["agility"][1]
         return base_special + skill_bonus
     
+    @property
+    def base_stats(self):
+        """Stats before skill and equipment bonuses"""
+        return {
+            "attack": self._attack,
+            "max_hp": self._max_hp,
+            "max_mana": self._max_mana,
+            "special_damage": self._special_damage
+        }
+    
     @property
     def attack(self):
         """Override to return total attack"""
@@ -233,25 +341,48 @@ class Player(Character):
         return 0
     
     def equip_item(self, item_type, item):
-        """Equip an item"""
+        """Equip an item (an item from the registry or catalog, or its id)"""
         if item_type in self._equipment:
-            old_item = self._equipment[item_type]
-            self._equipment[item_type] = item
+            resolved = ITEMS.resolve(item)
+            if resolved is None:
+                raise KeyError(f"Unknown item {item!r}")
+            if resolved["slot"] != item_type:
+                raise ValueError(f"{resolved['name']} can't be equipped as {item_type}")
+            item = resolved
+            old_item = self._equipped_items[item_type]
+            old_max_hp = self.total_max_hp
+            self._equipment[item_type] = item["id"]
+            self._refresh_equipment()
+            self._changed("equipment", item_type)
             
-            # Update current HP/mana if max values changed
-            if item_type == "armor":
-                ratio = self.hp / (self.total_max_hp - (item["hp_bonus"] if item else 0) + (old_item["hp_bonus"] if old_item else 0))
-                self.hp = int(self.total_max_hp * ratio)
+            # Keep the same share of HP if max HP changed
+            if self.total_max_hp != old_max_hp:
+                self.hp = int(self.total_max_hp * self.hp / old_max_hp)
+            self.mana = min(self.mana, self.total_max_mana)
             
             console.print(f"⚔️ Equipped {item['name']}!", style="bold green")
             return old_item
         return None
     
+    def unequip(self, item_type):
+        """Empty an equipment slot, returns the removed item"""
+        old_item = self._equipped_items.get(item_type)
+        if old_item is None:
+            return None
+        self._equipment[item_type] = None
+        self._refresh_equipment()
+        # Losing max HP or mana can't leave the current values above them
+        self.hp = min(self.hp, self.total_max_hp)
+        self.mana = min(self.mana, self.total_max_mana)
+        self._changed("equipment", item_type)
+        return old_item
+    
     def allocate_skill_point(self, skill, points=1):
         """Allocate skill points to a skill"""
         if self._skill_points >= points and skill in self._allocated_skills:
             self._skill_points -= points
             self._allocated_skills[skill] += points
+            self._changed("skills", skill)
             
             # Update current stats if max values changed
             if skill == "vitality":
@@ -266,6 +397,7 @@ class Player(Character):
         """Update a player statistic"""
         if stat_name in self._stats:
             self._stats[stat_name] += value
+            self._changed("stats", stat_name)
     
     # Rest of the properties remain the same...
     @property
@@ -344,7 +476,7 @@ class Player(Character):
     
     @property
     def inventory(self):
-        return self._inventory.copy()
+        return self._inventory_view
     
     @property
     def mana_percentage(self):
@@ -384,7 +516,7 @@ class Player(Character):
         self._special_mana_cost = stats["special_mana_cost"]
     
     @classmethod
-    def create_new_player(cls):
+    async def create_new_player(cls):
         """Create a new player through character creation"""
         console.clear()
         
@@ -398,7 +530,7 @@ class Player(Character):
         
         # Get player name
         while True:
-            name = Prompt.ask("🧙 Enter your character's name").strip()
+            name = (await terminal.ask("🧙 Enter your character's name")).strip()
             if name:
                 break
             console.print("❌ Please enter a valid name!", style="bold red")
@@ -419,7 +551,7 @@ class Player(Character):
         
         console.print(class_table)
         
-        class_choice = Prompt.ask("Enter your choice", choices=["1", "2", "3"], default="1")
+        class_choice = await terminal.ask("Enter your choice", choices=["1", "2", "3"], default="1")
         
         class_names = {"1": "Warrior", "2": "Mage", "3": "Rogue"}
         player_class = class_names[class_choice]
@@ -432,19 +564,15 @@ class Player(Character):
         success_text.append(f"Welcome, {name} the {player_class}!", style="bold cyan")
         
         console.print(Panel(success_text, title="✅ Success", border_style="green"))
-        console.input("\nPress Enter to begin your adventure...")
+        await terminal.input("\nPress Enter to begin your adventure...")
         
         return player
     
     def take_damage(self, damage):
-        """Take damage from an attack with class passive abilities"""
+        """Take damage that already went through the damage pipeline (class passives included)"""
         if damage < 0:
             raise ValueError("Damage cannot be negative")
         
-        # Apply warrior damage reduction
-        if self._player_class == "Warrior":
-            damage = int(damage * (1 - self.get_class_passive_bonus("damage_reduction")))
-            
         old_hp = self._hp
         self._hp = max(0, self._hp - damage)
         actual_damage = old_hp - self._hp
@@ -454,6 +582,28 @@ class Player(Character):
         
         return actual_damage
     
+    def observation(self):
+        """Observable state as plain data, for bots"""
+        return {
+            "name": self.name,
+            "player_class": self.player_class,
+            "level": self.level,
+            "hp": self.hp,
+            "max_hp": self.max_hp,
+            "mana": self.mana,
+            "max_mana": self.max_mana,
+            "attack": self.attack,
+            "special_damage": self.special_damage,
+            "special_cooldown": self.special_cooldown,
+            "special_mana_cost": self.special_mana_cost,
+            "xp": self.xp,
+            "xp_to_next": self.xp_to_next,
+            "gold": self.gold,
+            "skill_points": self.skill_points,
+            "inventory": self._inventory_view.to_dict(),
+            "equipment": {slot: item["name"] if item else None for slot, item in self._equipped_items.items()}
+        }
+    
     def get_status_display(self):
         """Get formatted status display"""
         status_table = Table(title=f"🧙 {self.name} - Level {self.level} {self.player_class}")
@@ -477,12 +627,12 @@ class Player(Character):
         status_table.add_row("⚔️ Attack", str(self.total_attack), "")
         status_table.add_row("💰 Gold", str(self.gold), "")
         status_table.add_row("🔥 Skill Points", str(self.skill_points), "")
-        status_table.add_row("🧪 Health Potions", str(self._inventory['health_potions']), "")
-        status_table.add_row("🔮 Mana Potions", str(self._inventory['mana_potions']), "")
+        status_table.add_row("🧪 Health Potions", str(self._item_counts[HEALTH_POTION]), "")
+        status_table.add_row("🔮 Mana Potions", str(self._item_counts[MANA_POTION]), "")
         
         return status_table
     
-    def view_skill_menu(self):
+    async def view_skill_menu(self):
         """Display and handle skill point allocation"""
         if self._skill_points <= 0:
             console.print("❌ No skill points available!", style="bold red")
@@ -509,18 +659,38 @@ class Player(Character):
         
         console.print(skills_table)
         
-        choice = Prompt.ask("Allocate point to which skill? (strength/vitality/intelligence/agility or 'back')", 
+        recommended = recommended_build(self._player_class, self._level)
+        if recommended:
+            console.print(self._recommended_build_table(recommended))
+        
+        choice = await terminal.ask("Allocate point to which skill? (strength/vitality/intelligence/agility or 'back')", 
                           choices=["strength", "vitality", "intelligence", "agility", "back"])
         
         if choice != "back":
             if self.allocate_skill_point(choice):
                 console.print(f"✅ Allocated 1 skill point to {choice.title()}!", style="bold green")
-                console.input("Press Enter to continue...")
+                await terminal.input("Press Enter to continue...")
             else:
                 console.print("❌ Failed to allocate skill point!", style="bold red")
-                console.input("Press Enter to continue...")
-    
-    def view_equipment_menu(self):
+                await terminal.input("Press Enter to continue...")
+    
+    def _recommended_build_table(self, build):
+        """Evolved skill split and gear next to the player's own"""
+        table = Table(title=f"⭐ Recommended {self._player_class} Build (level {build['level']}, "
+                            f"survives {build['survival'] * 100:.0f}% of fights)")
+        table.add_column("", style="cyan")
+        table.add_column("Recommended", style="gold1")
+        table.add_column("Yours", style="green")
+        for skill in SKILL_BONUSES:
+            table.add_row(skill.title(), str(build["skills"].get(skill, 0)), str(self._allocated_skills[skill]))
+        for slot, item_id in self._equipment.items():
+            key = build["equipment"].get(slot)
+            item = ITEMS.by_key(key) if key else None
+            recommended = item["name"] if item else "unknown" if key else "-"
+            table.add_row(slot.title(), recommended, ITEMS[item_id]["name"] if item_id else "-")
+        return table
+    
+    async def view_equipment_menu(self):
         """Display current equipment"""
         console.clear()
         equipment_table = Table(title="🎒 Current Equipment")
@@ -528,7 +698,7 @@ class Player(Character):
         equipment_table.add_column("Item", style="green")
         equipment_table.add_column("Bonus", style="yellow")
         
-        for slot, item in self._equipment.items():
+        for slot, item in self._equipped_items.items():
             if item:
                 bonus_text = ""
                 if "attack_bonus" in item:
@@ -540,9 +710,9 @@ class Player(Character):
                 equipment_table.add_row(slot.title(), "Empty", "No bonus")
         
         console.print(equipment_table)
-        console.input("Press Enter to continue...")
+        await terminal.input("Press Enter to continue...")
     
-    def view_statistics(self):
+    async def view_statistics(self):
         """Display player statistics"""
         console.clear()
         stats_table = Table(title="📊 Adventure Statistics")
@@ -563,7 +733,7 @@ class Player(Character):
         stats_table.add_row("📈 Win Rate", f"{win_rate:.1f}%")
         
         console.print(stats_table)
-        console.input("Press Enter to continue...")
+        await terminal.input("Press Enter to continue...")
     
     def _create_progress_bar(self, current, maximum, color):
         """Create a visual progress bar"""
@@ -588,7 +758,7 @@ class Player(Character):
         
         old_level = self.level
         self.level += 1
-        self._stats["levels_gained"] += 1
+        self.update_stat("levels_gained", 1)
         
         # Increase stats
         hp_increase = 15 + (self.level * 2)
@@ -608,6 +778,8 @@ class Player(Character):
         if self.level % 5 == 0:  # Bonus skill point every 5 levels
             skill_points_gained += 1
         self._skill_points += skill_points_gained
+        telemetry.publish(telemetry.LEVEL_UP, player_class=self.player_class, player_level=self.level,
+                          skill_points=skill_points_gained)
         
         # Set XP for next level
         self.xp = 0
@@ -626,11 +798,10 @@ class Player(Character):
         
         console.print(increases_table)
         console.print("✨ Fully healed and mana restored!", style="bold green")
-        console.input("\nPress Enter to continue...")
     
     def use_health_potion(self):
         """Use a healing potion"""
-        if self._inventory["health_potions"] <= 0:
+        if self._item_counts[HEALTH_POTION] <= 0:
             console.print("❌ You don't have any health potions!", style="bold red")
             return False
         
@@ -639,13 +810,13 @@ class Player(Character):
             return False
         
         # Calculate healing amount
-        heal_amount = 30 + (self.level * 5)
+        heal_amount = restore_amount(ITEMS[HEALTH_POTION], self.level)
         old_hp = self.hp
         self.hp = min(self.total_max_hp, self.hp + heal_amount)
         actual_heal = self.hp - old_hp
         
-        self._inventory["health_potions"] -= 1
-        self._stats["potions_used"] += 1
+        self.remove_item(HEALTH_POTION)
+        self.update_stat("potions_used", 1)
         
         console.print("🧪 You used a health potion!", style="bold green")
         console.print(f"✨ Restored {actual_heal} HP!", style="bold yellow")
@@ -654,7 +825,7 @@ class Player(Character):
     
     def use_mana_potion(self):
         """Use a mana potion"""
-        if self._inventory["mana_potions"] <= 0:
+        if self._item_counts[MANA_POTION] <= 0:
             console.print("❌ You don't have any mana potions!", style="bold red")
             return False
         
@@ -663,13 +834,13 @@ class Player(Character):
             return False
         
         # Calculate mana restoration
-        mana_amount = 25 + (self.level * 3)
+        mana_amount = restore_amount(ITEMS[MANA_POTION], self.level)
         old_mana = self.mana
         self.mana = min(self.total_max_mana, self.mana + mana_amount)
         actual_restore = self.mana - old_mana
         
-        self._inventory["mana_potions"] -= 1
-        self._stats["potions_used"] += 1
+        self.remove_item(MANA_POTION)
+        self.update_stat("potions_used", 1)
         
         console.print("🔮 You used a mana potion!", style="bold blue")
         console.print(f"✨ Restored {actual_restore} mana!", style="bold yellow")
@@ -694,48 +865,131 @@ class Player(Character):
         if self.special_cooldown > 0:
             self.special_cooldown -= 1
     
-    def add_item_to_inventory(self, item_type, quantity=1):
-        """Add items to inventory"""
-        if item_type in self._inventory:
-            self._inventory[item_type] += quantity
-        else:
-            self._inventory[item_type] = quantity
-    
-    def remove_item_from_inventory(self, item_type, quantity=1):
-        """Remove items from inventory"""
-        if item_type in self._inventory and self._inventory[item_type] >= quantity:
-            self._inventory[item_type] -= quantity
+    def item_count(self, item_id):
+        """How many of an item the player holds"""
+        return self._item_counts[item_id]
+    
+    def add_item(self, item, quantity=1):
+        """Add items to inventory (an item id or registry key)"""
+        item_id = item if isinstance(item, int) else ITEMS.by_key(item)["id"]
+        self._item_counts[item_id] += quantity
+        self._changed("inventory", item_id)
+    
+    def remove_item(self, item, quantity=1):
+        """Remove items from inventory, False if there aren't enough"""
+        item_id = item if isinstance(item, int) else ITEMS.by_key(item)["id"]
+        if self._item_counts[item_id] >= quantity:
+            self._item_counts[item_id] -= quantity
+            self._changed("inventory", item_id)
             return True
         return False
     
+    # Older names for the inventory API
+    add_item_to_inventory = add_item
+    remove_item_from_inventory = remove_item
+    
+    def battle_state(self):
+        """Immutable tuple of what a battle can change: HP, mana, cooldown, items and stats
+        
+        Item counts and statistics only change through tracked writes, so
+        states taken between two changes share one copy of them.
+        """
+        if self._tracked_state_version != self._version:
+            self._tracked_state = (tuple(self._item_counts), tuple(self._stats.values()))
+            self._tracked_state_version = self._version
+        return (self._hp, self._mana, self._special_cooldown, self._tracked_state)
+    
+    def restore_battle_state(self, state):
+        """Put the player back in a state from battle_state()"""
+        self._hp, self._mana, self._special_cooldown, tracked = state
+        if tracked is self._tracked_state and self._tracked_state_version == self._version:
+            return
+        counts, stats = tracked
+        self._item_counts[:] = array('I', counts)
+        self._stats.update(zip(self._stats, stats))
+        self._changed("battle_state", None)
+        self._tracked_state = tracked
+        self._tracked_state_version = self._version
+    
+    def to_dict(self):
+        """Serialize player data to a plain dictionary"""
+        return {
+            "name": self.name,
+            "player_class": self.player_class,
+            "level": self.level,
+            "hp": self.hp,
+            "max_hp": self._max_hp,  # Save base values
+            "mana": self.mana,
+            "max_mana": self._max_mana,  # Save base values
+            "attack": self._attack,  # Save base values
+            "special_damage": self._special_damage,
+            "special_cooldown": self.special_cooldown,
+            "special_max_cooldown": self.special_max_cooldown,
+            "special_mana_cost": self._special_mana_cost,
+            "xp": self.xp,
+            "xp_to_next": self.xp_to_next,
+            "gold": self.gold,
+            "inventory": self._inventory_view.to_dict(),
+            "equipment": dict(self._equipment),
+            "skill_points": self._skill_points,
+            "allocated_skills": self._allocated_skills,
+            "stats": self._stats
+        }
+    
+    @classmethod
+    def from_dict(cls, player_data):
+        """Create a player from serialized data (raises on invalid data)"""
+        # Create new player instance
+        player = cls()
+        
+        # Load all attributes using properties where available
+        player.name = player_data.get("name", "")
+        player.player_class = player_data.get("player_class", "Warrior")
+        player.level = player_data.get("level", 1)
+        player._max_hp = player_data.get("max_hp", 100)
+        player._max_mana = player_data.get("max_mana", 30)
+        player._attack = player_data.get("attack", 20)
+        player._special_damage = player_data.get("special_damage", 35)
+        player.special_cooldown = player_data.get("special_cooldown", 0)
+        player.special_max_cooldown = player_data.get("special_max_cooldown", 5)
+        player._special_mana_cost = player_data.get("special_mana_cost", 15)
+        player.xp = player_data.get("xp", 0)
+        player.xp_to_next = player_data.get("xp_to_next", 50)
+        player.gold = player_data.get("gold", 50)
+        # Saves hold {key: count} and {slot: item id}; older ones plural potion keys and full item dicts
+        inventory = player_data.get("inventory", {"health_potion": 2, "mana_potion": 1})
+        counts = player._item_counts
+        counts[HEALTH_POTION] = counts[MANA_POTION] = 0
+        for key, count in inventory.items():
+            item = ITEMS.by_key(key)
+            if item is None:
+                raise ValueError(f"Unknown inventory item {key!r}")
+            counts[item["id"]] = count
+        
+        # Load new features (with defaults for old saves)
+        equipment = player_data.get("equipment", {})
+        for slot in player._equipment:
+            ref = equipment.get(slot)
+            item = ITEMS.resolve(ref) if ref is not None else None
+            if ref is not None and (item is None or item["slot"] != slot):
+                raise ValueError(f"Unknown {slot} {ref!r}")
+            player._equipment[slot] = item["id"] if item else None
+        player._skill_points = player_data.get("skill_points", 0)
+        player._allocated_skills = player_data.get("allocated_skills", {"strength": 0, "vitality": 0, "intelligence": 0, "agility": 0})
+        player._stats = player_data.get("stats", {"monsters_defeated": 0, "total_xp_earned": 0, "battles_won": 0, "battles_lost": 0, "potions_used": 0, "gold_earned": 0, "levels_gained": 0})
+        player._bind_views()
+        # Set last, the maximums they are clamped to include skill and equipment bonuses
+        player.hp = player_data.get("hp", 100)
+        player.mana = player_data.get("mana", 30)
+        
+        return player
+    
+    @metrics.timed("player.save_to_file")
     def save_to_file(self, filename="save_game.json"):
         """Save player data to a JSON file"""
         try:
-            player_data = {
-                "name": self.name,
-                "player_class": self.player_class,
-                "level": self.level,
-                "hp": self.hp,
-                "max_hp": self._max_hp,  # Save base values
-                "mana": self.mana,
-                "max_mana": self._max_mana,  # Save base values
-                "attack": self._attack,  # Save base values
-                "special_damage": self._special_damage,
-                "special_cooldown": self.special_cooldown,
-                "special_max_cooldown": self.special_max_cooldown,
-                "special_mana_cost": self._special_mana_cost,
-                "xp": self.xp,
-                "xp_to_next": self.xp_to_next,
-                "gold": self.gold,
-                "inventory": self._inventory,
-                "equipment": self._equipment,
-                "skill_points": self._skill_points,
-                "allocated_skills": self._allocated_skills,
-                "stats": self._stats
-            }
-            
             with open(filename, 'w') as file:
-                json.dump(player_data, file, indent=4)
+                json.dump(self.to_dict(), file, indent=4)
             
             console.print(f"💾 Game saved successfully to {filename}!", style="bold green")
             return True
@@ -744,6 +998,7 @@ class Player(Character):
             return False
     
     @classmethod
+    @metrics.timed("player.load_from_file")
     def load_from_file(cls, filename="save_game.json"):
         """Load player data from a JSON file"""
         try:
@@ -754,32 +1009,7 @@ class Player(Character):
             with open(filename, 'r') as file:
                 player_data = json.load(file)
             
-            # Create new player instance
-            player = cls()
-            
-            # Load all attributes using properties where available
-            player.name = player_data.get("name", "")
-            player.player_class = player_data.get("player_class", "Warrior")
-            player.level = player_data.get("level", 1)
-            player._max_hp = player_data.get("max_hp", 100)
-            player.hp = player_data.get("hp", 100)
-            player._max_mana = player_data.get("max_mana", 30)
-            player.mana = player_data.get("mana", 30)
-            player._attack = player_data.get("attack", 20)
-            player._special_damage = player_data.get("special_damage", 35)
-            player.special_cooldown = player_data.get("special_cooldown", 0)
-            player.special_max_cooldown = player_data.get("special_max_cooldown", 5)
-            player._special_mana_cost = player_data.get("special_mana_cost", 15)
-            player.xp = player_data.get("xp", 0)
-            player.xp_to_next = player_data.get("xp_to_next", 50)
-            player.gold = player_data.get("gold", 50)
-            player._inventory = player_data.get("inventory", {"health_potions": 2, "mana_potions": 1})
-            
-            # Load new features (with defaults for old saves)
-            player._equipment = player_data.get("equipment", {"weapon": None, "armor": None, "accessory": None})
-            player._skill_points = player_data.get("skill_points", 0)
-            player._allocated_skills = player_data.get("allocated_skills", {"strength": 0, "vitality": 0, "intelligence": 0, "agility": 0})
-            player._stats = player_data.get("stats", {"monsters_defeated": 0, "total_xp_earned": 0, "battles_won": 0, "battles_lost": 0, "potions_used": 0, "gold_earned": 0, "levels_gained": 0})
+            player = cls.from_dict(player_data)
             
             console.print(f"📁 Game loaded successfully from {filename}!", style="bold green")
             return player
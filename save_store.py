@@ -0,0 +1,274 @@
+# save_store.py - Save game storage backends
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from rich.markup import escape
+import metrics
+from player import Player
+from terminal import console
+
+class SaveStore(ABC):
+    """Abstract base class for save game storage"""
+
+    @abstractmethod
+    def list_saves(self):
+        """List the names of all save slots"""
+        pass
+
+    @abstractmethod
+    def save(self, slot, player):
+        """Save a player into a slot, returns True on success"""
+        pass
+
+    @abstractmethod
+    def load(self, slot):
+        """Load a player from a slot, returns None on failure"""
+        pass
+
+    def exists(self, slot):
+        """Check if a save slot exists"""
+        return slot in self.list_saves()
+
+    def is_empty(self):
+        """Check if there are no saves at all"""
+        return not self.list_saves()
+
+    @abstractmethod
+    def search(self, name=None, player_class=None, min_level=None, max_level=None, limit=None, offset=0):
+        """Search saves, most recently played first, returns a list of summary dicts
+
+        limit and offset page through the results.
+        """
+        pass
+
+class JsonSaveStore(SaveStore):
+    """One JSON file per save slot inside a directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    def _path(self, slot):
+        return os.path.join(self.directory, slot + ".json")
+
+    def list_saves(self):
+        return sorted(f[:-len(".json")] for f in os.listdir(self.directory) if f.endswith('.json'))
+
+    def exists(self, slot):
+        return os.path.exists(self._path(slot))
+
+    def save(self, slot, player):
+        return player.save_to_file(self._path(slot))
+
+    def load(self, slot):
+        return Player.load_from_file(self._path(slot))
+
+    def search(self, name=None, player_class=None, min_level=None, max_level=None, limit=None, offset=0):
+        # No index here - every file has to be opened and parsed
+        results = []
+        for slot in self.list_saves():
+            try:
+                with open(self._path(slot), 'r') as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+
+            summary = {
+                "slot": slot,
+                "name": data.get("name", ""),
+                "player_class": data.get("player_class", "Warrior"),
+                "level": data.get("level", 1),
+                "last_played": os.path.getmtime(self._path(slot))
+            }
+            if _matches(summary, name, player_class, min_level, max_level):
+                results.append(summary)
+
+        results.sort(key=lambda s: s["last_played"], reverse=True)
+        return results[offset:offset + limit] if limit else results[offset:]
+
+class SQLiteSaveStore(SaveStore):
+    """All save slots in a single SQLite database (WAL mode)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS saves (
+            slot TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            player_class TEXT NOT NULL,
+            level INTEGER NOT NULL,
+            last_played REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_saves_name ON saves (name);
+        CREATE INDEX IF NOT EXISTS idx_saves_class_level ON saves (player_class, level);
+        CREATE INDEX IF NOT EXISTS idx_saves_level ON saves (level);
+        CREATE INDEX IF NOT EXISTS idx_saves_last_played ON saves (last_played);
+    """
+
+    # One connection per database file, reused for the whole process
+    _connections = {}
+
+    def __init__(self, path):
+        self.path = path
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    @property
+    def connection(self):
+        key = os.path.abspath(self.path)
+        conn = SQLiteSaveStore._connections.get(key)
+        if conn is None:
+            # Autocommit mode, transactions are opened explicitly in save()
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            SQLiteSaveStore._connections[key] = conn
+        return conn
+
+    def list_saves(self):
+        rows = self.connection.execute("SELECT slot FROM saves ORDER BY last_played DESC")
+        return [row[0] for row in rows]
+
+    def exists(self, slot):
+        row = self.connection.execute("SELECT 1 FROM saves WHERE slot = ?", (slot,)).fetchone()
+        return row is not None
+
+    @metrics.timed("save_store.sqlite_save")
+    def save(self, slot, player):
+        try:
+            self._write(slot, player.to_dict())
+            console.print(f"💾 Game saved successfully to slot {slot}!", style="bold green")
+            return True
+        except Exception as e:
+            console.print(f"❌ Error saving game: {e}", style="bold red")
+            return False
+
+    def _write(self, slot, player_data, last_played=None):
+        conn = self.connection
+        conn.execute("BEGIN")
+        try:
+            conn.execute(
+                "INSERT INTO saves (slot, name, player_class, level, last_played, data) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(slot) DO UPDATE SET name = excluded.name, "
+                "player_class = excluded.player_class, level = excluded.level, "
+                "last_played = excluded.last_played, data = excluded.data",
+                (
+                    slot,
+                    player_data.get("name", ""),
+                    player_data.get("player_class", "Warrior"),
+                    player_data.get("level", 1),
+                    last_played if last_played is not None else time.time(),
+                    json.dumps(player_data, separators=(",", ":"))
+                )
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @metrics.timed("save_store.sqlite_load")
+    def load(self, slot):
+        try:
+            row = self.connection.execute("SELECT data FROM saves WHERE slot = ?", (slot,)).fetchone()
+            if row is None:
+                console.print(f"❌ Save slot {slot} not found!", style="bold red")
+                return None
+
+            player = Player.from_dict(json.loads(row[0]))
+            console.print(f"📁 Game loaded successfully from slot {slot}!", style="bold green")
+            return player
+        except Exception as e:
+            console.print(f"❌ Error loading game: {e}", style="bold red")
+            return None
+
+    def search(self, name=None, player_class=None, min_level=None, max_level=None, limit=None, offset=0):
+        clauses = []
+        params = []
+        if name is not None:
+            clauses.append("name = ?")
+            params.append(name)
+        if player_class is not None:
+            clauses.append("player_class = ?")
+            params.append(player_class)
+        if min_level is not None:
+            clauses.append("level >= ?")
+            params.append(min_level)
+        if max_level is not None:
+            clauses.append("level <= ?")
+            params.append(max_level)
+
+        query = "SELECT slot, name, player_class, level, last_played FROM saves"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY last_played DESC"
+        if limit or offset:
+            # LIMIT -1 is SQLite for "no limit"
+            query += " LIMIT ? OFFSET ?"
+            params.extend((limit or -1, offset))
+
+        columns = ("slot", "name", "player_class", "level", "last_played")
+        return [dict(zip(columns, row)) for row in self.connection.execute(query, params)]
+
+    def is_empty(self):
+        return self.connection.execute("SELECT 1 FROM saves LIMIT 1").fetchone() is None
+
+    def import_json_directory(self, directory):
+        """Import every loadable JSON save from a directory
+
+        Returns (number imported, [(filename, reason)] of the files skipped).
+        """
+        imported = 0
+        skipped = []
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path, 'r') as file:
+                    player_data = json.load(file)
+                if not isinstance(player_data, dict):
+                    raise ValueError("save data is not an object")
+                # Only saves the game can load go in, as it would save them
+                player = Player.from_dict(player_data)
+            except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+                skipped.append((filename, str(e)))
+                continue
+            self._write(filename[:-len(".json")], player.to_dict(), os.path.getmtime(path))
+            imported += 1
+        return imported, skipped
+
+def _matches(summary, name, player_class, min_level, max_level):
+    """Check a save summary against search filters"""
+    if name is not None and summary["name"] != name:
+        return False
+    if player_class is not None and summary["player_class"] != player_class:
+        return False
+    if min_level is not None and summary["level"] < min_level:
+        return False
+    if max_level is not None and summary["level"] > max_level:
+        return False
+    return True
+
+def create_save_store(backend, save_directory):
+    """Create a save store for the given backend name
+
+    The first time the SQLite backend finds an empty database, the JSON
+    saves already in the directory are imported into it.
+    """
+    if backend == "sqlite":
+        store = SQLiteSaveStore(os.path.join(save_directory, "saves.db"))
+        if store.is_empty() and os.path.isdir(save_directory):
+            imported, skipped = store.import_json_directory(save_directory)
+            if imported:
+                console.print(f"📦 Imported {imported} JSON saves into {store.path}", style="bold green")
+            for filename, reason in skipped:
+                console.print(f"⚠️ Skipped {escape(filename)}, it can't be loaded: {escape(reason)}", style="yellow")
+        return store
+    return JsonSaveStore(save_directory)
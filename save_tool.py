@@ -0,0 +1,169 @@
+# save_tool.py - Bulk save validation and migration
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from rich.markup import escape
+from rich.table import Table
+from player import Player
+from items import ITEMS
+from terminal import console
+
+VALID_CLASSES = ("Warrior", "Mage", "Rogue")
+EQUIPMENT_SLOTS = ("weapon", "armor", "accessory")
+
+# Fields Player.from_dict clamps to the maximums, validation already checks them
+CLAMPED_FIELDS = ("hp", "mana")
+
+# Files handed to a worker per task, keeps IPC overhead low on large trees
+CHUNK_SIZE = 64
+
+def validate_save_data(player_data):
+    """Check the invariants of raw save data, returns a list of problems"""
+    problems = []
+
+    player_class = player_data.get("player_class", "Warrior")
+    if player_class not in VALID_CLASSES:
+        problems.append(f"unknown class {player_class!r}")
+
+    if player_data.get("gold", 50) < 0:
+        problems.append("negative gold")
+
+    for item_type, quantity in player_data.get("inventory", {}).items():
+        if ITEMS.by_key(item_type) is None:
+            problems.append(f"unknown inventory item {item_type!r}")
+        elif not isinstance(quantity, int) or quantity < 0:
+            problems.append(f"invalid {item_type} count {quantity!r}")
+
+    # Slots hold item ids, older saves full item dicts
+    hp_bonus = mana_bonus = 0
+    for slot, ref in player_data.get("equipment", {}).items():
+        if ref is None:
+            continue
+        item = ITEMS.resolve(ref)
+        if slot not in EQUIPMENT_SLOTS:
+            problems.append(f"item in unknown slot {slot!r}")
+        elif item is None or item["slot"] != slot:
+            problems.append(f"unknown {slot} {ref.get('name') if isinstance(ref, dict) else ref!r}")
+        else:
+            hp_bonus += item.get("hp_bonus", 0)
+            mana_bonus += item.get("mana_bonus", 0)
+
+    # HP must fit the max HP including skill and equipment bonuses
+    skills = player_data.get("allocated_skills", {})
+    total_max_hp = player_data.get("max_hp", 100) + skills.get("vitality", 0) * 10 + hp_bonus
+    if player_data.get("hp", 100) > total_max_hp:
+        problems.append(f"hp {player_data.get('hp')} exceeds max hp {total_max_hp}")
+
+    total_max_mana = player_data.get("max_mana", 30) + skills.get("intelligence", 0) * 8 + mana_bonus
+    if player_data.get("mana", 30) > total_max_mana:
+        problems.append(f"mana {player_data.get('mana')} exceeds max mana {total_max_mana}")
+
+    return problems
+
+def check_file(path, migrate=False, rewrite=False):
+    """Validate one save file, returns (path, status, problems)"""
+    try:
+        with open(path, 'r') as file:
+            player_data = json.load(file)
+        if not isinstance(player_data, dict):
+            raise ValueError("save data is not an object")
+        problems = validate_save_data(player_data)
+        # Same loading logic as Player.load_from_file, minus the console output
+        player = Player.from_dict(player_data)
+    except Exception as e:
+        return path, "corrupt", [str(e)]
+
+    # Invalid saves are left as they are for someone to look at, never rewritten
+    if problems:
+        return path, "invalid", problems
+
+    migrated_data = player.to_dict()
+    # A clamped value alone is no reason to rewrite a save
+    for field in CLAMPED_FIELDS:
+        if field in player_data:
+            migrated_data[field] = player_data[field]
+    needs_migration = migrated_data != player_data
+
+    if (migrate and needs_migration) or rewrite:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(migrated_data, file, indent=4)
+        os.replace(tmp_path, path)
+        return path, "migrated", []
+
+    if needs_migration:
+        return path, "outdated", []
+    return path, "ok", []
+
+def check_files(paths, migrate=False, rewrite=False):
+    """Validate a chunk of save files in a worker process"""
+    return [check_file(path, migrate, rewrite) for path in paths]
+
+def iter_save_files(root):
+    """Walk a saves tree lazily, yielding every JSON save path"""
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith('.json'):
+                yield os.path.join(directory, filename)
+
+def iter_chunks(iterable, size):
+    """Group an iterable into lists of at most size items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_checks(root, workers=None, migrate=False, rewrite=False):
+    """Check every save under root in a process pool, yielding results as they finish"""
+    workers = workers or os.cpu_count() or 1
+    # Only a bounded number of chunks are ever in flight, so memory stays flat
+    max_in_flight = workers * 4
+    chunks = iter_chunks(iter_save_files(root), CHUNK_SIZE)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(check_files, chunk, migrate, rewrite))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and migrate Python Adventure RPG save files")
+    parser.add_argument("root", nargs="?", default="saves", help="Saves directory to walk (default: saves)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--migrate", action="store_true", help="Rewrite saves that are missing newer fields")
+    parser.add_argument("--rewrite", action="store_true", help="Rewrite every valid save in the current format")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        console.print(f"❌ Saves directory {args.root} not found!", style="bold red")
+        return 2
+
+    counts = {"ok": 0, "outdated": 0, "migrated": 0, "invalid": 0, "corrupt": 0}
+    # Problems are printed as they arrive, nothing per file is kept for the whole run
+    for path, status, problems in run_checks(args.root, args.workers, args.migrate, args.rewrite):
+        counts[status] += 1
+        if problems:
+            console.print(f"🩺 [red]{status}[/red] [cyan]{escape(path)}[/cyan]: [yellow]{escape('; '.join(problems))}[/yellow]")
+
+    summary = Table(title="📊 Save Check Summary", show_header=False)
+    summary.add_column("Status", style="cyan")
+    summary.add_column("Files", style="green")
+    for status, count in counts.items():
+        summary.add_row(status.title(), str(count))
+    console.print(summary)
+
+    return 1 if counts["invalid"] or counts["corrupt"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# server.py - Asyncio multi-session game server
+import asyncio
+import os
+from sessions import SessionManager
+
+class GameServer:
+    """Hosts one Game per connection on a TCP or Unix socket"""
+
+    def __init__(self, host="127.0.0.1", port=7777, unix_path=None, save_backend="json",
+                 max_resident=1000, idle_timeout=300):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        # Idle players are parked under saves/sessions and rebuilt on their next input
+        self.sessions = SessionManager(
+            os.path.join("saves", "sessions"),
+            max_resident=max_resident,
+            idle_timeout=idle_timeout,
+            save_backend=save_backend
+        )
+
+    @property
+    def session_count(self):
+        return self.sessions.session_count
+
+    async def handle_connection(self, reader, writer):
+        """Feed a connected player's input to their game session"""
+        session = self.sessions.open(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.sessions.feed(session, line)
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.close(session)
+
+    async def serve_forever(self):
+        """Accept connections until cancelled"""
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.remove(self.unix_path)
+            server = await asyncio.start_unix_server(self.handle_connection, path=self.unix_path, backlog=1024)
+            address = self.unix_path
+        else:
+            server = await asyncio.start_server(self.handle_connection, self.host, self.port, backlog=1024)
+            address = f"{self.host}:{self.port}"
+
+        print(f"🎮 Python Adventure RPG server listening on {address}")
+        sweeper = asyncio.create_task(self.sessions.sweep_forever())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+
+def run_server(host="127.0.0.1", port=7777, unix_path=None, save_backend="json",
+               max_resident=1000, idle_timeout=300):
+    """Run the game server in the current process"""
+    server = GameServer(host, port, unix_path, save_backend, max_resident, idle_timeout)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
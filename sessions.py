@@ -0,0 +1,183 @@
+# sessions.py - Session manager that parks idle players on disk
+import asyncio
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from game import Game
+from terminal import StreamIO, SessionClosed, use_io
+
+class Session:
+    """One connected player, resident in memory or parked on disk"""
+
+    def __init__(self, session_id, writer):
+        self.session_id = session_id
+        self.writer = writer
+        self.io = None
+        self.game = None
+        self.task = None
+        self.last_active = time.monotonic()
+
+    @property
+    def resident(self):
+        return self.game is not None
+
+    @property
+    def idle(self):
+        """True while the game waits at a checkpoint prompt with no input queued"""
+        return self.io is not None and self.io.at_checkpoint and self.io.pending == 0
+
+class SessionManager:
+    """Keeps at most max_resident games in memory, parking the rest in LRU order
+
+    A parked session is written through Player.to_dict/Combat.to_dict and its
+    task is cancelled, so memory scales with active players. The next line the
+    player sends rebuilds the game at the same prompt.
+    """
+
+    def __init__(self, directory, max_resident=1000, idle_timeout=300, save_backend="json"):
+        self.directory = directory
+        self.max_resident = max_resident
+        self.idle_timeout = idle_timeout
+        self.save_backend = save_backend
+        self._sessions = {}
+        # session_id -> Session, least recently active first
+        self._resident = OrderedDict()
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    @property
+    def session_count(self):
+        return len(self._sessions)
+
+    @property
+    def resident_count(self):
+        return len(self._resident)
+
+    def _path(self, session):
+        return os.path.join(self.directory, session.session_id + ".session")
+
+    def open(self, writer):
+        """Start a new game for a connection"""
+        session = Session(uuid.uuid4().hex, writer)
+        self._sessions[session.session_id] = session
+        self._start(session, Game(save_backend=self.save_backend), resume=False)
+        self._enforce_budget()
+        return session
+
+    def feed(self, session, line):
+        """Hand a line from the player to their game, rehydrating it if parked"""
+        if session.session_id not in self._sessions:
+            return
+        if not session.resident:
+            self._rehydrate(session)
+
+        session.last_active = time.monotonic()
+        self._resident.move_to_end(session.session_id)
+        session.io.feed(line)
+        self._enforce_budget()
+
+    def close(self, session):
+        """Forget a session after its player disconnected or quit"""
+        if self._sessions.pop(session.session_id, None) is None:
+            return
+        self._resident.pop(session.session_id, None)
+        if session.task is not None and not session.task.done():
+            session.task.cancel()
+        session.game = None
+        session.io = None
+
+        path = self._path(session)
+        if os.path.exists(path):
+            os.remove(path)
+        session.writer.close()
+
+    def _start(self, session, game, resume):
+        session.io = StreamIO(session.writer)
+        session.game = game
+        session.task = asyncio.create_task(self._run(session, game, resume))
+        self._resident[session.session_id] = session
+
+    async def _run(self, session, game, resume):
+        # Each session runs in its own task, so this only reroutes this session's I/O
+        use_io(session.io)
+        try:
+            if resume:
+                await game.resume()
+            else:
+                await game.start()
+            await session.writer.drain()
+        except (SessionClosed, ConnectionError):
+            pass
+        except Exception:
+            # A bug in one game must not take the server down or leak the session
+            print(f"❌ Session {session.session_id} crashed:", file=sys.stderr)
+            traceback.print_exc()
+            session.io.console.print("\n❌ Something went wrong and this game had to stop. Sorry!", style="bold red")
+            try:
+                await session.writer.drain()
+            except ConnectionError:
+                pass
+        finally:
+            # A parked session's old task is no longer its task and must leave it open,
+            # a session the manager closed is already gone
+            if session.task is asyncio.current_task():
+                self.close(session)
+
+    def _evict(self, session):
+        """Write a session to disk and drop it from memory"""
+        path = self._path(session)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w') as file:
+            file.write(json.dumps(session.game.snapshot(), separators=(",", ":")))
+        os.replace(temp_path, path)
+
+        self._resident.pop(session.session_id, None)
+        session.task.cancel()
+        session.task = None
+        session.game = None
+        session.io = None
+
+    def _rehydrate(self, session):
+        """Rebuild a parked session's game at the prompt it was waiting on"""
+        path = self._path(session)
+        with open(path, 'r') as file:
+            state = json.load(file)
+        os.remove(path)
+
+        game = Game(save_backend=self.save_backend)
+        game.restore(state)
+        self._start(session, game, resume=True)
+
+    def _enforce_budget(self):
+        """Park idle sessions, oldest first, until within max_resident"""
+        if len(self._resident) <= self.max_resident:
+            return
+        for session in list(self._resident.values()):
+            if len(self._resident) <= self.max_resident:
+                break
+            if session.idle:
+                self._evict(session)
+
+    def evict_idle(self):
+        """Park every session idle for longer than idle_timeout, returns how many"""
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = 0
+        for session in list(self._resident.values()):
+            # Resident sessions are ordered by activity, so stop at the first recent one
+            if session.last_active > cutoff:
+                break
+            if session.idle:
+                self._evict(session)
+                evicted += 1
+        return evicted
+
+    async def sweep_forever(self, interval=30):
+        """Periodically park sessions that went idle"""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
@@ -1,93 +1,58 @@
 import random
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from rich.prompt import Prompt, Confirm
 from rich.text import Text
 from rich.align import Align
+import terminal
+import telemetry
+import metrics
+from terminal import console
+from catalog import EQUIPMENT_CATALOG
+from items import ITEMS, HEALTH_POTION, MANA_POTION, buy_price, sell_price, restore_amount
+from optimizer import LoadoutOptimizer, OBJECTIVES
 
-console = Console()
+# Shop keeper dialogue, shared by every shop visit
+GREETINGS = {
+    "low_gold": (
+        "Looking a bit light on coin, eh? Maybe some smaller purchases today?",
+        "Every adventurer starts somewhere! What can I get you?",
+        "Don't worry about the gold - fame comes to those who persevere!"
+    ),
+    "high_gold": (
+        "Ah, a wealthy adventurer! I have the finest wares for you!",
+        "Your coin purse looks heavy - let me show you my premium items!",
+        "Welcome, valued customer! My best items await!"
+    ),
+    "high_level": (
+        "A legendary hero graces my shop! I have rare items worthy of your skill!",
+        "Tales of your adventures reach even here! What can I craft for you?",
+        "Such power... let me offer equipment fit for a champion!"
+    ),
+    "regular": (
+        "Welcome to my shop, adventurer!",
+        "What can I interest you in today?",
+        "Browse my wares - I have everything an adventurer needs!"
+    )
+}
+
+SLOT_ICONS = {"weapon": "⚔️", "armor": "🛡️", "accessory": "💍"}
+
+FAREWELLS = (
+    "Safe travels, and may fortune favor you!",
+    "Come back when you need more supplies!",
+    "Your business is always welcome here!",
+    "Go forth and seek glory, brave one!"
+)
 
 class Shop:
+    # Static shop data lives at module level and is never rebuilt per visit
+    greetings = GREETINGS
+    farewells = FAREWELLS
+    catalog = EQUIPMENT_CATALOG
+    equipment_db = EQUIPMENT_CATALOG.equipment_db
+    
     def __init__(self, player):
         self.player = player
-        
-        # NEW: Shop keeper dialogue system
-        self.greetings = {
-            "low_gold": [
-                "Looking a bit light on coin, eh? Maybe some smaller purchases today?",
-                "Every adventurer starts somewhere! What can I get you?",
-                "Don't worry about the gold - fame comes to those who persevere!"
-            ],
-            "high_gold": [
-                "Ah, a wealthy adventurer! I have the finest wares for you!",
-                "Your coin purse looks heavy - let me show you my premium items!",
-                "Welcome, valued customer! My best items await!"
-            ],
-            "high_level": [
-                "A legendary hero graces my shop! I have rare items worthy of your skill!",
-                "Tales of your adventures reach even here! What can I craft for you?",
-                "Such power... let me offer equipment fit for a champion!"
-            ],
-            "regular": [
-                "Welcome to my shop, adventurer!",
-                "What can I interest you in today?",
-                "Browse my wares - I have everything an adventurer needs!"
-            ]
-        }
-        
-        self.farewells = [
-            "Safe travels, and may fortune favor you!",
-            "Come back when you need more supplies!",
-            "Your business is always welcome here!",
-            "Go forth and seek glory, brave one!"
-        ]
-        
-        # NEW: Equipment database
-        self.equipment_db = {
-            "weapons": {
-                1: [
-                    {"name": "Iron Sword", "attack_bonus": 5, "price": 100, "description": "A sturdy iron blade"},
-                    {"name": "Wooden Staff", "attack_bonus": 3, "mana_bonus": 10, "price": 80, "description": "A simple mage's staff"}
-                ],
-                5: [
-                    {"name": "Steel Sword", "attack_bonus": 10, "price": 250, "description": "A sharp steel blade"},
-                    {"name": "Mystic Wand", "attack_bonus": 8, "mana_bonus": 20, "price": 300, "description": "A wand crackling with energy"},
-                    {"name": "Shadow Dagger", "attack_bonus": 12, "price": 280, "description": "A swift assassin's blade"}
-                ],
-                10: [
-                    {"name": "Enchanted Blade", "attack_bonus": 18, "price": 500, "description": "A magically enhanced sword"},
-                    {"name": "Arcane Staff", "attack_bonus": 15, "mana_bonus": 35, "price": 550, "description": "A staff of pure magical energy"},
-                    {"name": "Venom Dagger", "attack_bonus": 20, "price": 480, "description": "A poisoned assassin's weapon"}
-                ],
-                15: [
-                    {"name": "Dragon Slayer", "attack_bonus": 25, "price": 800, "description": "Forged from dragon scales"},
-                    {"name": "Staff of Power", "attack_bonus": 22, "mana_bonus": 50, "price": 900, "description": "Ultimate magical focus"},
-                    {"name": "Shadow Strike", "attack_bonus": 28, "price": 750, "description": "Blade of legendary assassins"}
-                ]
-            },
-            "armor": {
-                1: [
-                    {"name": "Leather Armor", "hp_bonus": 20, "price": 120, "description": "Basic protective gear"},
-                    {"name": "Cloth Robes", "hp_bonus": 10, "mana_bonus": 15, "price": 100, "description": "Simple mage robes"}
-                ],
-                5: [
-                    {"name": "Chain Mail", "hp_bonus": 40, "price": 300, "description": "Interlocked metal protection"},
-                    {"name": "Enchanted Robes", "hp_bonus": 25, "mana_bonus": 30, "price": 350, "description": "Magically woven fabric"},
-                    {"name": "Studded Leather", "hp_bonus": 35, "price": 280, "description": "Reinforced leather armor"}
-                ],
-                10: [
-                    {"name": "Plate Armor", "hp_bonus": 70, "price": 600, "description": "Heavy metal protection"},
-                    {"name": "Mystic Vestments", "hp_bonus": 45, "mana_bonus": 50, "price": 650, "description": "Robes of ancient power"},
-                    {"name": "Shadow Cloak", "hp_bonus": 55, "price": 580, "description": "Armor of stealth masters"}
-                ],
-                15: [
-                    {"name": "Dragon Scale Mail", "hp_bonus": 100, "price": 1000, "description": "Armor of dragon hide"},
-                    {"name": "Archmage Robes", "hp_bonus": 70, "mana_bonus": 80, "price": 1200, "description": "Robes of magical mastery"},
-                    {"name": "Void Leather", "hp_bonus": 85, "price": 950, "description": "Armor touched by shadow"}
-                ]
-            }
-        }
     
     def get_greeting(self):
         """Get appropriate greeting based on player status"""
@@ -102,16 +67,10 @@ class Shop:
     
     def get_available_equipment(self, equipment_type):
         """Get equipment available for player's level"""
-        available = []
-        equipment_levels = sorted(self.equipment_db[equipment_type].keys())
-        
-        for level_req in equipment_levels:
-            if self.player.level >= level_req:
-                available.extend(self.equipment_db[equipment_type][level_req])
-        
-        return available
+        return self.catalog.available_equipment(equipment_type, self.player.level)
     
-    def visit_shop(self):
+    @metrics.timed("shop.menu")
+    async def visit_shop(self):
         """Visit the shop to buy items"""
         while True:
             console.clear()
@@ -141,21 +100,24 @@ class Shop:
             menu_table.add_row("2", "⚔️ Weapons", "Increase your attack power")
             menu_table.add_row("3", "🛡️ Armor", "Boost your health and defense")
             menu_table.add_row("4", "💰 Sell Items", "Convert items to gold")
-            menu_table.add_row("5", "🚪 Leave Shop", "Exit the shop")
+            menu_table.add_row("5", "🧠 Loadout Advisor", "Find the best gear and skills for your gold")
+            menu_table.add_row("6", "🚪 Leave Shop", "Exit the shop")
             
             console.print(menu_table)
             
-            choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5"], default="5")
+            choice = await terminal.ask("Enter your choice", choices=["1", "2", "3", "4", "5", "6"], default="6")
             
             if choice == "1":
-                self._visit_potion_shop()
+                await self._visit_potion_shop()
             elif choice == "2":
-                self._visit_weapon_shop()
+                await self._visit_weapon_shop()
             elif choice == "3":
-                self._visit_armor_shop()
+                await self._visit_armor_shop()
             elif choice == "4":
-                self._visit_sell_shop()
+                await self._visit_sell_shop()
             elif choice == "5":
+                await self._visit_loadout_advisor()
+            elif choice == "6":
                 # Farewell message
                 farewell = random.choice(self.farewells)
                 farewell_panel = Panel.fit(
@@ -164,10 +126,11 @@ class Shop:
                     border_style="green"
                 )
                 console.print(farewell_panel)
-                console.input("Press Enter to continue...")
+                await terminal.input("Press Enter to continue...")
                 break
     
-    def _visit_potion_shop(self):
+    @metrics.timed("shop.potion_shop")
+    async def _visit_potion_shop(self):
         """Visit the potion section of the shop"""
         while True:
             console.clear()
@@ -177,9 +140,11 @@ class Shop:
             
             self._display_player_status()
             
-            # Calculate potion prices based on player level
-            health_potion_price = 15 + (self.player.level * 2)
-            mana_potion_price = 12 + (self.player.level * 2)
+            # Potion prices and effects scale with player level
+            health_potion = ITEMS[HEALTH_POTION]
+            mana_potion = ITEMS[MANA_POTION]
+            health_potion_price = buy_price(health_potion, self.player.level)
+            mana_potion_price = buy_price(mana_potion, self.player.level)
             
             # Items for sale table
             items_table = Table(title="🛍️ Potions for Sale")
@@ -189,7 +154,7 @@ class Shop:
             items_table.add_column("Stock", style="blue")
             
             # Health potion info
-            health_heal = 30 + (self.player.level * 5)
+            health_heal = restore_amount(health_potion, self.player.level)
             health_affordable = "✅" if self.player.gold >= health_potion_price else "❌"
             items_table.add_row(
                 "🧪 Health Potion",
@@ -199,7 +164,7 @@ class Shop:
             )
             
             # Mana potion info
-            mana_restore = 25 + (self.player.level * 3)
+            mana_restore = restore_amount(mana_potion, self.player.level)
             mana_affordable = "✅" if self.player.gold >= mana_potion_price else "❌"
             items_table.add_row(
                 "🔮 Mana Potion",
@@ -223,20 +188,21 @@ class Shop:
             
             console.print(potion_menu)
             
-            choice = Prompt.ask("Enter your choice", choices=["1", "2", "3"], default="3")
+            choice = await terminal.ask("Enter your choice", choices=["1", "2", "3"], default="3")
             
             if choice == "1":
-                success = self._buy_item("health_potion", health_potion_price, "Health Potion")
+                success = self._buy_item(HEALTH_POTION, health_potion_price)
                 if not success:
-                    console.input("\nPress Enter to continue...")
+                    await terminal.input("\nPress Enter to continue...")
             elif choice == "2":
-                success = self._buy_item("mana_potion", mana_potion_price, "Mana Potion")
+                success = self._buy_item(MANA_POTION, mana_potion_price)
                 if not success:
-                    console.input("\nPress Enter to continue...")
+                    await terminal.input("\nPress Enter to continue...")
             elif choice == "3":
                 break
     
-    def _visit_weapon_shop(self):
+    @metrics.timed("shop.weapon_shop")
+    async def _visit_weapon_shop(self):
         """Visit the weapon section of the shop"""
         console.clear()
         
@@ -245,7 +211,7 @@ class Shop:
         if not available_weapons:
             console.print(Panel("No weapons available for your level yet!", 
                                title="⚔️ Weapon Shop", border_style="red"))
-            console.input("Press Enter to continue...")
+            await terminal.input("Press Enter to continue...")
             return
         
         console.print(Panel.fit("⚔️ WEAPON SHOP ⚔️\n\"Blades forged for heroes!\"", 
@@ -282,16 +248,17 @@ class Shop:
         
         # Purchase menu
         choices = [str(i) for i in range(1, len(available_weapons) + 1)] + ["back"]
-        choice = Prompt.ask("Choose weapon to buy (or 'back')", choices=choices, default="back")
+        choice = await terminal.ask("Choose weapon to buy (or 'back')", choices=choices, default="back")
         
         if choice != "back":
             weapon_index = int(choice) - 1
             weapon = available_weapons[weapon_index]
-            self._buy_equipment("weapon", weapon)
+            await self._buy_equipment("weapon", weapon)
         
-        console.input("\nPress Enter to continue...")
+        await terminal.input("\nPress Enter to continue...")
     
-    def _visit_armor_shop(self):
+    @metrics.timed("shop.armor_shop")
+    async def _visit_armor_shop(self):
         """Visit the armor section of the shop"""
         console.clear()
         
@@ -300,7 +267,7 @@ class Shop:
         if not available_armor:
             console.print(Panel("No armor available for your level yet!", 
                                title="🛡️ Armor Shop", border_style="red"))
-            console.input("Press Enter to continue...")
+            await terminal.input("Press Enter to continue...")
             return
         
         console.print(Panel.fit("🛡️ ARMOR SHOP 🛡️\n\"Protection fit for champions!\"", 
@@ -338,16 +305,17 @@ class Shop:
         
         # Purchase menu
         choices = [str(i) for i in range(1, len(available_armor) + 1)] + ["back"]
-        choice = Prompt.ask("Choose armor to buy (or 'back')", choices=choices, default="back")
+        choice = await terminal.ask("Choose armor to buy (or 'back')", choices=choices, default="back")
         
         if choice != "back":
             armor_index = int(choice) - 1
             armor = available_armor[armor_index]
-            self._buy_equipment("armor", armor)
+            await self._buy_equipment("armor", armor)
         
-        console.input("\nPress Enter to continue...")
+        await terminal.input("\nPress Enter to continue...")
     
-    def _visit_sell_shop(self):
+    @metrics.timed("shop.sell_shop")
+    async def _visit_sell_shop(self):
         """Visit the sell section of the shop"""
         console.clear()
         
@@ -356,9 +324,14 @@ class Shop:
         
         self._display_player_status()
         
-        # Calculate sell prices (50% of buy price)
-        health_sell_price = max(1, (15 + (self.player.level * 2)) // 2)
-        mana_sell_price = max(1, (12 + (self.player.level * 2)) // 2)
+        # Everything held, then the equipped gear, priced through the item registry
+        offers = [(ITEMS[item_id], quantity, None) for item_id, quantity in self.player.inventory.items()]
+        offers += [(item, 1, slot) for slot, item in self.player.equipment.items() if item]
+        
+        if not offers:
+            console.print("❌ You have nothing to sell!", style="bold red")
+            await terminal.input("Press Enter to continue...")
+            return
         
         # Sellable items table
         sell_table = Table(title="💰 Items You Can Sell")
@@ -367,103 +340,107 @@ class Shop:
         sell_table.add_column("Sell Price", style="gold1")
         sell_table.add_column("Total Value", style="blue")
         
-        # Health potions
-        health_qty = self.player.inventory.get("health_potions", 0)
-        if health_qty > 0:
+        for i, (item, quantity, slot) in enumerate(offers, 1):
+            price = sell_price(item, self.player.level)
+            icon = SLOT_ICONS.get(slot) or item.get("icon", "📦")
             sell_table.add_row(
-                "🧪 Health Potion",
-                str(health_qty),
-                f"{health_sell_price} gold each",
-                f"{health_sell_price * health_qty} gold total"
+                f"{i}. {icon} {item['name']}",
+                str(quantity),
+                f"{price} gold each" if quantity > 1 else f"{price} gold",
+                f"{price * quantity} gold total" if quantity > 1 else f"{price} gold"
             )
         
-        # Mana potions
-        mana_qty = self.player.inventory.get("mana_potions", 0)
-        if mana_qty > 0:
-            sell_table.add_row(
-                "🔮 Mana Potion",
-                str(mana_qty),
-                f"{mana_sell_price} gold each",
-                f"{mana_sell_price * mana_qty} gold total"
-            )
+        console.print(sell_table)
         
-        # Equipment
-        current_weapon = self.player.equipment.get("weapon")
-        if current_weapon:
-            weapon_sell_price = current_weapon["price"] // 3  # 33% of original price
-            sell_table.add_row(
-                f"⚔️ {current_weapon['name']}",
-                "1",
-                f"{weapon_sell_price} gold",
-                f"{weapon_sell_price} gold"
-            )
+        choices = [str(i) for i in range(1, len(offers) + 1)] + ["back"]
+        choice = await terminal.ask("What would you like to sell? (number or 'back')", choices=choices, default="back")
+        
+        if choice != "back":
+            item, held, slot = offers[int(choice) - 1]
+            price = sell_price(item, self.player.level)
+            
+            if slot is None:
+                quantity = 1
+                if held > 1:
+                    while True:
+                        try:
+                            quantity = int(await terminal.ask(f"How many? (1-{held})", default="1"))
+                            break
+                        except ValueError:
+                            console.print("Please enter a number", style="red")
+                    quantity = max(1, min(quantity, held))
+                total_gold = price * quantity
+                
+                if await terminal.confirm(f"Sell {quantity} {item['name']}(s) for {total_gold} gold?"):
+                    self.player.remove_item(item["id"], quantity)
+                    self.player.gold += total_gold
+                    self._publish(telemetry.SALE, item["kind"], item["key"], total_gold, quantity)
+                    console.print(f"✅ Sold {quantity} {item['name']}(s) for {total_gold} gold!", style="bold green")
+            
+            elif await terminal.confirm(f"Sell {item['name']} for {price} gold?"):
+                self.player.unequip(slot)
+                self.player.gold += price
+                self._publish(telemetry.SALE, slot, item["key"], price)
+                console.print(f"✅ Sold {item['name']} for {price} gold!", style="bold green")
+        
+        await terminal.input("\nPress Enter to continue...")
+    
+    @metrics.timed("shop.loadout_advisor")
+    async def _visit_loadout_advisor(self):
+        """Recommend the best purchases and skill allocation for the player's gold"""
+        console.clear()
+        
+        console.print(Panel.fit("🧠 LOADOUT ADVISOR 🧠\n\"Let me size you up, adventurer...\"", 
+                              title="📜 STRATEGY TABLE", border_style="magenta"))
+        
+        self._display_player_status()
+        
+        objective_table = Table(show_header=False, box=None, padding=(0, 2))
+        objective_table.add_column("Choice", style="yellow", width=3)
+        objective_table.add_column("Objective", style="cyan")
+        
+        objective_keys = list(OBJECTIVES)
+        for i, key in enumerate(objective_keys, 1):
+            objective_table.add_row(str(i), OBJECTIVES[key])
+        
+        console.print(objective_table)
         
+        choice = await terminal.ask("Optimize for", choices=[str(i) for i in range(1, len(objective_keys) + 1)], default="1")
+        objective = objective_keys[int(choice) - 1]
+        
+        optimizer = LoadoutOptimizer(self.player, objective)
+        loadout = optimizer.optimize()
+        current_score = optimizer.current_score()
+        
+        current_weapon = self.player.equipment.get("weapon")
         current_armor = self.player.equipment.get("armor")
-        if current_armor:
-            armor_sell_price = current_armor["price"] // 3
-            sell_table.add_row(
-                f"🛡️ {current_armor['name']}",
-                "1", 
-                f"{armor_sell_price} gold",
-                f"{armor_sell_price} gold"
-            )
         
-        console.print(sell_table)
+        plan_table = Table(title="🧠 Recommended Loadout")
+        plan_table.add_column("Slot", style="cyan")
+        plan_table.add_column("Recommendation", style="green")
+        plan_table.add_column("Cost", style="gold1")
+        
+        for slot, item, current in (("⚔️ Weapon", loadout.weapon, current_weapon),
+                                    ("🛡️ Armor", loadout.armor, current_armor)):
+            if item is None:
+                plan_table.add_row(slot, "[dim]No purchase[/dim]", "-")
+            elif current and item["name"] == current["name"]:
+                plan_table.add_row(slot, f"Keep {item['name']}", "-")
+            else:
+                plan_table.add_row(slot, f"Buy {item['name']}", f"{item['price']} gold")
         
-        if health_qty == 0 and mana_qty == 0 and not current_weapon and not current_armor:
-            console.print("❌ You have nothing to sell!", style="bold red")
-            console.input("Press Enter to continue...")
-            return
+        skill_plan = ", ".join(f"{points} {skill}" for skill, points in loadout.skills.items() if points)
+        plan_table.add_row("🔥 Skill Points", skill_plan or "[dim]None to spend[/dim]", "-")
+        plan_table.add_row("💰 Total", "", f"{loadout.cost} gold")
         
-        # Sell menu
-        sell_choices = []
-        if health_qty > 0:
-            sell_choices.append("health")
-        if mana_qty > 0:
-            sell_choices.append("mana")
-        if current_weapon:
-            sell_choices.append("weapon")
-        if current_armor:
-            sell_choices.append("armor")
-        sell_choices.append("back")
+        console.print(plan_table)
         
-        choice = Prompt.ask("What would you like to sell? (health/mana/weapon/armor/back)", choices=sell_choices, default="back")
+        if objective == "win_rate":
+            console.print(f"📈 Win rate: {current_score * 100:.1f}% → [bold green]{loadout.score * 100:.1f}%[/bold green]")
+        else:
+            console.print(f"📈 Power: {current_score:,.0f} → [bold green]{loadout.score:,.0f}[/bold green]")
         
-        if choice == "health" and health_qty > 0:
-            quantity = int(Prompt.ask(f"How many health potions? (1-{health_qty})", default="1"))
-            quantity = max(1, min(quantity, health_qty))
-            total_gold = health_sell_price * quantity
-            
-            if Confirm.ask(f"Sell {quantity} health potion(s) for {total_gold} gold?"):
-                self.player._inventory["health_potions"] -= quantity
-                self.player.gold += total_gold
-                console.print(f"✅ Sold {quantity} health potion(s) for {total_gold} gold!", style="bold green")
-        
-        elif choice == "mana" and mana_qty > 0:
-            quantity = int(Prompt.ask(f"How many mana potions? (1-{mana_qty})", default="1"))
-            quantity = max(1, min(quantity, mana_qty))
-            total_gold = mana_sell_price * quantity
-            
-            if Confirm.ask(f"Sell {quantity} mana potion(s) for {total_gold} gold?"):
-                self.player._inventory["mana_potions"] -= quantity
-                self.player.gold += total_gold
-                console.print(f"✅ Sold {quantity} mana potion(s) for {total_gold} gold!", style="bold green")
-        
-        elif choice == "weapon" and current_weapon:
-            weapon_sell_price = current_weapon["price"] // 3
-            if Confirm.ask(f"Sell {current_weapon['name']} for {weapon_sell_price} gold?"):
-                self.player._equipment["weapon"] = None
-                self.player.gold += weapon_sell_price
-                console.print(f"✅ Sold {current_weapon['name']} for {weapon_sell_price} gold!", style="bold green")
-        
-        elif choice == "armor" and current_armor:
-            armor_sell_price = current_armor["price"] // 3
-            if Confirm.ask(f"Sell {current_armor['name']} for {armor_sell_price} gold?"):
-                self.player._equipment["armor"] = None
-                self.player.gold += armor_sell_price
-                console.print(f"✅ Sold {current_armor['name']} for {armor_sell_price} gold!", style="bold green")
-        
-        console.input("\nPress Enter to continue...")
+        await terminal.input("\nPress Enter to continue...")
     
     def _display_player_status(self):
         """Display current player gold and inventory"""
@@ -472,25 +449,27 @@ class Shop:
         status_text.append(f"{self.player.gold}", style="bold gold1")
         status_text.append(f" | Level: {self.player.level}", style="cyan")
         status_text.append(" | 🎒 Inventory: ", style="cyan")
-        status_text.append(f"🧪 {self.player.inventory['health_potions']} health", style="red")
+        status_text.append(f"🧪 {self.player.item_count(HEALTH_POTION)} health", style="red")
         status_text.append(" | ", style="dim")
-        status_text.append(f"🔮 {self.player.inventory['mana_potions']} mana", style="blue")
+        status_text.append(f"🔮 {self.player.item_count(MANA_POTION)} mana", style="blue")
         
         console.print(Panel(Align.center(status_text), border_style="cyan"))
     
-    def _buy_item(self, item_type, price, item_name):
+    def _publish(self, event_type, category, item, gold, quantity=1):
+        """Publish a purchase or sale to telemetry, item is the registry key"""
+        telemetry.publish(event_type, category=category, item=item, gold=gold, quantity=quantity,
+                          player_class=self.player.player_class, player_level=self.player.level)
+    
+    def _buy_item(self, item_id, price):
         """Buy a potion from the shop"""
         if self.player.gold >= price:
+            item = ITEMS[item_id]
+            item_name = item["name"]
             self.player.gold -= price
-            
-            if item_type == "health_potion":
-                self.player._inventory["health_potions"] += 1
-                icon = "🧪"
-                color = "red"
-            else:
-                self.player._inventory["mana_potions"] += 1
-                icon = "🔮"
-                color = "blue"
+            self._publish(telemetry.PURCHASE, "potion", item["key"], price)
+            self.player.add_item(item_id)
+            icon = item["icon"]
+            color = "red" if item_id == HEALTH_POTION else "blue"
             
             # Purchase success message
             success_text = Text()
@@ -504,7 +483,7 @@ class Shop:
             success_text.append("💰 Remaining gold: ", style="yellow")
             success_text.append(f"{self.player.gold}", style="bold gold1")
             success_text.append(f"\n{icon} Total {item_name.lower()}s: ", style=color)
-            success_text.append(f"{self.player.inventory[item_type + 's']}", style=f"bold {color}")
+            success_text.append(f"{self.player.item_count(item_id)}", style=f"bold {color}")
             
             console.print(Panel(success_text, title="🛍️ Transaction Complete", border_style="green"))
             return True
@@ -525,12 +504,14 @@ class Shop:
             console.print(Panel(error_text, title="💸 Transaction Failed", border_style="red"))
             return False
     
-    def _buy_equipment(self, equipment_type, item):
+    async def _buy_equipment(self, equipment_type, item):
         """Buy equipment from the shop"""
         if self.player.gold >= item["price"]:
-            if Confirm.ask(f"Buy {item['name']} for {item['price']} gold?"):
+            if await terminal.confirm(f"Buy {item['name']} for {item['price']} gold?"):
                 self.player.gold -= item["price"]
                 old_item = self.player.equip_item(equipment_type, item)
+                # Catalog entries carry no key, the registry has it under the same id
+                self._publish(telemetry.PURCHASE, equipment_type, ITEMS.resolve(item)["key"], item["price"])
                 
                 # Show purchase success
                 success_text = Text()
@@ -552,7 +533,7 @@ class Shop:
             needed = item["price"] - self.player.gold
             console.print(f"❌ You need {needed} more gold to buy this item!", style="bold red")
     
-    def display_shop_info(self):
+    async def display_shop_info(self):
         """Display information about the shop"""
         info_text = Text()
         info_text.append("🏪 Shop Information\n\n", style="bold cyan")
@@ -563,4 +544,4 @@ class Shop:
         info_text.append("• Shop keeper dialogue changes based on your status\n", style="white")
         
         console.print(Panel(info_text, title="ℹ️ Shop Guide", border_style="blue"))
-        console.input("\nPress Enter to continue...")
\ No newline at end of file
+        await terminal.input("\nPress Enter to continue...")
\ No newline at end of file
@@ -0,0 +1,99 @@
+# telemetry.py - Gameplay event bus and buffered JSONL sink
+import atexit
+import json
+import os
+import time
+
+# Event types published by the game
+BATTLE_START = "battle_start"
+BATTLE_ACTION = "battle_action"
+DAMAGE_DEALT = "damage_dealt"
+DAMAGE_TAKEN = "damage_taken"
+POTION_USED = "potion_used"
+BATTLE_END = "battle_end"
+BATTLE_REWIND = "battle_rewind"
+VICTORY_REWARD = "victory_reward"
+LEVEL_UP = "level_up"
+PURCHASE = "purchase"
+SALE = "sale"
+
+_subscribers = []
+
+def subscribe(handler):
+    """Call handler(event) for every published event"""
+    _subscribers.append(handler)
+
+def unsubscribe(handler):
+    if handler in _subscribers:
+        _subscribers.remove(handler)
+
+def is_enabled():
+    return bool(_subscribers)
+
+def publish(event_type, **fields):
+    """Publish an event (a no-op when nothing is subscribed)"""
+    if not _subscribers:
+        return
+    event = {"type": event_type, "ts": time.time()}
+    event.update(fields)
+    for handler in _subscribers:
+        handler(event)
+
+class JsonlSink:
+    """Buffers events in memory and appends them to rotating JSONL files
+
+    Events are only serialized when the buffer is flushed, so the cost on the
+    publishing side is a list append and a clock read.
+    """
+
+    def __init__(self, directory, max_events=1000, max_seconds=5.0, max_file_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_events = max_events
+        self.max_seconds = max_seconds
+        self.max_file_bytes = max_file_bytes
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._path = None
+        self._file_bytes = 0
+        self._rotation = 0
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    def __call__(self, event):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.max_events or time.monotonic() - self._last_flush >= self.max_seconds:
+            self.flush()
+
+    def _next_path(self):
+        # Several server processes may share a directory, so the pid is part of the name
+        self._rotation += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"events-{stamp}-{os.getpid()}-{self._rotation:04d}.jsonl"
+        return os.path.join(self.directory, name)
+
+    def flush(self):
+        """Write out buffered events, starting a new file past max_file_bytes"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+
+        events, self._buffer = self._buffer, []
+        data = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events).encode("utf-8")
+
+        if self._path is None or self._file_bytes >= self.max_file_bytes:
+            self._path = self._next_path()
+            self._file_bytes = 0
+        with open(self._path, 'ab') as file:
+            file.write(data)
+        self._file_bytes += len(data)
+
+    def close(self):
+        self.flush()
+
+def enable(directory, **options):
+    """Record all events to JSONL files in directory, returns the sink"""
+    sink = JsonlSink(directory, **options)
+    subscribe(sink)
+    atexit.register(sink.close)
+    return sink
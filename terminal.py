@@ -0,0 +1,341 @@
+# terminal.py - Session-aware console output and awaitable input
+import asyncio
+import atexit
+import contextvars
+import json
+import sys
+import metrics
+from rich.console import Console, Group
+from rich.markup import escape
+from rich.panel import Panel
+from rich.prompt import Prompt, Confirm
+from rich.table import Table
+from rich.text import Text
+
+class SessionClosed(Exception):
+    """Raised when a remote player disconnects"""
+    pass
+
+class TerminalIO:
+    """Local game on stdin/stdout"""
+
+    def __init__(self, console=None):
+        self.console = console or Console()
+
+    async def input(self, prompt=""):
+        """Read a line of free text"""
+        return self.console.input(prompt)
+
+    async def ask(self, prompt, choices=None, default=None, checkpoint=False, observe=None):
+        """Ask until one of the choices is entered
+
+        checkpoint=True marks a prompt where the game state is complete and the
+        session may be parked while it waits (main menu, battle action).
+        observe is a callable returning the state behind the decision, for bots.
+        """
+        return Prompt.ask(prompt, choices=choices, default=default, console=self.console)
+
+    async def confirm(self, prompt, default=False, observe=None):
+        """Ask a yes/no question"""
+        return Confirm.ask(prompt, default=default, console=self.console)
+
+    async def status(self, message, seconds):
+        """Show a spinner for a dramatic pause"""
+        with self.console.status(message, spinner="dots"):
+            await asyncio.sleep(seconds)
+
+class _StreamFile:
+    """File-like adapter so a Rich console can write to an asyncio stream"""
+
+    def __init__(self, writer):
+        self._writer = writer
+
+    def write(self, text):
+        if not self._writer.is_closing():
+            self._writer.write(text.replace("\n", "\r\n").encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+class LineIO(TerminalIO):
+    """Prompts built on plain line reads, for sessions without an interactive terminal"""
+
+    async def readline(self):
+        """Wait for the next line of input"""
+        raise NotImplementedError
+
+    async def input(self, prompt=""):
+        if prompt:
+            self.console.print(prompt, end="")
+        return await self.readline()
+
+    async def ask(self, prompt, choices=None, default=None, checkpoint=False, observe=None):
+        suffix = ""
+        if choices:
+            suffix += escape(f" [{'/'.join(choices)}]")
+        if default is not None:
+            suffix += f" ({default})"
+
+        while True:
+            self.at_checkpoint = checkpoint
+            try:
+                value = (await self.input(f"{prompt}{suffix}: ")).strip()
+            finally:
+                self.at_checkpoint = False
+            if not value and default is not None:
+                return default
+            if choices is None or value in choices:
+                return value
+            self.console.print("Please select one of the available options", style="red")
+
+    async def confirm(self, prompt, default=False, observe=None):
+        answer = await self.ask(prompt, choices=["y", "n"], default="y" if default else "n", observe=observe)
+        return answer == "y"
+
+    async def status(self, message, seconds):
+        self.console.print(message)
+        await asyncio.sleep(seconds)
+
+class StreamIO(LineIO):
+    """Plain-text game session over an asyncio stream (TCP or Unix socket)
+
+    Lines are pushed in with feed() by the connection's reader loop, so the
+    game task can be parked and restarted without losing input.
+    """
+
+    def __init__(self, writer, width=100):
+        super().__init__(Console(
+            file=_StreamFile(writer),
+            force_terminal=False,
+            color_system=None,
+            width=width,
+            legacy_windows=False
+        ))
+        self._writer = writer
+        self._lines = asyncio.Queue()
+        self.at_checkpoint = False
+
+    @property
+    def pending(self):
+        """Number of lines received but not read yet"""
+        return self._lines.qsize()
+
+    def feed(self, line):
+        """Queue a line from the remote player (None when the connection closed)"""
+        self._lines.put_nowait(line)
+
+    async def readline(self):
+        """Wait for the next line from the remote player"""
+        await self._writer.drain()
+        line = await self._lines.get()
+        if line is None:
+            raise SessionClosed()
+        return line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+class _BufferedFile:
+    """Collects console output until drain() writes it out in one go"""
+
+    def __init__(self, file):
+        self._file = file
+        self._chunks = []
+
+    def write(self, text):
+        self._chunks.append(text)
+        return len(text)
+
+    def flush(self):
+        # Rich flushes after every print; output is held until the next prompt instead
+        pass
+
+    def drain(self):
+        # At exit the stream may already be gone (closed by a test runner's capture)
+        if self._file.closed:
+            return
+        if self._chunks:
+            self._file.write("".join(self._chunks))
+            self._chunks.clear()
+        self._file.flush()
+
+    def isatty(self):
+        return False
+
+class PlainConsole(Console):
+    """Console for piped or recorded output: no screen clearing, no box drawing"""
+
+    def clear(self, home=True):
+        pass
+
+    def print(self, *objects, **kwargs):
+        super().print(*(_flatten(renderable) for renderable in objects), **kwargs)
+
+def _flatten(renderable):
+    """Strip the borders off panels and tables"""
+    if isinstance(renderable, Panel):
+        parts = []
+        if renderable.title:
+            parts.append(Text.from_markup(renderable.title) if isinstance(renderable.title, str) else renderable.title)
+        parts.append(_flatten(renderable.renderable))
+        return Group(*parts)
+    if isinstance(renderable, Table):
+        renderable.box = None
+        renderable.show_edge = False
+    return renderable
+
+class PlainIO(LineIO):
+    """Local game when stdout is not a terminal
+
+    Output is plain text without clears or box drawing, buffered into a single
+    write per prompt, and spinner pauses are skipped.
+    """
+
+    def __init__(self, stdin=None, stdout=None):
+        self._stdin = stdin or sys.stdin
+        self._output = _BufferedFile(stdout or sys.stdout)
+        super().__init__(PlainConsole(
+            file=self._output,
+            force_terminal=False,
+            color_system=None,
+            legacy_windows=False
+        ))
+        self.at_checkpoint = False
+        atexit.register(self._output.drain)
+
+    def flush(self):
+        """Write out everything printed since the last prompt"""
+        self._output.drain()
+
+    async def readline(self):
+        self.flush()
+        line = self._stdin.readline()
+        if not line:
+            raise SessionClosed()
+        return line.rstrip("\r\n")
+
+    async def status(self, message, seconds):
+        self.console.print(message)
+
+class SilentConsole(Console):
+    """Console that renders nothing at all"""
+
+    def print(self, *objects, **kwargs):
+        pass
+
+    def clear(self, home=True):
+        pass
+
+class BotIO(TerminalIO):
+    """JSON lines protocol for automated players
+
+    Every decision point writes one compact JSON object to stdout, with the
+    prompt, the legal choices and, where the game provides it, the observable
+    state. The bot answers with one JSON line per decision, either a bare
+    string or {"action": "..."}. Nothing is rendered and pauses are skipped.
+    """
+
+    def __init__(self, stdin=None, stdout=None):
+        super().__init__(SilentConsole(quiet=True))
+        self._stdin = stdin or sys.stdin
+        self._stdout = stdout or sys.stdout
+        self.at_checkpoint = False
+
+    def _send(self, message):
+        self._stdout.write(json.dumps(message, separators=(",", ":")) + "\n")
+        self._stdout.flush()
+
+    def _receive(self):
+        while True:
+            line = self._stdin.readline()
+            if not line:
+                raise SessionClosed()
+            try:
+                answer = json.loads(line)
+            except ValueError:
+                self._send({"type": "error", "message": "answer must be a JSON line"})
+                continue
+            if isinstance(answer, dict):
+                answer = answer.get("action", "")
+            return str(answer).strip()
+
+    async def input(self, prompt=""):
+        # Free-text input is only used for "Press Enter" pauses
+        return ""
+
+    async def ask(self, prompt, choices=None, default=None, checkpoint=False, observe=None):
+        message = {"type": "decision", "prompt": Text.from_markup(prompt).plain, "choices": choices, "default": default}
+        if observe is not None:
+            message["state"] = observe()
+
+        while True:
+            self._send(message)
+            value = self._receive()
+            if not value and default is not None:
+                return default
+            if choices is None or value in choices:
+                return value
+            self._send({"type": "error", "message": f"illegal choice {value!r}"})
+
+    async def confirm(self, prompt, default=False, observe=None):
+        answer = await self.ask(prompt, choices=["y", "n"], default="y" if default else "n", observe=observe)
+        return answer == "y"
+
+    async def status(self, message, seconds):
+        pass
+
+_default_io = None
+_current_io = contextvars.ContextVar("terminal_io", default=None)
+
+def current_io():
+    """I/O of the session running in the current task (stdin/stdout by default)"""
+    global _default_io
+    io = _current_io.get()
+    if io is None:
+        if _default_io is None:
+            # Piped, logged or harnessed runs get the cheap plain-text backend
+            _default_io = TerminalIO() if sys.stdout.isatty() else PlainIO()
+        io = _default_io
+    return io
+
+def use_bot_protocol():
+    """Drive the local game through the JSON lines bot protocol"""
+    global _default_io
+    _default_io = BotIO()
+
+def use_plain_output():
+    """Force the plain-text backend for the local game, even on a terminal"""
+    global _default_io
+    _default_io = PlainIO()
+
+def use_io(io):
+    """Route console output and input of the current task to a session"""
+    _current_io.set(io)
+
+class _ConsoleProxy:
+    """Forwards to the console of the current session"""
+
+    def __getattr__(self, name):
+        return getattr(current_io().console, name)
+
+console = _ConsoleProxy()
+
+# Time spent in these is the player's, not the game's, so metrics leave it out
+
+async def input(prompt=""):
+    with metrics.waiting():
+        return await current_io().input(prompt)
+
+async def ask(prompt, choices=None, default=None, checkpoint=False, observe=None):
+    with metrics.waiting():
+        return await current_io().ask(prompt, choices=choices, default=default,
+                                      checkpoint=checkpoint, observe=observe)
+
+async def confirm(prompt, default=False, observe=None):
+    with metrics.waiting():
+        return await current_io().confirm(prompt, default=default, observe=observe)
+
+async def status(message, seconds):
+    with metrics.waiting():
+        await current_io().status(message, seconds)
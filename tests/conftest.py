@@ -0,0 +1,32 @@
+# tests/conftest.py - Run the game modules from the repository root, silently
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import terminal
+from terminal import SilentConsole, TerminalIO
+
+@pytest.fixture(autouse=True)
+def quiet():
+    """Send game output to a console that prints nothing"""
+    previous = terminal.current_io()
+    terminal.use_io(TerminalIO(SilentConsole(quiet=True)))
+    yield
+    terminal.use_io(previous)
+
+@pytest.fixture
+def skilled_mage():
+    """A Mage whose HP and mana maximums come partly from skill points and gear, at full HP and mana"""
+    from player import Player
+    player = Player("Tester", "Mage")
+    player._skill_points = 5
+    player.allocate_skill_point("intelligence", 2)
+    player.allocate_skill_point("vitality", 3)
+    player.equip_item("weapon", "mystic_wand")
+    player.equip_item("armor", "enchanted_robes")
+    player.equip_item("accessory", "amulet_of_vigor")
+    player.hp = player.total_max_hp
+    player.mana = player.total_max_mana
+    return player
@@ -0,0 +1,35 @@
+# tests/test_battle_resume.py - Resuming a battle from its per-turn checkpoint
+import asyncio
+import terminal
+from benchmarks.headless import ScriptedIO
+from combat import Combat
+from game import Game
+from monsters import Monster
+
+def test_resumed_battle_keeps_skill_and_gear_hp_mana(tmp_path, monkeypatch, skilled_mage):
+    monkeypatch.chdir(tmp_path)
+    # Hurt and drained, but still above the base maximums
+    skilled_mage.hp = skilled_mage.total_max_hp - 5
+    skilled_mage.mana = skilled_mage.total_max_mana - 4
+    assert skilled_mage.hp > skilled_mage.base_stats["max_hp"]
+    assert skilled_mage.mana > skilled_mage.base_stats["max_mana"]
+
+    async def scenario():
+        game = Game()
+        game.player = skilled_mage
+        game.save_slot = "mage"
+        game.combat = Combat(skilled_mage, Monster.create_monster(skilled_mage.level), game._checkpoint_battle)
+        await game._checkpoint_battle(game.combat)
+
+        resumed = Game()
+        resumed.save_slot = "mage"
+        terminal.use_io(ScriptedIO(("y",)))
+        assert await resumed._offer_battle_resume()
+        return game, resumed
+
+    game, resumed = asyncio.run(scenario())
+
+    player = resumed.player
+    assert (player.hp, player.mana) == (skilled_mage.hp, skilled_mage.mana)
+    assert resumed.combat.player is player
+    assert resumed.combat.monster.snapshot() == game.combat.monster.snapshot()
@@ -0,0 +1,21 @@
+# tests/test_recommended_builds.py - Loading evolver recommendations for the skill menu
+import json
+import os
+from player import recommended_build
+
+def _write(path, level, survival):
+    build = {"level": level, "skills": {"strength": 1}, "equipment": {}, "survival": survival}
+    path.write_text(json.dumps({"builds": {"Warrior": [build]}}))
+
+def test_each_path_is_read_and_rewrites_are_picked_up(tmp_path):
+    first, second = tmp_path / "first.json", tmp_path / "second.json"
+    _write(first, 1, 0.5)
+    _write(second, 2, 0.9)
+
+    assert recommended_build("Warrior", 5, str(first))["survival"] == 0.5
+    assert recommended_build("Warrior", 5, str(second))["survival"] == 0.9
+    assert recommended_build("Warrior", 5)["level"] <= 5
+
+    _write(first, 3, 0.7)
+    os.utime(first, (os.path.getmtime(first) + 10,) * 2)
+    assert recommended_build("Warrior", 5, str(first))["survival"] == 0.7
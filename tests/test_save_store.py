@@ -0,0 +1,21 @@
+# tests/test_save_store.py - Importing JSON saves into SQLite
+import json
+from player import Player
+from save_store import create_save_store
+
+def test_first_sqlite_run_imports_good_saves_and_skips_corrupt_ones(tmp_path, skilled_mage):
+    (tmp_path / "hero.json").write_text(json.dumps(skilled_mage.to_dict()))
+    (tmp_path / "list.json").write_text(json.dumps([1, 2, 3]))
+    (tmp_path / "broken.json").write_text(json.dumps({"player_class": "Bard"}))
+    (tmp_path / "truncated.json").write_text('{"name": "Half')
+
+    store = create_save_store("sqlite", str(tmp_path))
+
+    assert store.list_saves() == ["hero"]
+    loaded = store.load("hero")
+    assert isinstance(loaded, Player)
+    assert loaded.to_dict() == skilled_mage.to_dict()
+
+    # Skipped files are reported by name
+    _, skipped = store.import_json_directory(str(tmp_path))
+    assert [filename for filename, _ in skipped] == ["broken.json", "list.json", "truncated.json"]
@@ -0,0 +1,23 @@
+# tests/test_save_tool.py - Save round trips and migration
+import json
+from player import Player
+from save_tool import check_file
+
+def test_skill_and_gear_hp_mana_survive_a_round_trip(skilled_mage):
+    data = skilled_mage.to_dict()
+    assert data["hp"] > data["max_hp"] and data["mana"] > data["max_mana"]
+
+    loaded = Player.from_dict(data)
+
+    assert (loaded.hp, loaded.mana) == (skilled_mage.hp, skilled_mage.mana)
+    assert loaded.to_dict() == data
+
+def test_migrate_leaves_a_valid_save_alone(tmp_path, skilled_mage):
+    path = tmp_path / "mage.json"
+    path.write_text(json.dumps(skilled_mage.to_dict(), indent=4))
+    before = path.read_text()
+
+    _, status, problems = check_file(str(path), migrate=True)
+
+    assert (status, problems) == ("ok", [])
+    assert path.read_text() == before
@@ -0,0 +1,71 @@
+# tests/test_sessions.py - Parking sessions on disk and bringing them back
+import asyncio
+from sessions import SessionManager
+
+class FakeWriter:
+    """Collects what a session sends instead of writing to a socket"""
+
+    def __init__(self):
+        self.output = bytearray()
+        self.closed = False
+
+    def write(self, data):
+        self.output += data
+
+    async def drain(self):
+        pass
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+async def _until(condition, timeout=5):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def test_evicted_session_keeps_skill_and_gear_hp_mana(tmp_path, monkeypatch, skilled_mage):
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        manager = SessionManager(str(tmp_path / "sessions"), idle_timeout=0)
+        session = manager.open(FakeWriter())
+        # New game, name, Mage, past the welcome screens to the main menu
+        for line in (b"1\n", b"Tester\n", b"2\n", b"\n", b"\n"):
+            manager.feed(session, line)
+        await _until(lambda: session.idle and session.game.player is not None)
+        session.game.player = skilled_mage
+
+        assert manager.evict_idle() == 1
+        assert not session.resident
+        manager.feed(session, b"\n")
+
+        restored = session.game.player
+        assert (restored.hp, restored.mana) == (skilled_mage.hp, skilled_mage.mana)
+        assert restored.to_dict() == skilled_mage.to_dict()
+        manager.close(session)
+
+    asyncio.run(scenario())
+
+def test_crashed_session_is_closed_and_told(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def crash(game):
+        raise RuntimeError("bug in a game screen")
+    monkeypatch.setattr("game.Game.start", crash)
+
+    async def scenario():
+        manager = SessionManager(str(tmp_path / "sessions"))
+        writer = FakeWriter()
+        manager.open(writer)
+        await _until(lambda: writer.closed)
+        return manager, writer
+
+    manager, writer = asyncio.run(scenario())
+
+    assert manager.session_count == 0 and manager.resident_count == 0
+    assert "Something went wrong" in writer.output.decode()
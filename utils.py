@@ -1,10 +1,10 @@
 # utils.py - Utility functions
-import os
+from terminal import console
 
 def clear_screen():
     """Clear the console screen"""
-    # Works on both Windows and Unix-like systems
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # Rich skips this when output is not a terminal, instead of spawning a shell
+    console.clear()
 
 def get_user_choice(prompt, valid_choices):
     """Get valid user input from a list of choices"""